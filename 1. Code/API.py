@@ -1,18 +1,40 @@
-from flask import Flask
+import json
+import sqlite3
+
+from flask import Flask, request
 from flask_restful import Api, Resource, fields, marshal_with,reqparse
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert
 
 app = Flask(__name__)
 api = Api(app)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
 db = SQLAlchemy(app)
 
+# Number of offers sent to the database in a single executemany
+BULK_CHUNK_SIZE = 1000
+
+# WAL lets the readers work while offers are written, synchronous NORMAL only syncs at the checkpoints
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
 class JobOfferModel(db.Model):
     id = db.Column(db.Integer, primary_key = True)
     url = db.Column(db.String(100), nullable = False)
     job_title = db.Column(db.String(100), nullable = False)
     company_name = db.Column(db.String(100))
 
+    # The url identifies an offer, sending it again updates it
+    __table_args__ = (db.Index('ix_job_offer_model_url', 'url', unique = True),)
+
     def __repr__(self):
         return f"Job offer: {job_title}) at {company_title}"
 
@@ -43,12 +65,90 @@ class JobOffer(Resource):
     @marshal_with(resource_fields)
     def put(self):
         args = job_offer_put_args.parse_args()
-        job_offer = JobOfferModel(url = args["url"],job_title = args["job_title"], company_name = args["company_name"] )
-        db.session.add(job_offer)
+        upsert_offers([{"url": args["url"], "job_title": args["job_title"], "company_name": args["company_name"]}])
         db.session.commit()
+        job_offer = JobOfferModel.query.filter_by(url = args["url"]).first()
         return job_offer, 201
 
+"""
+------------- Aim --------------
+Reads the offers sent in the body of a request, either as a JSON array or as NDJSON (one offer per line).
+The NDJSON body is read line by line without being loaded at once.
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(generator)  | offers | Offers sent as dictionaries
+"""
+def read_offers():
+    if request.mimetype in ['application/x-ndjson', 'application/jsonl']:
+        for line in request.stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        body = request.get_json(force = True)
+        for offer in (body if isinstance(body, list) else [body]):
+            yield offer
+
+
+"""
+------------- Aim --------------
+Inserts a chunk of offers, the offers already stored with the same url are updated
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(list)       | offers        | Offers with a url and a job title
+"""
+def upsert_offers(offers):
+    statement = insert(JobOfferModel.__table__)
+    statement = statement.on_conflict_do_update(index_elements = ['url'],
+                                                set_ = {'job_title'   : statement.excluded.job_title,
+                                                        'company_name': statement.excluded.company_name})
+    db.session.execute(statement, offers)
+
+
+class JobOffers(Resource):
+    # Bulk ingestion: all the offers of a request are written in a single transaction
+    def post(self):
+        received, rejected, chunk = 0, 0, []
+        try:
+            for offer in read_offers():
+                received += 1
+                if not isinstance(offer, dict) or not offer.get("url") or not offer.get("job_title"):
+                    rejected += 1
+                    continue
+                chunk.append({"url": offer["url"], "job_title": offer["job_title"], "company_name": offer.get("company_name")})
+                if len(chunk) >= BULK_CHUNK_SIZE:
+                    upsert_offers(chunk)
+                    chunk = []
+            if chunk:
+                upsert_offers(chunk)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(e)
+            return {"message": "Offers not written: " + str(e)}, 400
+        return {"received": received, "written": received - rejected, "rejected": rejected}, 201
+
+
+"""
+------------- Aim --------------
+Creates the tables and the unique index on the url, also on a database created before the index existed
+"""
+def init_database():
+    with app.app_context():
+        db.create_all()
+        # create_all adds the index to a new table only, a former database still lacks it
+        indexed = db.session.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_job_offer_model_url'")).first()
+        if indexed is None:
+            # Offers stored several times by the former PUT: only the last version of each url is kept, once
+            db.session.execute(text("DELETE FROM job_offer_model WHERE id NOT IN (SELECT MAX(id) FROM job_offer_model GROUP BY url)"))
+            db.session.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_job_offer_model_url ON job_offer_model (url)"))
+            db.session.commit()
+
+
 api.add_resource(JobOffer, "/job_offer")
+api.add_resource(JobOffers, "/job_offers")
 
 if __name__ =="__main__":
+    init_database()
     app.run(debug=True)
@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import subprocess
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from lib.job_board import JobBoard
+from lib.program import Program
+from lib.export_stream import RowStream
+from lib.metrics import METRICS
+
+# Runs the real Program / Task / Action / Driver stack against a synthetic job board served locally and
+# stores the throughput of each engine and number of drivers in a JSON file, to compare the versions:
+#   python benchmark.py --offers 200 --engines browser http async --concurrency 1 2 4 --headless
+#   python benchmark.py --pipeline --engines browser --concurrency 4
+#   python benchmark.py --compare "../2. Exports/benchmarks/2023_01_09-15_14-benchmark.json"
+
+BENCHMARK_FOLDER = os.path.join('..', '2. Exports', 'benchmarks')
+ENGINES = ['browser', 'http', 'async']
+# Frequency of the measures of the memory used
+RSS_INTERVAL = 0.2
+
+
+class RssSampler():
+
+    """
+    ------------- Aim --------------
+    Initialize the measure of the peak memory (resident set size) of the benchmark and of the browsers it
+    started. psutil is used if it is installed, /proc otherwise (Linux only).
+    """
+    def __init__(self, interval = RSS_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.peak = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target = self._sample, daemon = True)
+        self._thread.start()
+
+    """
+    ------------- Aim --------------
+    Stops the measure and returns the peak memory in MB, None if it can not be measured
+    """
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return round(self.peak / (1024 * 1024), 1) if self.peak else None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            try:
+                self.peak = max(self.peak, self._rss())
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def _rss(self):
+        if psutil is not None:
+            process = psutil.Process()
+            return sum(child.memory_info().rss for child in [process] + process.children(recursive = True))
+        # Sum of the memory of this process and all its descendants (chromedriver, Chrome)
+        parents = dict()
+        for pid in filter(str.isdigit, os.listdir('/proc')):
+            try:
+                with open(os.path.join('/proc', pid, 'stat')) as file:
+                    parents[int(pid)] = int(file.read().rsplit(')', 1)[1].split()[1])
+            except OSError:
+                continue
+        tree = {os.getpid()}
+        added = True
+        while added:
+            children = {pid for pid, parent in parents.items() if parent in tree} - tree
+            tree |= children
+            added = bool(children)
+        rss = 0
+        for pid in tree:
+            try:
+                with open(os.path.join('/proc', str(pid), 'status')) as file:
+                    rss += next(int(line.split()[1]) * 1024 for line in file if line.startswith('VmRSS:'))
+            except (OSError, StopIteration):
+                continue
+        return rss
+
+
+"""
+------------- Aim --------------
+Runs the benchmark tasks for an engine and a number of drivers against a new job board
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | engine        | Engine of the Scrap multi task: browser, http or async
+(int)        | concurrency   | Number of drivers of the Scrap multi task (window of 4 urls per driver for async)
+(Namespace)  | args          | Arguments of the command line
+(function)   | configure     | Called with the Program before its execution, to change its tasks
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(dict)       | result | Throughput, latency of the actions and peak memory of the run
+"""
+def run_case(engine, concurrency, args, configure = None):
+    board = JobBoard(args.offers, args.per_page, seed = args.seed)
+    board.start()
+    case = engine + '-' + str(concurrency)
+
+    # The journal, the sessions, the rows, the links extracted and the metrics are kept out of the real ones
+    program = Program('benchmark', os.path.join(BENCHMARK_FOLDER, case + '-journal.jsonl'))
+    program.metrics_folder = os.path.join(BENCHMARK_FOLDER, 'metrics')
+    # The urls of the configuration point to the board
+    for task in program.hierarchy.values():
+        for action in task.actions:
+            if isinstance((action.params or {}).get('url'), str):
+                action.params['url'] = action.params['url'].replace('{board}', board.url)
+    program.logins = [{'email': 'benchmark_' + str(i), 'password': ''} for i in range(concurrency)]
+    program.pool.sessions_path = os.path.join(BENCHMARK_FOLDER, 'sessions')
+    rows_path = os.path.join(BENCHMARK_FOLDER, case + '-rows.jsonl')
+    if os.path.exists(rows_path):
+        os.remove(rows_path)
+    program.dataset.variables['page_content'] = RowStream(rows_path)
+    # The links are appended to the file, the ones of a previous benchmark are not loaded again
+    program.dataset.extracted_urls_path = os.path.join(BENCHMARK_FOLDER, case + '-elements_extracted.txt')
+    if os.path.exists(program.dataset.extracted_urls_path):
+        os.remove(program.dataset.extracted_urls_path)
+    scrap_multi = program.hierarchy['Scrap multi'].json_elements
+    scrap_multi['engine'] = engine
+    if args.pipeline:
+        # The offers are scraped while the links are collected
+        program.hierarchy['Driver Multi'].json_elements['depends_on'] = ['Job Search']
+        scrap_multi['streams_from'] = 'Scrap'
+    if engine == 'async':
+        scrap_multi['async'] = {'per_host': concurrency, 'window': 4 * concurrency}
+    if configure is not None:
+        configure(program)
+
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        program.execute(run_background = args.headless)
+    finally:
+        wall = time.perf_counter() - start
+        peak_rss = sampler.stop()
+        program.close()
+        board.stop()
+
+    links = len(program.dataset.variables['urls'])
+    details = program.dataset.variables['url_queue'].finished
+    # Latency of the actions estimated from the histograms of the run (lib/metrics.py)
+    actions = dict()
+    for action_name in sorted({action.name for task in program.hierarchy.values() for action in task.actions}):
+        seconds = METRICS.histogram('action_seconds', action = action_name)
+        if seconds is None:
+            continue
+        round_trips = METRICS.histogram('action_round_trips', action = action_name)
+        actions[action_name] = {'count'           : seconds.count,
+                                'p50_ms'          : round(seconds.quantile(0.5) * 1000, 1),
+                                'p95_ms'          : round(seconds.quantile(0.95) * 1000, 1),
+                                'round_trips_mean': round(round_trips.sum / round_trips.count, 1)}
+    durations = program.task_durations
+    result = {'engine'         : engine,
+              'concurrency'    : concurrency,
+              'pipeline'       : args.pipeline,
+              'offers'         : args.offers,
+              'links'          : links,
+              'details'        : details,
+              'rows'           : len(program.dataset.variables['page_content']),
+              'links_per_min'  : round(links / durations['Scrap'] * 60, 1) if durations.get('Scrap') else None,
+              'details_per_min': round(details / durations['Scrap multi'] * 60, 1) if durations.get('Scrap multi') else None,
+              'wall_s'         : round(wall, 2),
+              'peak_rss_mb'    : peak_rss,
+              'board_requests' : board.requests,
+              'tasks_s'        : {task_name: round(duration, 2) for task_name, duration in durations.items()},
+              'actions'        : actions,
+              'rows_file'      : rows_path if args.keep_rows else None}
+    if not args.keep_rows:
+        for path in [rows_path, program.dataset.extracted_urls_path]:
+            if os.path.exists(path):
+                os.remove(path)
+    return result
+
+
+"""
+------------- Aim --------------
+Prints the evolution of the throughput compared to a previous benchmark file
+"""
+def compare(results, previous_path):
+    with open(previous_path) as file:
+        previous = {(result['engine'], result['concurrency']): result for result in json.load(file)['results']}
+    print('Compared to ' + previous_path + ':')
+    for result in results:
+        before = previous.get((result['engine'], result['concurrency']))
+        if before is None:
+            continue
+        for key in ['links_per_min', 'details_per_min']:
+            if result[key] and before[key]:
+                change = (result[key] - before[key]) / before[key] * 100
+                print('  ' + result['engine'] + ' x' + str(result['concurrency']) + ' ' + key + ': '
+                      + str(before[key]) + ' -> ' + str(result[key]) + ' (' + ('+' if change >= 0 else '') + str(round(change, 1)) + '%)')
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr = subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Throughput benchmark of the scraper against a synthetic job board')
+    parser.add_argument('--offers', type = int, default = 200, help = 'Number of job offers on the board')
+    parser.add_argument('--per-page', type = int, default = 25, help = 'Number of job cards per page of results')
+    parser.add_argument('--engines', nargs = '+', default = ENGINES, choices = ENGINES)
+    parser.add_argument('--concurrency', nargs = '+', type = int, default = [1, 2, 4], help = 'Numbers of drivers')
+    parser.add_argument('--seed', type = int, default = 0, help = 'Seed of the generated offers')
+    parser.add_argument('--headless', action = 'store_true', help = 'Runs Chrome on background')
+    parser.add_argument('--pipeline', action = 'store_true', help = 'Scraps the offers while the links are collected')
+    parser.add_argument('--keep-rows', action = 'store_true', help = 'Keeps the rows scraped in the benchmark folder')
+    parser.add_argument('--compare', default = '', help = 'Previous benchmark file to compare with')
+    args = parser.parse_args()
+
+    os.makedirs(BENCHMARK_FOLDER, exist_ok = True)
+    results = []
+    for engine in args.engines:
+        for concurrency in args.concurrency:
+            print('Benchmark ' + engine + ' with ' + str(concurrency) + ' driver(s)')
+            try:
+                results.append(run_case(engine, concurrency, args))
+            except Exception as e:
+                print(e)
+                print('Benchmark ' + engine + ' with ' + str(concurrency) + ' driver(s) failed')
+
+    report = {'date'      : datetime.now().isoformat(),
+              'commit'    : git_commit(),
+              'python'    : sys.version.split()[0],
+              'platform'  : platform.platform(),
+              'parameters': vars(args),
+              'results'   : results}
+    path = os.path.join(BENCHMARK_FOLDER, str(datetime.now().strftime("%Y_%m_%d-%H_%M")) + '-benchmark.json')
+    with open(path, 'w') as file:
+        json.dump(report, file, indent = 1)
+
+    for result in results:
+        print(result['engine'] + ' x' + str(result['concurrency']) + ': ' + str(result['links_per_min']) + ' links/min, '
+              + str(result['details_per_min']) + ' details/min, peak ' + str(result['peak_rss_mb']) + ' MB')
+    print('Results stored in ' + path)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import argparse
+from collections import Counter
+
+from benchmark import run_case, BENCHMARK_FOLDER
+from lib.action import Action
+from lib.export_stream import RowStream
+
+# Runs the Scrap multi task of the benchmark with the browser engine and with the browserless engines
+# against the same synthetic job board, and checks that they scrap the same rows:
+#   python engine_check.py --engines async http --offers 50 --headless
+# The Get of the task is split in two Gets, a batched one and a field by field one, so that a page
+# read by several Gets is also checked.
+
+ENGINES = ['http', 'async']
+
+
+"""
+------------- Aim --------------
+Splits the Get of the Scrap multi task in two Gets reading half of the fields each
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(Program)    | program       | Program of the benchmark, before its execution
+"""
+def split_get(program):
+    actions = program.hierarchy['Scrap multi'].actions
+    index, get = next((i, action) for i, action in enumerate(actions) if action.to_do == 'Get')
+    half = len(get.params['element_name']) // 2
+    first = Action(get.name, 'Get', {'element_name': get.params['element_name'][:half],
+                                     'attribute'   : get.params['attribute'][:half],
+                                     'batched'     : True})
+    second = Action(get.name + ' (field by field)', 'Get', {'element_name': get.params['element_name'][half:],
+                                                           'attribute'   : get.params['attribute'][half:]})
+    actions[index:index + 1] = [first, second]
+
+
+"""
+------------- Aim --------------
+Runs a case of the benchmark and reads back its rows, sorted so that the order of the drivers does not matter
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | engine        | Engine of the Scrap multi task
+(Namespace)  | args          | Arguments of the command line
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(list)       | rows   | Rows scraped, as JSON lines
+"""
+def engine_rows(engine, args):
+    result = run_case(engine, args.concurrency, args, configure = split_get)
+    rows = RowStream(result['rows_file'])
+    lines = sorted(json.dumps(row, ensure_ascii = False) for row in rows)
+    rows.close()
+    os.remove(result['rows_file'])
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Checks that the browserless engines scrap the rows of the browser engine')
+    parser.add_argument('--offers', type = int, default = 50, help = 'Number of job offers on the board')
+    parser.add_argument('--per-page', type = int, default = 25, help = 'Number of job cards per page of results')
+    parser.add_argument('--engines', nargs = '+', default = ENGINES, choices = ENGINES)
+    parser.add_argument('--concurrency', type = int, default = 2, help = 'Number of drivers')
+    parser.add_argument('--seed', type = int, default = 0, help = 'Seed of the generated offers')
+    parser.add_argument('--headless', action = 'store_true', help = 'Runs Chrome on background')
+    args = parser.parse_args()
+    # Arguments of run_case that the check does not change
+    args.pipeline = False
+    args.keep_rows = True
+
+    os.makedirs(BENCHMARK_FOLDER, exist_ok = True)
+    expected = engine_rows('browser', args)
+    print(str(len(expected)) + ' rows scraped by the browser engine')
+    failed = False
+    for engine in args.engines:
+        rows = engine_rows(engine, args)
+        missing = list((Counter(expected) - Counter(rows)).elements())
+        unexpected = list((Counter(rows) - Counter(expected)).elements())
+        if not missing and not unexpected:
+            print(engine + ': same ' + str(len(rows)) + ' rows')
+            continue
+        failed = True
+        print(engine + ': ' + str(len(rows)) + ' rows, ' + str(len(missing)) + ' rows of the browser missing, '
+              + str(len(unexpected)) + ' rows not scraped by the browser')
+        for row in missing[:3]:
+            print('  browser: ' + row[:300])
+        for row in unexpected[:3]:
+            print('  ' + engine + ': ' + row[:300])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from lib.metrics import METRICS
+
 class Action():
 
     """
@@ -61,16 +63,25 @@ class Action():
     ---------- Parameters ----------
     (TYPE)       | NAME          | DESCRIPTION
     (webdriver)  | driver        | Driver that will execute the action
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if the action succeeded
     """
     def do(self, driver):
         print('Starting ' + self.name + '...')
         try:
-            driver.do(self.to_do, self.params)
+            # Wall time, WebDriver round trips and bytes scraped of the action, per driver
+            with METRICS.measure('action', action = self.name, to_do = self.to_do, driver = getattr(driver, 'account', '')):
+                driver.do(self.to_do, self.params)
             self.done = True
             print('Success: ' + self.name)
+            return True
         except Exception as e:
+            METRICS.inc('action_errors_total', action = self.name)
             print("Error in " + self.name)
             print(e)
+            return False
 
     def _generate_layout(self, function_parameters):
         new_parameter_container_layout = QHBoxLayout()
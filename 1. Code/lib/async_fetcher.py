@@ -0,0 +1,158 @@
+import time
+import asyncio
+
+import aiohttp
+from lxml import html
+
+from lib.driver import WAIT_L
+from lib.http_driver import extract_row, page_bytes
+from lib.url_queue import UrlQueue
+from lib.metrics import METRICS
+
+# Default number of simultaneous connections to a single host
+PER_HOST_LIMIT = 4
+# Default number of urls being fetched at the same time
+IN_FLIGHT_WINDOW = 64
+# Time during which an idle connection is kept alive
+KEEPALIVE_TIMEOUT = 30
+
+
+class AsyncFetcher():
+
+    """
+    ------------- Aim --------------
+    Initialize an asyncio fetcher scraping many pages concurrently without any browser. The rows are
+    added to Dataset.variables['page_content'] exactly as a Driver would do it.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Dataset)    | dataset       | Dataset receiving the scraped rows
+    (SelectorRegistry) | selectors   | Selectors of login.json
+    (int)        | per_host      | Maximum number of simultaneous connections to a host
+    (int)        | window        | Maximum number of urls being fetched at the same time
+    (dict)       | cookies       | Cookies sent with every request (name: value)
+    (dict)       | headers       | Headers sent with every request
+    (PageCache)  | cache         | Pages already downloaded, the pages fetched are added to it
+    """
+    def __init__(self, dataset, selectors, per_host = PER_HOST_LIMIT, window = IN_FLIGHT_WINDOW, cookies = None, headers = None, cache = None):
+        self.dataset = dataset
+        self.selectors = selectors
+        self.per_host = per_host
+        self.window = window
+        self.cookies = cookies or dict()
+        self.headers = headers or dict()
+        self.cache = cache
+
+    """
+    ------------- Aim --------------
+    Initialize a fetcher sharing the session of a Chrome driver already connected
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Chrome driver already connected to the website
+    (int)        | per_host      | Maximum number of simultaneous connections to a host
+    (int)        | window        | Maximum number of urls being fetched at the same time
+    (PageCache)  | cache         | Pages already downloaded
+    """
+    @classmethod
+    def from_driver(cls, driver, per_host = PER_HOST_LIMIT, window = IN_FLIGHT_WINDOW, cache = None):
+        cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+        headers = {'User-Agent': driver.execute_script("return navigator.userAgent;")}
+        return cls(driver.dataset, driver.selectors, per_host, window, cookies, headers, cache)
+
+    """
+    ------------- Aim --------------
+    Scraps every url of a queue until it is exhausted. A url failing is put back on the queue. Each page
+    is fetched once and gives a row per Get of the task, in their order, as the browser engine does.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (UrlQueue)   | url_queue     | Queue of the urls to scrap
+    (list)       | gets          | (element_name, attribute) of each Get: name or list of names of elements
+                 |               | to be scraped on each page, attribute or list of attributes to get
+    """
+    def run(self, url_queue, gets):
+        asyncio.run(self._run(url_queue, gets))
+
+    """
+    ------------- Aim --------------
+    Scraps a list of urls
+
+    ---------- Parameters ----------
+    (TYPE)          | NAME          | DESCRIPTION
+    (iterable)      | urls          | Urls to scrap
+    (list)          | gets          | (element_name, attribute) of each row to get on a page
+
+    ------------ Output ------------
+    (TYPE)       | NAME      | DESCRIPTION
+    (UrlQueue)   | url_queue | Queue used, holding the number of urls scraped and the failed ones
+    """
+    def fetch(self, urls, gets):
+        url_queue = UrlQueue()
+        url_queue.extend(urls)
+        url_queue.close()
+        self.run(url_queue, gets)
+        return url_queue
+
+    async def _run(self, url_queue, gets):
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.window)
+        # The connector keeps the connections alive and caps the connections per host
+        connector = aiohttp.TCPConnector(limit = self.window, limit_per_host = self.per_host,
+                                         keepalive_timeout = KEEPALIVE_TIMEOUT)
+        timeout = aiohttp.ClientTimeout(total = WAIT_L)
+        # unsafe allows cookies for hosts given as an ip address, as a local test server
+        cookie_jar = aiohttp.CookieJar(unsafe = True)
+
+        async with aiohttp.ClientSession(connector = connector, timeout = timeout, cookie_jar = cookie_jar,
+                                         cookies = self.cookies, headers = self.headers) as session:
+            tasks = set()
+            while True:
+                # Wait for a free place in the window before pulling the next url
+                await in_flight.acquire()
+                # next_url blocks while the queue is empty, it must not block the event loop
+                url = await loop.run_in_executor(None, url_queue.next_url)
+                if url is None:
+                    in_flight.release()
+                    break
+                task = asyncio.ensure_future(self._scrap(session, url, url_queue, gets, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+
+    async def _scrap(self, session, url, url_queue, gets, in_flight):
+        # The coroutines share a thread, their measures are observed directly instead of through METRICS.measure
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            # The files and the SQLite index of the cache are read and written out of the event loop
+            cached = await loop.run_in_executor(None, self.cache.get, url, True) if self.cache is not None else None
+            if cached is not None:
+                final_url, content = cached
+            else:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    # The bytes are parsed and cached as downloaded, with the charset of the header (see page_bytes)
+                    content = page_bytes(await response.read(), response.headers.get('Content-Type'))
+                    final_url = str(response.url)
+                if self.cache is not None:
+                    await loop.run_in_executor(None, self.cache.put, url, content, final_url)
+            page = html.fromstring(content, base_url = final_url)
+            rows = [extract_row(page, final_url, element_name, attribute, self.selectors.xpath) for element_name, attribute in gets]
+            # Nothing is awaited between begin and append, no other url of the loop appends a row in between
+            self.dataset.variables['page_content'].begin(url)
+            for row in rows:
+                self.dataset.variables['page_content'].append(row)
+            url_queue.done(url)
+            METRICS.observe('fetch_seconds', time.perf_counter() - start, engine = 'async')
+            METRICS.observe('fetch_bytes', len(content), engine = 'async')
+        except Exception as e:
+            print(e)
+            if url_queue.retry(url):
+                METRICS.inc('url_retries_total', task = 'async', action = 'Get')
+            else:
+                METRICS.inc('url_abandoned_total', task = 'async', action = 'Get')
+                print('Url abandoned: ' + url)
+        finally:
+            in_flight.release()
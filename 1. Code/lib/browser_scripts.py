@@ -0,0 +1,225 @@
+# JavaScript executed in the browser by the Driver through execute_script. Each script does in a single
+# WebDriver round trip what would take one call per element and per attribute from Python.
+
+# Helpers shared by the scripts:
+# findAll: finds the elements of a 'By' enumeration and tag under a root, as find_elements does
+# readValue: reads an attribute the way get_attribute does (property first, then html attribute)
+# clean: removes the characters that can not be exported (same as clean_text in driver.py)
+HELPERS = """
+function findAll(root, by, tag, relative) {
+    if (by === 'xpath') {
+        var found = [];
+        var snapshot = document.evaluate(relative ? '.' + tag : tag, root, null,
+                                         XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            found.push(snapshot.snapshotItem(i));
+        }
+        return found;
+    }
+    var css = tag;
+    if (by === 'class name') {
+        css = '.' + tag.trim();
+    } else if (by === 'id') {
+        css = '[id="' + tag.trim() + '"]';
+    } else if (by === 'name') {
+        css = '[name="' + tag.trim() + '"]';
+    }
+    return Array.prototype.slice.call(root.querySelectorAll(css));
+}
+
+function readValue(element, attribute) {
+    var value = element[attribute];
+    if (value === undefined || value === null || typeof value === 'object' || typeof value === 'function') {
+        value = element.getAttribute(attribute);
+    }
+    return value === null ? null : String(value);
+}
+
+function clean(text) {
+    return text.replace(/[\\uD800-\\uDBFF](?![\\uDC00-\\uDFFF])|(?<![\\uD800-\\uDBFF])[\\uDC00-\\uDFFF]|\\x1f/g, '');
+}
+
+function extractFields(root, fields, relative) {
+    return fields.map(function (field) {
+        if (field === null) {
+            return null;
+        }
+        try {
+            var values = [];
+            var elements = findAll(root, field[0], field[1], relative);
+            for (var i = 0; i < elements.length; i++) {
+                var value = readValue(elements[i], field[2]);
+                // As get_attribute returning None, a missing value makes the whole field fail
+                if (value === null) {
+                    return null;
+                }
+                values.push(clean(value));
+            }
+            return values;
+        } catch (e) {
+            return null;
+        }
+    });
+}
+"""
+
+# arguments[0]: list of [by, tag, attribute], null for an unknown element
+# Returns [current url, values of the first field, values of the second field, ...]
+# where the values of a field are a list of strings, or null if the field could not be read
+BATCH_PAGE_CONTENTS = HELPERS + """
+return [window.location.href].concat(extractFields(document, arguments[0], false));
+"""
+
+# arguments[0]: list of elements, arguments[1]: list of [by, tag, attribute]
+# Returns one list of field values per element, the XPath are evaluated from the element
+BATCH_OBJECT_CONTENTS = HELPERS + """
+var fields = arguments[1];
+return arguments[0].map(function (element) {
+    return extractFields(element, fields, true);
+});
+"""
+
+# Installs once per page the state used by the waits: date of the last DOM mutation and number of
+# XMLHttpRequest / fetch requests still running. The state disappears with the page.
+WAIT_STATE = """
+function waitState() {
+    var state = window.__scraperWaitState;
+    if (state) {
+        return state;
+    }
+    state = window.__scraperWaitState = {pending: 0, last: Date.now()};
+    var touch = function () { state.last = Date.now(); };
+    new MutationObserver(touch).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.pending++;
+        touch();
+        this.addEventListener('loadend', function () { state.pending--; touch(); });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            state.pending++;
+            touch();
+            return fetch.apply(window, arguments).finally(function () { state.pending--; touch(); });
+        };
+    }
+    return state;
+}
+
+function isSettled(quietMs) {
+    var state = waitState();
+    return document.readyState === 'complete' && state.pending <= 0 && Date.now() - state.last >= quietMs;
+}
+
+function countElements(by, tag) {
+    if (by === 'xpath') {
+        return document.evaluate('count(' + tag + ')', document, null, XPathResult.NUMBER_TYPE, null).numberValue;
+    }
+    var css = by === 'class name' ? '.' + tag.trim() : by === 'id' ? '[id="' + tag.trim() + '"]'
+            : by === 'name' ? '[name="' + tag.trim() + '"]' : tag;
+    return document.querySelectorAll(css).length;
+}
+"""
+
+# arguments[0]: quiet period in ms
+# Returns true if the page is loaded, no request is running and the DOM did not change during the quiet period
+PAGE_SETTLED = WAIT_STATE + """
+return isSettled(arguments[0]);
+"""
+
+# arguments[0]: quiet period in ms, arguments[1]: maximum wait in ms,
+# arguments[2]: [by, tag, previous count] to also return as soon as the number of elements changes, or null
+# Returns the time waited in ms (asynchronous script)
+WAIT_FOR_SETTLED = WAIT_STATE + """
+var quietMs = arguments[0], maxMs = arguments[1], count = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+(function check() {
+    var waited = Date.now() - start;
+    var countChanged = count !== null && countElements(count[0], count[1]) !== count[2];
+    if (countChanged || isSettled(quietMs) || waited >= maxMs) {
+        done(waited);
+    } else {
+        setTimeout(check, 25);
+    }
+})();
+"""
+
+# arguments[0]: by, arguments[1]: tag, arguments[2]: attribute to read or null to get the elements,
+# arguments[3]: quiet period in ms, arguments[4]: maximum duration in ms
+# Scrolls the container of the elements chunk by chunk, waiting after each chunk for new elements or for the
+# page to be ready, until the bottom is reached and the number of elements stops growing.
+# Returns the elements found, or the value of the attribute for each of them (asynchronous script)
+LAZY_SCROLL = HELPERS + WAIT_STATE + """
+var by = arguments[0], tag = arguments[1], attribute = arguments[2], quietMs = arguments[3], maxMs = arguments[4];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+
+function scrollContainer(element) {
+    for (var parent = element.parentElement; parent; parent = parent.parentElement) {
+        var overflow = getComputedStyle(parent).overflowY;
+        if ((overflow === 'auto' || overflow === 'scroll') && parent.scrollHeight > parent.clientHeight) {
+            return parent;
+        }
+    }
+    return document.scrollingElement || document.documentElement;
+}
+
+function finish() {
+    var elements = findAll(document, by, tag, false);
+    done(attribute === null ? elements : elements.map(function (element) { return readValue(element, attribute); }));
+}
+
+function waitThen(previousCount, next) {
+    (function check() {
+        if (countElements(by, tag) !== previousCount || isSettled(quietMs) || Date.now() - start >= maxMs) {
+            next();
+        } else {
+            setTimeout(check, 25);
+        }
+    })();
+}
+
+var first = findAll(document, by, tag, false);
+if (first.length === 0) {
+    finish();
+    return;
+}
+var container = scrollContainer(first[0]);
+first[0].scrollIntoView();
+
+(function step() {
+    var previousCount = countElements(by, tag);
+    var previousTop = container.scrollTop;
+    container.scrollTop = previousTop + Math.max(container.clientHeight * 0.8, 200);
+    waitThen(previousCount, function () {
+        var bottomReached = container.scrollTop === previousTop;
+        if (Date.now() - start >= maxMs || (bottomReached && countElements(by, tag) === previousCount)) {
+            finish();
+        } else {
+            step();
+        }
+    });
+})();
+"""
+
+# Returns the content of the localStorage of the current origin as a dict
+READ_LOCAL_STORAGE = """
+var items = {};
+for (var i = 0; i < window.localStorage.length; i++) {
+    var key = window.localStorage.key(i);
+    items[key] = window.localStorage.getItem(key);
+}
+return items;
+"""
+
+# arguments[0]: dict of the items to write in the localStorage of the current origin
+WRITE_LOCAL_STORAGE = """
+var items = arguments[0];
+for (var key in items) {
+    window.localStorage.setItem(key, items[key]);
+}
+"""
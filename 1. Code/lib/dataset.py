@@ -0,0 +1,82 @@
+import os
+import threading
+
+from lib.url_queue import UrlQueue
+from lib.export_stream import EXPORT_FOLDER, LineStream, RowStream
+from lib.seen_index import SeenIndex, SEEN_INDEX_PATH
+
+# Links of the offers found by the Scrap actions, read again by a run starting after them
+EXTRACTED_URLS_PATH = os.path.join(EXPORT_FOLDER, 'elements_extracted.txt')
+
+
+class Dataset():
+    def __init__(self):
+        self.variables = dict()
+        self.variables['urls'] = []
+        # Rows are written to a JSONL file as soon as they are scraped, not kept in memory
+        self.variables['page_content'] = RowStream()
+        # Urls waiting to be loaded by the drivers, shared by all of them
+        self.variables['url_queue'] = UrlQueue()
+        # Text files kept open during the run, by path
+        self.streams = dict()
+        self._streams_lock = threading.Lock()
+        # Offers scraped by the previous runs, opened by the first Scrap action skipping them
+        self.seen_index = None
+        self.seen_index_path = SEEN_INDEX_PATH
+        self.extracted_urls_path = EXTRACTED_URLS_PATH
+
+    def add_inner_variables(self, list_of_variables):
+        for elem in list_of_variables:
+            self.variables[elem] = None
+
+    def get_variable_value(self, var):
+        try:
+            return self.variables[var]
+        except:
+            return None
+
+    def set_variable_value(self, var, value):
+        self.variables[var] = value
+
+    """
+    ------------- Aim --------------
+    Returns the stream appending lines to a text file, opened only once per run
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the text file
+    """
+    def get_stream(self, path):
+        with self._streams_lock:
+            if path not in self.streams:
+                self.streams[path] = LineStream(path)
+            return self.streams[path]
+
+    """
+    ------------- Aim --------------
+    Returns the index of the offers already scraped. Once opened, every url scraped from the url queue
+    is recorded in it.
+    """
+    def get_seen_index(self):
+        with self._streams_lock:
+            if self.seen_index is None:
+                self.seen_index = SeenIndex(self.seen_index_path)
+                if self._mark_seen not in self.variables['url_queue'].on_done:
+                    self.variables['url_queue'].on_done.append(self._mark_seen)
+            return self.seen_index
+
+    def _mark_seen(self, url):
+        self.get_seen_index().mark(url)
+
+    """
+    ------------- Aim --------------
+    Writes every buffered line and row to the disk and closes the files
+    """
+    def close_streams(self):
+        for stream in self.streams.values():
+            stream.close()
+        self.variables['page_content'].close()
+        with self._streams_lock:
+            if self.seen_index is not None:
+                self.seen_index.close()
+                self.seen_index = None
@@ -1,25 +1,54 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 from selenium.webdriver import ActionChains
 
 import os
 import json
-from random import uniform
 import time
 from datetime import datetime
-import pandas as pd
 
 from new_key_enum import Keys_enum
+from lib.browser_scripts import BATCH_PAGE_CONTENTS, BATCH_OBJECT_CONTENTS, LAZY_SCROLL, READ_LOCAL_STORAGE, WRITE_LOCAL_STORAGE
+from lib.waits import Waiter
+from lib.lean_browser import LeanBrowser
+from lib.selector_registry import load_registry
+from lib.export_stream import EXPORT_FOLDER
+from lib.metrics import METRICS, account_id
 
 WAIT_XS = 0.05
 WAIT_S = 0.5
 WAIT_M = 4
 WAIT_L = 10
 
+# Separator between the values of an element found several times on a page
+ELEMENTS_SEPARATOR = " |_/- "
+
+
+"""
+------------- Aim --------------
+Removes the characters that can not be exported from a scraped value
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | text          | Value scraped
+"""
+def clean_text(text):
+    return text.encode("utf-8", "ignore").decode("utf-8").replace("\x1f", "")
+
+
+"""
+------------- Aim --------------
+Concatenates the values of the elements found on a page in a single field of the exported row
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(list)       | found_texts   | Values of the elements found, "-" is returned if it is empty
+"""
+def join_found_elements(found_texts):
+    if found_texts:
+        return ELEMENTS_SEPARATOR.join(found_texts)
+    return "-"
+
 
 class Driver(webdriver.Chrome):
 
@@ -30,8 +59,11 @@ class Driver(webdriver.Chrome):
     ---------- Parameters ----------
     (TYPE)       | NAME           | DESCRIPTION
     (Bool)       | run_background | Decides if the driver is executed on background
+    (dict)       | wait_config    | Configuration of the waits of the website (see lib/waits.py)
+    (Recorder) or (ReplayServer) | archive | Records the pages loaded, or serves them from an archive (see lib/web_archive.py)
+    (dict)       | lean_config    | Resources blocked and features disabled of the website, None to load everything (see lib/lean_browser.py)
     """
-    def __init__(self, email_usr, password, dataset, run_background = False):
+    def __init__(self, email_usr, password, dataset, run_background = False, wait_config = None, archive = None, lean_config = None):
 
         # Initialize the ChromeDriver
         DRIVER_PATH = os.path.join('..', '3. Driver', 'chromedriver.exe') 
@@ -41,12 +73,26 @@ class Driver(webdriver.Chrome):
         if run_background:
             # Run on background (less ressources used)
             options.add_argument("--headless")
+        self.archive = archive
+        if archive is not None:
+            archive.configure(options)
+        self.lean_config = lean_config
+        self.lean = LeanBrowser(lean_config) if lean_config is not None else None
+        if self.lean is not None:
+            self.lean.configure(options)
         # Webdriver.Chrome constructor
         super().__init__(options = options, executable_path = DRIVER_PATH)
+        if archive is not None:
+            archive.attach(self)
+        if self.lean is not None:
+            self.lean.attach(self)
+        # The waits return as soon as the page is ready, the former sleeps are only upper bounds
+        self.waiter = Waiter(self, wait_config)
+        self.set_script_timeout(2 * WAIT_L)
         
-        # Get all the json file elements
-        self.my_by_dict = {'NAME': By.NAME, 'CLASS': By.CLASS_NAME, 'ID': By.ID, 'XPATH': By.XPATH, 'CLASS_NAME': By.CLASS_NAME}
-        self._load_json_elements()
+        # Get all the json file elements, loaded once and shared by all the drivers of the process
+        self.selectors = load_registry()
+        self.page_elements = self.selectors.page_elements
 
         # Map the name called and the functions
         self.function_dict = {'Load'        : self.load_url,
@@ -69,11 +115,18 @@ class Driver(webdriver.Chrome):
         self.elements_object = []
         self.email_usr = email_usr
         self.password  = password
+        # Label of the driver in the metrics, the email being kept out of the exports
+        self.account = account_id(email_usr)
         self.dataset = dataset
+        # Url handed out by the url queue of the dataset, loaded by load_url("")
+        self.queued_url = ""
+        # Pool keeping the driver warm when it is closed, set by the DriverPool
+        self.pool = None
+        self.session_restored = False
 
     """
     ------------- Aim --------------
-    Driver loads a given url.
+    Driver loads a given url. If no url is given, loads the url handed out by the url queue.
 
     ---------- Parameters ----------
     (TYPE)       | NAME          | DESCRIPTION
@@ -81,22 +134,91 @@ class Driver(webdriver.Chrome):
     """
     def load_url(self, url = ""):
         if url == "":
-            self.dataset.variables["urls_index"][0] += 1
-            self.get(self.dataset.variables["urls"][self.dataset.variables["urls_index"][0]])
+            self.get(self.queued_url)
         else: 
             self.get(url)
 
+    """
+    ------------- Aim --------------
+    Closes the driver. A driver of a pool is only given back to the pool to be reused by another task.
+    """
     def close_driver(self):
-        self.close()
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.close()
+
+    """
+    ------------- Aim --------------
+    Saves the cookies and the localStorage of the current website to a file
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the session file
+    """
+    def save_session(self, path):
+        session = {'origin'       : self.execute_script("return window.location.origin;"),
+                   'cookies'      : self.get_cookies(),
+                   'local_storage': self.execute_script(READ_LOCAL_STORAGE),
+                   'saved'        : datetime.now().isoformat()}
+        with open(path, 'w') as file:
+            json.dump(session, file)
+
+    """
+    ------------- Aim --------------
+    Restores the cookies and the localStorage saved by save_session and reloads the website
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the session file
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if a session has been restored
+    """
+    def restore_session(self, path):
+        if not os.path.exists(path):
+            return False
+        with open(path) as file:
+            session = json.load(file)
+        if not session.get('origin', '').startswith('http'):
+            return False
+
+        # Cookies can only be added for the website currently loaded
+        self.get(session['origin'])
+        for cookie in session['cookies']:
+            if cookie.get('sameSite') not in ['Strict', 'Lax', 'None']:
+                cookie.pop('sameSite', None)
+            if 'expiry' in cookie:
+                cookie['expiry'] = int(cookie['expiry'])
+            try:
+                self.add_cookie(cookie)
+            except Exception:
+                # Cookie of another domain
+                pass
+        self.execute_script(WRITE_LOCAL_STORAGE, session.get('local_storage', {}))
+        self.refresh()
+        self.session_restored = True
+        return True
+
+    """
+    ------------- Aim --------------
+    Verify if an element is on the current page, waiting at most until the page is ready
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | element_name  | Name of the element
+    """
+    def is_present(self, element_name):
+        enum, tag = self._send_elements_info(element_name)
+        return self.waiter.element('Session', enum, tag)
 
     """
     ------------- Aim --------------
-    Load page elements from login.json
+    Returns the html of the current page, as modified by the previous actions
     """
-    def _load_json_elements(self):
-        f = open(os.path.join('..', '7. Config', 'login.json'))
-        self.page_elements = json.load(f)['page_elements']
-        f.close()
+    def page_html(self):
+        return self.page_source
 
     """
     ------------- Aim --------------
@@ -126,18 +248,56 @@ class Driver(webdriver.Chrome):
     (dict)       | args          | Arguments for the execution
     """
     def do(self, action, args):
-        self.function_dict[action](**args)
+        with METRICS.measure('driver_call', function = action, driver = self.account):
+            self.function_dict[action](**args)
+        if self.archive is not None:
+            self.archive.after_action(self)
+        # A closed driver shows no page
+        if self.lean is not None and action != 'Close':
+            self.lean.after_action(self, self._website_url())
 
     """
     ------------- Aim --------------
-    Returns random value for timeout
+    Sends a command to chromedriver, every call is a round trip counted in the metrics of the action
 
-    ------------ Output ------------
-    (TYPE)       | NAME   | DESCRIPTION
-    (int)        |        | Random int
+    ---------- Parameters ----------
+    (TYPE)       | NAME           | DESCRIPTION
+    (str)        | driver_command | Name of the WebDriver command
+    (dict)       | params         | Parameters of the command
     """
-    def _timeout(self):
-        return uniform(4, 6)
+    def execute(self, driver_command, params = None):
+        METRICS.count('round_trips')
+        METRICS.inc('webdriver_round_trips_total', command = driver_command)
+        return super().execute(driver_command, params)
+
+    """
+    ------------- Aim --------------
+    Loads a url in the browser. While replaying an archive, the url of the replay server is loaded instead.
+    The resources blocked by the lean browser depend on the url of the website, not on the one of the replay.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url to be loaded
+    """
+    def get(self, url):
+        if self.lean is not None:
+            self.lean.before_load(self, url)
+        if self.archive is not None:
+            url = self.archive.local_url(url)
+        super().get(url)
+
+    # Url of the website shown, the one recorded while replaying an archive
+    def _website_url(self):
+        url = self.current_url
+        if hasattr(self.archive, 'original_url'):
+            return self.archive.original_url(url) or url
+        return url
+
+    # Values read on the page, with the urls of the replay server changed back to the recorded ones
+    def _website_values(self, values):
+        if not hasattr(self.archive, 'original_text'):
+            return values
+        return [self.archive.original_text(value) if isinstance(value, str) else value for value in values]
 
     """
     ------------- Aim --------------
@@ -162,11 +322,7 @@ class Driver(webdriver.Chrome):
     def wait(self, element_name):
         # get the enum and tag for the element
         enum, tag = self._send_elements_info(element_name)
-        try:
-            element_present = EC.presence_of_element_located((enum, tag))
-            WebDriverWait(self, self._timeout()).until(element_present)
-        except TimeoutException:
-            pass
+        self.waiter.element('Wait', enum, tag)
 
     """
     ------------- Aim --------------
@@ -232,11 +388,11 @@ class Driver(webdriver.Chrome):
 
             if wait_for_element != '':
                 self.wait(wait_for_element)
-            time.sleep(WAIT_S)
+            self.waiter.settle('Click', WAIT_S)
         except Exception as e:
             if error_handling:
                 self.refresh()
-                self.force_sleep(5)
+                self.waiter.settle('Click', 5)
                 self.clickButton(element_name)
             else:
                 print(e)
@@ -244,29 +400,29 @@ class Driver(webdriver.Chrome):
     
     """
     ------------- Aim --------------
-    Export data to a given file. If data is not specified, exports the scraped page content
+    Export data to a given file. If data is not specified, exports the scraped page content: the rows
+    already streamed to the JSONL file of the run are converted to a CSV file, and to an Excel file if asked.
 
     ---------- Parameters ----------
     (TYPE)       | NAME      | DESCRIPTION
     (str)        | path      | Name of the export file
-    (list)       | data      | Data to be exported
+    (list)       | data      | Data to be appended to the file kept open for the run
+    (list)       | columns   | Names of the columns of the export
+    (bool)       | excel     | Also converts the rows to an Excel file
     """
-    def export_data(self, path, data = None, columns = []):
+    def export_data(self, path, data = None, columns = [], excel = True):
         try:
             if data is not None:
-                with open(path, 'a+') as file:
-                    for row in data:
-                        file.write(str(row) + '\n')
+                self.dataset.get_stream(path).write_lines(data)
             else:
-                # TODO à refaire
-                filename = os.path.join('..', '2. Exports', '1. Export scraper', str(datetime.now().strftime("%Y_%m_%d-%H_%M")) + '-' + path + '.xlsx')
+                rows = self.dataset.variables['page_content']
+                rows.flush()
+                filename = os.path.join(EXPORT_FOLDER, str(datetime.now().strftime("%Y_%m_%d-%H_%M")) + '-' + path)
                 print(filename)
-                if not columns:
-                    export_df = pd.DataFrame(self.dataset.variables['page_content'])
-                else:
-                    export_df = pd.DataFrame(self.dataset.variables['page_content'], columns = columns)
-                print(export_df.columns)
-                export_df.to_excel(filename)
+                print(str(len(rows)) + ' rows streamed to ' + rows.path)
+                rows.to_csv(filename + '.csv', columns)
+                if excel:
+                    rows.to_excel(filename + '.xlsx', columns)
         except Exception as e:
             print(e)
     
@@ -284,12 +440,16 @@ class Driver(webdriver.Chrome):
     (str)           | element_name        | Element to reach on the page as it is defined in the json file
     (str) or (list) | attribute_to_get    | Element to get on the page specified 
     (str)           | password_user       | User's password to connect to LinkedIn
+    (bool)          | skip_seen           | Skips the offers already scraped by a previous run
+    (bool)          | stop_when_seen      | Stops on the first page where every offer was already scraped,
+                    |                     | the results being sorted by date
 
     ------------ Output ------------
     (TYPE)          | NAME                | DESCRIPTION
     (webdriver)     | driver              | The Chrome webdriver object logged on LinkedIn.
     """
-    def scrap_element_on_page(self, element_name, attribute_to_get = '', page_locator = '', page_button = '', page_limit = -1, on_error = ''):
+    def scrap_element_on_page(self, element_name, attribute_to_get = '', page_locator = '', page_button = '', page_limit = -1, on_error = '',
+                              skip_seen = False, stop_when_seen = False):
         enum, tag = self._send_elements_info(element_name)
         try:
             page_enum, page_tag = self._send_elements_info(page_locator)
@@ -307,43 +467,38 @@ class Driver(webdriver.Chrome):
         number_of_pages = 40
         for current_page in range(number_of_pages):
             
-            # Scroll to the first element on the list of elements to scrap
-            els = self.find_elements(enum, tag)
-            self.execute_script("arguments[0].scrollIntoView();", els[0])
-            time.sleep(2)
-            current_view = 0
-
-            # Scroll down on the page to let every element appear
-            while current_view != len(els):
-                els = self.find_elements(enum, tag)
-                self.execute_script("arguments[0].scrollIntoView();", els[current_view])
-                current_view += 1
-                time.sleep(WAIT_XS)
-
-            # Scrap all the wanted elements on the page
-            element_scraped = self.find_elements(enum, tag)
-
-            # Extract the attribute from the job offer
-            for sub_part in element_scraped:
-                attribute_data = sub_part.get_attribute(attribute_to_get)
+            # Scroll down on the page to let every element appear and extract the attribute from the job offers
+            for attribute_data in self._website_values(self._lazy_scroll(enum, tag, attribute_to_get)):
                 self.attributes_scraped.add(attribute_data)
 
+            # Offers scraped by the previous runs are not loaded again with skip_seen, stop_when_seen only
+            # uses them to stop the pagination
+            found_on_page = len(self.attributes_scraped)
+            if skip_seen or stop_when_seen:
+                new_urls = self.dataset.get_seen_index().new_urls(self.attributes_scraped)
+                print(str(len(new_urls)) + ' new offers out of ' + str(found_on_page) + ' on page ' + str(current_page + 1))
+                if skip_seen:
+                    self.attributes_scraped = set(new_urls)
+
             # Export data page by page
+            METRICS.count('bytes', sum(len(url.encode('utf-8')) for url in self.attributes_scraped))
             for url in list(self.attributes_scraped):
                 self.dataset.variables["urls"].append(url)
-            self.export_data(os.path.join('..', '2. Exports', '1. Export scraper', 'elements_extracted.txt'), list(self.attributes_scraped))
+            self.dataset.variables["url_queue"].extend(self.attributes_scraped)
+            self.export_data(self.dataset.extracted_urls_path, list(self.attributes_scraped))
             self.attributes_scraped.clear()
             
             # Verify if page limit is reached
             if current_page == page_limit - 1:
                 break
+            # The following pages only hold older offers
+            elif stop_when_seen and found_on_page > 0 and not new_urls:
+                print('Every offer of page ' + str(current_page + 1) + ' was already scraped, pagination stopped')
+                break
             else:
                 next_page_enum, next_page_tag = self._send_elements_info(page_button)
-                if next_page_enum == By.XPATH:
-                    res = next_page_tag.split('|')
-                    new_tag = "//" + res[0] + "[contains(" + res[1] + ", '" + res[2] + str(current_page+2) + "')]"
-                else:
-                    new_tag = next_page_tag
+                # Templated XPath of login.json are filled with the number of the next page
+                new_tag = self.selectors[page_button].page(current_page + 2)
                 
                 try:
                     self.find_element(next_page_enum, new_tag).click()
@@ -351,8 +506,7 @@ class Driver(webdriver.Chrome):
                 except:
                     if on_error != '':
                         print('-----------------------------ERROR--------------------------')
-                        res = on_error.split('|')
-                        new_tag = "//" + res[0] + "[contains(" + res[1] + ", \"" + res[2] + str((current_page+1)*int(res[3])) + "\")]"
+                        new_tag = self.selectors.template(on_error, '"').fill(current_page + 1)
                         print(new_tag)
                         self.get(self.find_element(next_page_enum, new_tag).get_attribute("href"))
                     else:
@@ -366,10 +520,18 @@ class Driver(webdriver.Chrome):
     ---------- Parameters ----------
     (TYPE)          | NAME          | DESCRIPTION
     (str) or (list) | element_name  | Name or list of names of elements to be scraped on current page
+    (str) or (list) | attribute     | Attribute or list of attributes to get for each element
+    (bool)          | batched       | Reads all the elements in the browser in a single call
     """
-    def get_page_contents(self, element_name, attribute):
+    def get_page_contents(self, element_name, attribute, batched = False):
+        if batched and isinstance(element_name, list):
+            page_values = self.execute_script(BATCH_PAGE_CONTENTS, self._batch_fields(element_name, attribute))
+            current_page_element = [page_values[0]] + [self._join_batch_values(values) for values in page_values[1:]]
+            self.dataset.variables['page_content'].append(self._website_values(current_page_element))
+            return
+
         current_page_element = []
-        current_page_element.append(self.current_url)
+        current_page_element.append(self._website_url())
         # Verify if element_name is a list
         # If it is a list, the attribute should be a list too. So, we'll browse them simultaneously
         if isinstance(element_name, list):  
@@ -379,13 +541,9 @@ class Driver(webdriver.Chrome):
                     found_element = self.find_elements(enum, tag)
                     found_elements_text = []
                     for elem in found_element:
-                        found_elements_text.append(elem.get_attribute(attribute[index]).encode("utf-8", "ignore").decode("utf-8").replace("\x1f", ""))
+                        found_elements_text.append(clean_text(elem.get_attribute(attribute[index])))
 
-                    if found_elements_text != []:
-                        concat_elem = " |_/- ".join(found_elements_text)
-                        current_page_element.append(concat_elem)
-                    else:
-                        current_page_element.append("-")
+                    current_page_element.append(join_found_elements(found_elements_text))
 
                 except Exception as e:
                     print(e)
@@ -398,7 +556,7 @@ class Driver(webdriver.Chrome):
                 current_page_element.append(self.find_element(enum, tag))
             except:
                 current_page_element.append("-")
-        self.dataset.variables['page_content'].append(current_page_element)
+        self.dataset.variables['page_content'].append(self._website_values(current_page_element))
 
 
     def get_element_object(self, element_name):
@@ -410,7 +568,25 @@ class Driver(webdriver.Chrome):
             pass
 
 
-    def get_content_from_element_object(self, element_name, attribute):
+    """
+    ------------- Aim --------------
+    Scraps the specified elements inside each object found by get_element_object
+
+    ---------- Parameters ----------
+    (TYPE)          | NAME          | DESCRIPTION
+    (str) or (list) | element_name  | Name or list of names of elements to be scraped in each object
+    (str) or (list) | attribute     | Attribute or list of attributes to get for each element
+    (bool)          | batched       | Reads all the elements of all the objects in a single call
+    """
+    def get_content_from_element_object(self, element_name, attribute, batched = False):
+        if batched and isinstance(element_name, list) and self.elements_object:
+            objects_values = self.execute_script(BATCH_OBJECT_CONTENTS, self.elements_object,
+                                                 self._batch_fields(element_name, attribute))
+            for object_values in objects_values:
+                self.dataset.variables["page_content"].append(self._website_values([self._join_batch_values(values) for values in object_values]))
+            self.elements_object = []
+            return
+
         for object in self.elements_object:
             current_page_element = []
             # Verify if element_name is a list
@@ -423,11 +599,7 @@ class Driver(webdriver.Chrome):
                         found_elements_text = []
                         for elem in found_element:
                             found_elements_text.append(elem.get_attribute(attribute[index]))
-                        if found_elements_text:      
-                            concat_elem = " |_/- ".join(found_elements_text)
-                            current_page_element.append(concat_elem)
-                        else:
-                            current_page_element.append("-")
+                        current_page_element.append(join_found_elements(found_elements_text))
 
                     except Exception as e:
                         print(e)
@@ -440,7 +612,7 @@ class Driver(webdriver.Chrome):
                     current_page_element.append(object.find_element(enum, tag))
                 except:
                     current_page_element.append("-")
-            self.dataset.variables["page_content"].append(current_page_element)
+            self.dataset.variables["page_content"].append(self._website_values(current_page_element))
         # TODO A refaire
         self.elements_object = []
 
@@ -448,22 +620,67 @@ class Driver(webdriver.Chrome):
 
     """
     ------------- Aim --------------
-    Scroll on page until an element is reached
+    Scroll on page until every element is loaded
     """
     def _scroll_on_page(self, element_name):
-        # Scroll to the first element on the list of elements to scrap
         enum, tag = self._send_elements_info(element_name)
-        els = self.find_elements(enum, tag)
-        self.execute_script("arguments[0].scrollIntoView();", els[0])
-        time.sleep(WAIT_S)
-        current_view = 0
+        self._lazy_scroll(enum, tag)
+
+    """
+    ------------- Aim --------------
+    Scrolls the container of the elements chunk by chunk in the browser until the number of elements
+    stops growing, in a single call
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (enum)       | enum          | 'By' enumeration of the elements
+    (str)        | tag           | Tag of the elements
+    (str)        | attribute     | Attribute to read on each element, the elements are returned if not specified
 
-        # Scroll down on the page to let every element appear
-        while current_view != len(els):
-            els = self.find_elements(enum, tag)
-            self.execute_script("arguments[0].scrollIntoView();", els[current_view])
-            current_view += 1
-            time.sleep(WAIT_XS)
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       |        | Elements found or value of the attribute for each of them
+    """
+    def _lazy_scroll(self, enum, tag, attribute = None):
+        return self.execute_async_script(LAZY_SCROLL, enum, tag, attribute or None,
+                                         self.waiter.config['quiet_ms'], WAIT_L * 1000)
+
+    """
+    ------------- Aim --------------
+    Lists the 'By' enumeration, tag and attribute of each element for the batched scripts
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | element_name  | Names of the elements to be scraped
+    (list)       | attribute     | Attribute to get for each element
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       | fields | [enum, tag, attribute] for each element, None if the element is unknown
+    """
+    def _batch_fields(self, element_name, attribute):
+        fields = []
+        for index, element_on_page in enumerate(element_name):
+            try:
+                enum, tag = self._send_elements_info(element_on_page)
+                fields.append([enum, tag, attribute[index]])
+            except Exception as e:
+                print(e)
+                fields.append(None)
+        return fields
+
+    """
+    ------------- Aim --------------
+    Concatenates the values of a field returned by a batched script, "-" if the field could not be read
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | values        | Values of the field, None if it could not be read
+    """
+    def _join_batch_values(self, values):
+        if values is None:
+            return "-"
+        return join_found_elements(values)
 
     """
     ------------- Aim --------------
@@ -479,6 +696,4 @@ class Driver(webdriver.Chrome):
     (str)        | tag    | HTML tag of the given element
     """
     def _send_elements_info(self, element_name):
-        tag  = self.page_elements[element_name]['tag']
-        enum = self.my_by_dict[self.page_elements[element_name]['enum']]
-        return enum, tag
\ No newline at end of file
+        return self.selectors.info(element_name)
\ No newline at end of file
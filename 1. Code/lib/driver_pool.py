@@ -0,0 +1,133 @@
+import os
+import threading
+
+from lib.driver import Driver
+from lib.metrics import account_id
+
+SESSIONS_PATH = os.path.join('..', '7. Config', 'sessions')
+
+
+class DriverPool():
+
+    """
+    ------------- Aim --------------
+    Initialize a pool of Chrome drivers kept warm between the tasks. The session (cookies and localStorage)
+    of each account is saved on disk and restored when a new driver is started for this account, so the
+    Connect tasks can be skipped while the session is still valid.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | sessions_path | Folder of the session files
+    """
+    def __init__(self, sessions_path = SESSIONS_PATH):
+        self.sessions_path = sessions_path
+        self.idle = dict()
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    """
+    ------------- Aim --------------
+    Returns a driver for an account: an idle driver of the pool if there is one, a new driver with the
+    saved session of the account otherwise
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME           | DESCRIPTION
+    (str)        | email_usr      | Email of the account
+    (str)        | password       | Password of the account
+    (Dataset)    | dataset        | Dataset of the Program
+    (Bool)       | run_background | Decides if the driver is executed on background
+    (dict)       | wait_config    | Configuration of the waits of the website
+    (Recorder) or (ReplayServer) | archive | Records the pages loaded, or serves them from an archive
+    (dict)       | lean_config    | Resources blocked and features disabled of the website
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (Driver)     | driver | Driver of the account
+    """
+    def acquire(self, email_usr, password, dataset, run_background = False, wait_config = None, archive = None, lean_config = None):
+        with self._lock:
+            idle_drivers = self.idle.get(email_usr, [])
+            # Only a driver recording or replaying the same archive, and started with the same features, can be reused
+            for driver in [driver for driver in idle_drivers if driver.archive is archive and driver.lean_config == lean_config]:
+                idle_drivers.remove(driver)
+                if self._is_alive(driver):
+                    driver.dataset = dataset
+                    # The browser kept its cookies: the tasks with skip_if_present check if it is still logged in
+                    driver.session_restored = True
+                    return driver
+                self.drivers.remove(driver)
+
+        driver = Driver(email_usr, password, dataset, run_background, wait_config, archive, lean_config)
+        driver.pool = self
+        # The real sessions are not used while replaying an archive
+        if not self._replaying(driver):
+            try:
+                driver.restore_session(self._session_file(email_usr))
+            except Exception as e:
+                print(e)
+                print('Impossible to restore the session of ' + email_usr)
+        with self._lock:
+            self.drivers.append(driver)
+        return driver
+
+    """
+    ------------- Aim --------------
+    Gives a driver back to the pool, its session is saved and it stays open for the next task
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Driver released
+    """
+    def release(self, driver):
+        self.save_session(driver)
+        with self._lock:
+            idle_drivers = self.idle.setdefault(driver.email_usr, [])
+            if driver not in idle_drivers:
+                idle_drivers.append(driver)
+
+    """
+    ------------- Aim --------------
+    Saves the session of a driver in the session file of its account
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Driver connected to the website
+    """
+    def save_session(self, driver):
+        if self._replaying(driver):
+            return
+        try:
+            os.makedirs(self.sessions_path, exist_ok = True)
+            driver.save_session(self._session_file(driver.email_usr))
+        except Exception as e:
+            print(e)
+            print('Impossible to save the session of ' + driver.email_usr)
+
+    """
+    ------------- Aim --------------
+    Saves the sessions and quits all the drivers of the pool
+    """
+    def shutdown(self):
+        with self._lock:
+            drivers, self.drivers, self.idle = self.drivers, [], dict()
+        for driver in drivers:
+            if self._is_alive(driver):
+                self.save_session(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _is_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _replaying(self, driver):
+        return getattr(driver.archive, 'replaying', False)
+
+    def _session_file(self, email_usr):
+        # The email is hashed to keep it out of the file names
+        return os.path.join(self.sessions_path, account_id(email_usr) + '.json')
@@ -0,0 +1,196 @@
+import os
+import csv
+import json
+import time
+import uuid
+import threading
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from lib.metrics import METRICS
+
+EXPORT_FOLDER = os.path.join('..', '2. Exports', '1. Export scraper')
+# Number of rows kept in memory before being written to the file
+BUFFER_ROWS = 50
+# Maximum number of seconds a row stays in memory before being written to the file
+FLUSH_INTERVAL = 5
+# Minimum number of seconds between two synchronisations of the file on the disk
+FSYNC_INTERVAL = 10
+
+
+class LineStream():
+
+    """
+    ------------- Aim --------------
+    Initialize a text file kept open during the whole run, lines being appended with a bounded buffer.
+    The file is synchronised on the disk periodically so a crash loses at most a few lines.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME           | DESCRIPTION
+    (str)        | path           | Path of the file, opened in append mode at the first write
+    (int)        | buffer_rows    | Number of lines kept in memory before being written
+    (float)      | flush_interval | Maximum number of seconds a line stays in memory
+    (float)      | fsync_interval | Minimum number of seconds between two synchronisations on the disk
+    (function)   | before_flush   | Called before the lines are written, e.g. to write another file first
+    """
+    def __init__(self, path, buffer_rows = BUFFER_ROWS, flush_interval = FLUSH_INTERVAL, fsync_interval = FSYNC_INTERVAL, before_flush = None):
+        self.path = path
+        self.before_flush = before_flush
+        self.buffer_rows = buffer_rows
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self._buffer = []
+        self._file = None
+        self._last_flush = time.time()
+        self._last_fsync = time.time()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.written + len(self._buffer)
+
+    """
+    ------------- Aim --------------
+    Appends lines to the file
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (iterable)   | lines         | Lines to append, without their line break
+    """
+    def write_lines(self, lines):
+        with self._lock:
+            self._buffer += [str(line) for line in lines]
+            if len(self._buffer) >= self.buffer_rows or time.time() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    """
+    ------------- Aim --------------
+    Writes the lines kept in memory to the file and synchronises it on the disk
+    """
+    def flush(self):
+        with self._lock:
+            self._flush(force_fsync = True)
+
+    """
+    ------------- Aim --------------
+    Writes the lines kept in memory and closes the file
+    """
+    def close(self):
+        with self._lock:
+            self._flush(force_fsync = True)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _flush(self, force_fsync = False):
+        self._last_flush = time.time()
+        if self._buffer:
+            if self.before_flush is not None:
+                self.before_flush()
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok = True)
+                self._file = open(self.path, 'a', encoding = 'utf-8')
+            self._file.write(''.join(line + '\n' for line in self._buffer))
+            self.written += len(self._buffer)
+            self._buffer = []
+        if self._file is not None:
+            self._file.flush()
+            if force_fsync or time.time() - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = time.time()
+
+
+class RowStream(LineStream):
+
+    """
+    ------------- Aim --------------
+    Initialize the rows scraped during a run, written to a JSONL file as soon as they are scraped
+    instead of being kept in memory. It replaces the list Dataset.variables['page_content']: the
+    drivers append their rows and the Export action converts the file at the end of the run.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the JSONL file, a file named after the date of the run if empty
+    """
+    def __init__(self, path = '', **kwargs):
+        if not path:
+            # The runs started in the same second (e.g. several Programs) never share their file
+            path = os.path.join(EXPORT_FOLDER, str(datetime.now().strftime("%Y_%m_%d-%H_%M_%S")) + '-' + uuid.uuid4().hex[:8] + '-page_content.jsonl')
+        super().__init__(path, **kwargs)
+
+    """
+    ------------- Aim --------------
+    Appends a scraped row to the file
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | row           | Values scraped on a page
+    """
+    def append(self, row):
+        line = json.dumps(row, ensure_ascii = False)
+        METRICS.count('bytes', len(line.encode('utf-8')))
+        self.write_lines([line])
+
+    # Url whose rows the current thread appends next, only used by the rows of a sharded run (lib/sharding.py)
+    def begin(self, url):
+        pass
+
+    """
+    ------------- Aim --------------
+    Reads back the rows of the file one by one, the rows are never loaded all at once
+    """
+    def __iter__(self):
+        self.flush()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding = 'utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    # A line cut by a crash is ignored
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    """
+    ------------- Aim --------------
+    Converts the rows to a CSV file
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the CSV file
+    (list)       | columns       | Names of the columns, numbered if empty
+    """
+    def to_csv(self, path, columns = []):
+        with open(path, 'w', newline = '', encoding = 'utf-8') as file:
+            writer = csv.writer(file)
+            for row in self._table(columns):
+                writer.writerow(row)
+
+    """
+    ------------- Aim --------------
+    Converts the rows to an Excel file with the layout of pandas.DataFrame.to_excel (index in the first
+    column). The workbook is written in write-only mode so the rows are not all kept in memory.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the Excel file
+    (list)       | columns       | Names of the columns, numbered if empty
+    """
+    def to_excel(self, path, columns = []):
+        workbook = Workbook(write_only = True)
+        sheet = workbook.create_sheet('Sheet1')
+        for row in self._table(columns):
+            sheet.append(row)
+        workbook.save(path)
+
+    def _table(self, columns):
+        if not columns:
+            # As a DataFrame, the columns are numbered up to the longest row
+            width = max((len(row) for row in self), default = 0)
+            columns = list(range(width))
+        yield [None] + list(columns)
+        for index, row in enumerate(self):
+            yield [index] + list(row) + [None] * (len(columns) - len(row))
@@ -0,0 +1,345 @@
+import os
+import time
+import sqlite3
+import threading
+from multiprocessing.managers import BaseManager
+
+# Status of the urls of the frontier
+PENDING = 0
+LEASED = 1
+DONE = 2
+FAILED = 3
+# Seconds after which a url leased by a worker which did not report it is handed out again
+LEASE_SECONDS = 300
+# Seconds between two requests of a worker waiting for new urls
+POLL_INTERVAL = 1
+
+
+class Frontier():
+
+    """
+    ------------- Aim --------------
+    Initialize the frontier of a sharded run: the urls to scrap stored in a SQLite file, leased to the
+    worker processes. A url is leased to a single worker at a time and handed out again if the worker
+    does not report it before its lease expires (e.g. the worker crashed). The rows scraped by the workers
+    are written to a single RowStream when they report their urls, so the run has a single export.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the SQLite file
+    (RowStream)  | rows          | Rows of the run, receiving the rows of the workers
+    (int)        | max_retries   | Number of times a failed url is handed out again
+    (float)      | lease_seconds | Seconds after which a url not reported by its worker is handed out again
+    (bool)       | reset         | Forgets the urls of a previous run, otherwise the urls leased are handed out again
+    """
+    def __init__(self, path, rows = None, max_retries = 2, lease_seconds = LEASE_SECONDS, reset = True):
+        self.path = path
+        self.rows = rows
+        self.max_retries = max_retries
+        self.lease_seconds = lease_seconds
+        self.closed = False
+        # Functions called with each url scraped by a worker, e.g. to record it in the seen offers index
+        self.on_done = []
+
+        if reset and os.path.exists(path):
+            os.remove(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread = False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, status INTEGER, worker TEXT, lease_until REAL, attempts INTEGER)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_urls_status ON urls (status)")
+        self._connection.execute("UPDATE urls SET status = ? WHERE status = ?", (PENDING, LEASED))
+        self._connection.commit()
+
+    """
+    ------------- Aim --------------
+    Adds urls to the frontier, a url already added is ignored
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | urls          | Urls to be added
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       |        | Urls added
+    """
+    def put(self, urls):
+        added = []
+        with self._lock:
+            for url in urls:
+                cursor = self._connection.execute("INSERT OR IGNORE INTO urls VALUES (?, ?, NULL, 0, 0)", (url, PENDING))
+                if cursor.rowcount:
+                    added.append(url)
+            self._connection.commit()
+        return added
+
+    """
+    ------------- Aim --------------
+    Leases the next urls to a worker
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | worker        | Identifier of the worker
+    (int)        | count         | Maximum number of urls leased
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       | urls   | Urls leased, empty if none is available for now
+    """
+    def lease(self, worker, count = 1):
+        now = time.time()
+        with self._lock:
+            urls = [row[0] for row in self._connection.execute(
+                "SELECT url FROM urls WHERE status = ? OR (status = ? AND lease_until < ?) ORDER BY rowid LIMIT ?",
+                (PENDING, LEASED, now, count))]
+            self._connection.executemany("UPDATE urls SET status = ?, worker = ?, lease_until = ? WHERE url = ?",
+                                         [(LEASED, worker, now + self.lease_seconds, url) for url in urls])
+            self._connection.commit()
+        return urls
+
+    """
+    ------------- Aim --------------
+    Marks a url as scraped by a worker and writes the rows the worker scraped on it
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | worker        | Identifier of the worker
+    (str)        | url           | Url scraped
+    (list)       | scraped       | Rows scraped by the worker on this url
+    """
+    def done(self, worker, url, scraped = []):
+        with self._lock:
+            cursor = self._connection.execute("UPDATE urls SET status = ?, worker = ? WHERE url = ? AND status != ?", (DONE, worker, url, DONE))
+            self._connection.commit()
+            first_report = cursor.rowcount > 0
+            # A url reported again after its lease expired is already exported
+            if first_report and self.rows is not None:
+                for row in scraped:
+                    self.rows.append(row)
+        if first_report:
+            for hook in self.on_done:
+                try:
+                    hook(url)
+                except Exception as e:
+                    print(e)
+
+    """
+    ------------- Aim --------------
+    Puts a url back in the frontier after a failure of a worker
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if the url will be retried, False if it is abandoned
+    """
+    def retry(self, worker, url):
+        with self._lock:
+            attempts = self._connection.execute("SELECT attempts FROM urls WHERE url = ?", (url,)).fetchone()
+            attempts = (attempts[0] if attempts else 0) + 1
+            status = FAILED if attempts > self.max_retries else PENDING
+            self._connection.execute("UPDATE urls SET status = ?, attempts = ?, worker = ? WHERE url = ?", (status, attempts, worker, url))
+            self._connection.commit()
+        return status == PENDING
+
+    """
+    ------------- Aim --------------
+    Tells the workers that no new url will be added, they stop once every url is scraped
+    """
+    def close(self):
+        self.closed = True
+
+    """
+    ------------- Aim --------------
+    True once the frontier is closed and every url is scraped or abandoned
+    """
+    def exhausted(self):
+        if not self.closed:
+            return False
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM urls WHERE status IN (?, ?) LIMIT 1", (PENDING, LEASED)).fetchone() is None
+
+    """
+    ------------- Aim --------------
+    Returns the number of urls per status, and the number of urls scraped per worker
+    """
+    def state(self):
+        with self._lock:
+            counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
+            workers = dict(self._connection.execute("SELECT worker, COUNT(*) FROM urls WHERE status = ? GROUP BY worker", (DONE,)).fetchall())
+        return {'closed' : self.closed,
+                'pending': counts.get(PENDING, 0),
+                'leased' : counts.get(LEASED, 0),
+                'done'   : counts.get(DONE, 0),
+                'failed' : counts.get(FAILED, 0),
+                'workers': workers}
+
+    def shutdown(self):
+        with self._lock:
+            self._connection.close()
+
+
+class FrontierQueue():
+
+    """
+    ------------- Aim --------------
+    Initialize a url queue reading and writing the urls of a frontier, local or served by a coordinator.
+    It replaces Dataset.variables['url_queue'] (see lib/url_queue.py for the methods) so the tasks run
+    unchanged in the coordinator and in the workers.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Frontier)   | frontier      | Frontier, or its proxy in a worker
+    (str)        | worker        | Identifier of the process
+    (ShardRows)  | rows          | Rows scraped by the worker, sent with the urls reported
+    (bool)       | owner         | True for the coordinator: closing the queue closes the frontier
+    """
+    def __init__(self, frontier, worker, rows = None, owner = False, poll_interval = POLL_INTERVAL):
+        self.frontier = frontier
+        self.worker = worker
+        self.rows = rows
+        self.owner = owner
+        self.poll_interval = poll_interval
+        self.max_retries = frontier.max_retries if owner else 0
+        self.failed = []
+        self.on_put = []
+        self.on_done = []
+        self._finished = 0
+        self._lock = threading.Lock()
+        # The urls scraped by the workers are recorded by the coordinator as if it scraped them
+        if owner:
+            frontier.on_done.append(lambda url: self._call_hooks(self.on_done, url))
+
+    def put(self, url):
+        return self.extend([url]) > 0
+
+    def extend(self, urls):
+        added = self.frontier.put([str(url).strip() for url in urls if url])
+        for url in added:
+            self._call_hooks(self.on_put, url)
+        return len(added)
+
+    # The frontier already knows the urls scraped by the previous runs
+    def exclude(self, urls):
+        pass
+
+    # The frontier is bounded by the number of workers leasing its urls
+    def bound(self, max_pending):
+        pass
+
+    """
+    ------------- Aim --------------
+    Closes the frontier when called by the coordinator, a worker never closes it
+    """
+    def close(self):
+        if self.owner:
+            self.frontier.close()
+
+    """
+    ------------- Aim --------------
+    Leases the next url of the frontier, waits while the frontier is empty but still fed
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (str)        | url    | Url to load, None when the frontier is exhausted
+    """
+    def next_url(self):
+        while True:
+            urls = self.frontier.lease(self.worker, 1)
+            if urls:
+                # The rows appended by the thread of the driver are the ones of this url
+                if self.rows is not None:
+                    self.rows.begin(urls[0])
+                return urls[0]
+            if self.frontier.exhausted():
+                return None
+            time.sleep(self.poll_interval)
+
+    def done(self, url):
+        # The rows are sent with their url, a url reported is never lost by a crash of the worker
+        scraped = self.rows.take(url) if self.rows is not None else []
+        self.frontier.done(self.worker, url, scraped)
+        with self._lock:
+            self._finished += 1
+        if not self.owner:
+            self._call_hooks(self.on_done, url)
+
+    def retry(self, url):
+        if self.rows is not None:
+            self.rows.discard(url)
+        requeued = self.frontier.retry(self.worker, url)
+        if not requeued:
+            self.failed.append(url)
+        return requeued
+
+    @property
+    def fed(self):
+        # The workers never read the urls exported by a previous run, the coordinator feeds the frontier
+        if not self.owner:
+            return True
+        state = self.frontier.state()
+        return state['pending'] + state['leased'] + state['done'] + state['failed'] > 0
+
+    @property
+    def finished(self):
+        with self._lock:
+            return self._finished
+
+    def _call_hooks(self, hooks, url):
+        for hook in hooks:
+            try:
+                hook(url)
+            except Exception as e:
+                print(e)
+
+    def __len__(self):
+        return self.frontier.state()['pending']
+
+
+class FrontierManager(BaseManager):
+    pass
+
+
+"""
+------------- Aim --------------
+Serves a frontier on a socket, the workers of this host or of other hosts connect to it with connect_frontier
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(Frontier)   | frontier      | Frontier of the coordinator
+(str)        | host          | Interface listening, 0.0.0.0 to accept the workers of other hosts
+(int)        | port          | Port of the server, any free port if 0
+(bytes)      | authkey       | Key the workers must give to connect
+
+------------ Output ------------
+(TYPE)       | NAME    | DESCRIPTION
+(Server)     | server  | Server, stopped by stop_frontier
+(tuple)      | address | (host, port) listened
+"""
+def serve_frontier(frontier, host = '127.0.0.1', port = 0, authkey = b''):
+    FrontierManager.register('frontier', callable = lambda: frontier)
+    server = FrontierManager(address = (host, port), authkey = authkey).get_server()
+    # Only the thread accepting the connections is started, serve_forever would exit the process when stopped
+    server.stop_event = threading.Event()
+    threading.Thread(target = server.accepter, daemon = True).start()
+    return server, server.address
+
+
+def stop_frontier(server):
+    server.stop_event.set()
+    server.listener.close()
+
+
+"""
+------------- Aim --------------
+Connects a worker to the frontier served by a coordinator
+
+------------ Output ------------
+(TYPE)       | NAME     | DESCRIPTION
+(Proxy)      | frontier | Proxy calling the methods of the frontier of the coordinator
+"""
+def connect_frontier(address, authkey = b''):
+    FrontierManager.register('frontier')
+    manager = FrontierManager(address = tuple(address), authkey = authkey)
+    manager.connect()
+    return manager.frontier()
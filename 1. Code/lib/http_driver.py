@@ -0,0 +1,224 @@
+import re
+import time
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html
+
+from lib.driver import clean_text, join_found_elements, WAIT_L
+from lib.metrics import METRICS
+
+# Number of connections kept alive by each http driver
+HTTP_POOL_SIZE = 10
+# Attributes read from the text of the element instead of its html attributes
+TEXT_ATTRIBUTES = ['innerText', 'textContent', 'text']
+# Attributes returned as absolute urls, as the browser does
+URL_ATTRIBUTES = ['href', 'src']
+# Byte order mark of utf-8, which lxml prefers to the charset declared in the page
+UTF8_BOM = b'\xef\xbb\xbf'
+CHARSET_PATTERN = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+# Encoding of an XML declaration (<?xml ... encoding="..."?>), ignored by the html parser of lxml
+XML_ENCODING_PATTERN = re.compile(rb"^\s*<\?xml[^>]*encoding=[\"']([\w.:-]+)")
+
+
+"""
+------------- Aim --------------
+Returns the bytes of a downloaded page, to be parsed by lxml and stored in the cache. As in a browser, the
+charset of the Content-Type header wins over the one declared in the page: the page is then stored in
+utf-8 with a byte order mark, as a page only declaring its charset in an XML declaration. Without a
+charset, or if the page can not be decoded with it, the bytes are kept as downloaded and lxml reads the
+charset declared in the page.
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(bytes)      | content       | Body of the response
+(str)        | content_type  | Content-Type header of the response
+"""
+def page_bytes(content, content_type = None):
+    header = CHARSET_PATTERN.search(content_type or '')
+    declaration = XML_ENCODING_PATTERN.search(content[:200])
+    charset = header.group(1) if header else declaration.group(1).decode('ascii') if declaration else None
+    if charset is None or content.startswith(UTF8_BOM):
+        return content
+    try:
+        return UTF8_BOM + content.decode(charset).encode('utf-8')
+    except (LookupError, UnicodeDecodeError):
+        return content
+
+
+"""
+------------- Aim --------------
+Reads an attribute of an element of a parsed html page the way the browser returns it
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(HtmlElement)| element       | Element found on the page
+(str)        | attribute     | Attribute to read
+(str)        | base_url      | Url of the page, used to make the links absolute
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(str)        | value  | Value of the attribute, None if the element does not have it
+"""
+def read_attribute(element, attribute, base_url):
+    if attribute in TEXT_ATTRIBUTES:
+        lines = element.text_content().splitlines()
+        return "\n".join(" ".join(line.split()) for line in lines if line.strip())
+    value = element.get(attribute)
+    if value is not None and attribute in URL_ATTRIBUTES:
+        value = urljoin(base_url, value)
+    return value
+
+
+"""
+------------- Aim --------------
+Builds the exported row of a parsed html page, the row is the same as the one of a Chrome driver
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(HtmlElement)| page          | Page parsed with lxml
+(str)        | url           | Url of the page, first value of the row
+(list)       | element_name  | Names of the elements to be scraped
+(list)       | attribute     | Attribute to get for each element
+(function)   | xpath_of      | Returns the compiled XPath of an element name (SelectorRegistry.xpath)
+
+------------ Output ------------
+(TYPE)       | NAME                 | DESCRIPTION
+(list)       | current_page_element | Row of the page
+"""
+def extract_row(page, url, element_name, attribute, xpath_of):
+    if not isinstance(element_name, list):
+        element_name, attribute = [element_name], [attribute]
+
+    current_page_element = [url]
+    for index, element_on_page in enumerate(element_name):
+        try:
+            found_elements_text = []
+            for elem in xpath_of(element_on_page)(page):
+                value = read_attribute(elem, attribute[index], url)
+                if value is None:
+                    raise ValueError('No attribute ' + attribute[index] + ' for ' + element_on_page)
+                found_elements_text.append(clean_text(value))
+            current_page_element.append(join_found_elements(found_elements_text))
+        except Exception as e:
+            print(e)
+            current_page_element.append("-")
+    return current_page_element
+
+
+class HttpDriver():
+
+    """
+    ------------- Aim --------------
+    Initialize a driver loading the pages without any browser. It reuses the session of a Chrome
+    driver already connected and evaluates the selectors of login.json on the html received.
+    Actions only needed by a browser (Click, Wait, Scroll) are ignored, the other actions are
+    executed by the Chrome driver.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Chrome driver already connected to the website
+    """
+    def __init__(self, driver):
+        self.driver = driver
+        self.dataset = driver.dataset
+        self.selectors = driver.selectors
+        self.email_usr = driver.email_usr
+        self.account = driver.account
+        self.queued_url = ""
+
+        # Pooled http session sharing the cookies of the browser
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections = HTTP_POOL_SIZE, pool_maxsize = HTTP_POOL_SIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                      domain = cookie.get('domain'), path = cookie.get('path', '/'))
+
+        self.current_url = ""
+        self.page = None
+        self.page_bytes = b""
+
+        # Map the name called and the functions
+        self.function_dict = {'Load'        : self.load_url,
+                              'Get'         : self.get_page_contents,
+                              'Sleep'       : self.force_sleep,
+                              'Click'       : self.ignore,
+                              'Wait'        : self.ignore,
+                              'Scroll'      : self.ignore,
+                              'Close'       : self.close_driver
+                             }
+
+    """
+    ------------- Aim --------------
+    Maps a given action to the corresponding function and executes it with given arguments. Actions
+    which can not be done without a browser are executed by the Chrome driver.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | action        | Action to execute
+    (dict)       | args          | Arguments for the execution
+    """
+    def do(self, action, args):
+        if action in self.function_dict:
+            self.function_dict[action](**args)
+        else:
+            self.driver.do(action, args)
+
+    """
+    ------------- Aim --------------
+    Downloads and parses a given url. If no url is given, loads the url handed out by the url queue.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url to be loaded
+    """
+    def load_url(self, url = ""):
+        if url == "":
+            url = self.queued_url
+        # The pages are recorded or replayed as the ones of the Chrome driver
+        archive = self.driver.archive
+        if archive is not None:
+            url = archive.local_url(url)
+        response = self.session.get(url, timeout = WAIT_L)
+        METRICS.count('round_trips')
+        if archive is not None:
+            archive.record_response(url, response.status_code, response.headers, response.content)
+        response.raise_for_status()
+        self.current_url = response.url
+        self.page_bytes = page_bytes(response.content, response.headers.get('Content-Type'))
+        self.page = html.fromstring(self.page_bytes, base_url = response.url)
+
+    """
+    ------------- Aim --------------
+    Scraps the specified elements on the current page, the row is the same as the one of a Chrome driver
+
+    ---------- Parameters ----------
+    (TYPE)          | NAME          | DESCRIPTION
+    (str) or (list) | element_name  | Name or list of names of elements to be scraped on current page
+    (str) or (list) | attribute     | Attribute or list of attributes to get for each element
+    (bool)          | batched       | No effect, the whole page is already parsed
+    """
+    def get_page_contents(self, element_name, attribute, batched = False):
+        current_page_element = extract_row(self.page, self.current_url, element_name, attribute, self.selectors.xpath)
+        self.dataset.variables['page_content'].append(current_page_element)
+
+    """
+    ------------- Aim --------------
+    Returns the html of the current page, as the bytes parsed
+    """
+    def page_html(self):
+        return self.page_bytes
+
+    def force_sleep(self, duration):
+        time.sleep(duration)
+
+    def ignore(self, **kwargs):
+        pass
+
+    def close_driver(self):
+        self.session.close()
+        self.driver.close_driver()
@@ -0,0 +1,162 @@
+import json
+import random
+import threading
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# Words used to generate the offers
+TITLES = ['Data Analyst', 'Data Engineer', 'Data Scientist', 'Data Consultant', 'BI Developer', 'ML Engineer']
+COMPANIES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises']
+LOCATIONS = ['Brussels', 'Antwerp', 'Ghent', 'Liege', 'Leuven', 'Namur']
+SKILLS = ['Python', 'SQL', 'Power BI', 'Tableau', 'Spark', 'Airflow', 'dbt', 'Azure', 'AWS', 'Excel', 'pandas', 'Docker']
+
+# The html reproduces the elements of login.json used by linkedin.json (job_card, number_of_page, page_button,
+# more_description_button and the elements of the job offer)
+LIST_PAGE = """<html><head><title>Jobs - page {page}</title></head>
+<body>
+<div class="jobs-search-results" id="results" style="height: 600px; overflow-y: auto;"><ul id="cards">{cards}</ul></div>
+<ul class="artdeco-pagination">{pages}</ul>
+<script>
+var remaining = {remaining};
+var container = document.getElementById('results');
+// The cards below the visible ones are only added when the list is scrolled, as on LinkedIn
+container.addEventListener('scroll', function () {{
+    if (remaining.length && container.scrollTop + container.clientHeight >= container.scrollHeight - 50) {{
+        setTimeout(function () {{
+            remaining.splice(0, {lazy_batch}).forEach(function (card) {{
+                document.getElementById('cards').insertAdjacentHTML('beforeend', card);
+            }});
+        }}, {lazy_delay_ms});
+    }}
+}});
+</script>
+</body></html>"""
+
+CARD = """<li style="height: 120px;"><a class="job-card-list__title job-card-container__link" href="/jobs/view/{id}/">{title}</a></li>"""
+
+PAGE_BUTTON = """<li class="artdeco-pagination__indicator--number"><button aria-label="Page {page}" onclick="window.location.href='/jobs?page={page}'">{page}</button></li>"""
+
+DETAIL_PAGE = """<html><head><title>{title}</title></head>
+<body>
+<h1 class="t-24 t-bold jobs-unified-top-card__job-title">{title}</h1>
+<span class="jobs-unified-top-card__company-name">{company}</span>
+<span class="jobs-unified-top-card__bullet">{location}</span>
+<span class="jobs-unified-top-card__posted-date">{posted} days ago</span>
+<span class="jobs-unified-top-card__applicant-count--low t-bold">{candidates} applicants</span>
+<li class="jobs-unified-top-card__job-insight">Full-time</li>
+<li class="jobs-unified-top-card__job-insight">{company_size} employees</li>
+<div class="hirer-card__hirer-information pt3 pb3 t-12 t-black--light"><a class="app-aware-link" href="/in/recruiter-{id}/">Recruiter {id}</a></div>
+<div class="hirer-card__hirer-job-title">Talent Acquisition</div>
+<div id="job-details" class="jobs-unified-description__content" style="max-height: 80px; overflow: hidden;">{description}</div>
+<button class="t-14 artdeco-button--icon-right artdeco-button--3"
+        onclick="document.getElementById('job-details').style.maxHeight = 'none';">See more</button>
+</body></html>"""
+
+
+class JobBoard():
+
+    """
+    ------------- Aim --------------
+    Initialize a synthetic job board served locally, used to measure the scraper without any real website:
+    paginated results with lazy-loaded job cards and job offers matching the elements of login.json
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (int)        | offers        | Number of job offers on the board
+    (int)        | per_page      | Number of job cards per page of results
+    (int)        | lazy_batch    | Number of job cards rendered at first and added at each scroll
+    (int)        | lazy_delay_ms | Delay before the cards are added after a scroll
+    (int)        | port          | Port of the server, any free port if 0
+    (int)        | seed          | Seed of the generated offers, the same seed gives the same board
+    """
+    def __init__(self, offers = 500, per_page = 25, lazy_batch = 7, lazy_delay_ms = 100, port = 0, seed = 0):
+        self.offers = offers
+        self.per_page = per_page
+        self.lazy_batch = lazy_batch
+        self.lazy_delay_ms = lazy_delay_ms
+        self.pages = max(1, -(-offers // per_page))
+        self.seed = seed
+        self.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.url = 'http://127.0.0.1:' + str(self.server.server_address[1])
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    """
+    ------------- Aim --------------
+    Returns the html of a page of results
+    """
+    def list_page(self, page):
+        first = (page - 1) * self.per_page
+        cards = [CARD.format(id = offer_id, title = escape(self._offer(offer_id)['title']))
+                 for offer_id in range(first, min(first + self.per_page, self.offers))]
+        pages = "".join(PAGE_BUTTON.format(page = number) for number in range(1, self.pages + 1))
+        remaining = json.dumps(cards[self.lazy_batch:])
+        return LIST_PAGE.format(page = page, cards = "".join(cards[:self.lazy_batch]), pages = pages, remaining = remaining,
+                                lazy_batch = self.lazy_batch, lazy_delay_ms = self.lazy_delay_ms)
+
+    """
+    ------------- Aim --------------
+    Returns the html of a job offer, None if it does not exist
+    """
+    def detail_page(self, offer_id):
+        if not 0 <= offer_id < self.offers:
+            return None
+        return DETAIL_PAGE.format(id = offer_id, **{key: escape(str(value)) for key, value in self._offer(offer_id).items()})
+
+    def _offer(self, offer_id):
+        generator = random.Random(self.seed * 1000003 + offer_id)
+        skills = generator.sample(SKILLS, 4)
+        return {'title'       : generator.choice(TITLES),
+                'company'     : generator.choice(COMPANIES),
+                'location'    : generator.choice(LOCATIONS),
+                'posted'      : generator.randint(1, 30),
+                'candidates'  : generator.randint(1, 200),
+                'company_size': generator.choice(['11-50', '51-200', '201-500', '1,001-5,000']),
+                'description' : ' '.join('We are looking for a profile mastering ' + skill + ' to join our data team.' for skill in skills) * 5}
+
+    def _respond(self, handler):
+        self.requests += 1
+        parts = urlsplit(handler.path)
+        content = None
+        if parts.path in ['/', '/jobs']:
+            page = int(parse_qs(parts.query).get('page', ['1'])[0])
+            if 1 <= page <= self.pages:
+                content = self.list_page(page)
+        elif parts.path.startswith('/jobs/view/'):
+            try:
+                content = self.detail_page(int(parts.path.strip('/').split('/')[-1]))
+            except ValueError:
+                content = None
+        if content is None:
+            handler.send_error(404)
+            return
+        body = content.encode('utf-8')
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _handler(self):
+        board = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, as a real website
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                board._respond(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
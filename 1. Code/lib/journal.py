@@ -0,0 +1,116 @@
+import os
+import json
+from datetime import datetime
+
+from lib.export_stream import EXPORT_FOLDER, LineStream
+
+
+class RunJournal():
+
+    """
+    ------------- Aim --------------
+    Initialize the journal of the runs of a website: a JSONL file recording the tasks completed, the urls
+    queued and scraped and the file of the scraped rows. It is written through a bounded buffer synchronised
+    periodically, so a run stopped by a crash can be resumed from the last checkpoint.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | website       | Name of the website, as the appdata file
+    (str)        | path          | Path of the journal, in the export folder if empty
+    """
+    def __init__(self, website, path = ''):
+        self.path = path or os.path.join(EXPORT_FOLDER, website + '-journal.jsonl')
+        self._stream = None
+
+    """
+    ------------- Aim --------------
+    Starts the journal of a new run, the journal of the previous run is replaced
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (RowStream)  | rows          | Rows scraped during the run
+    """
+    def start(self, rows):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._open(rows)
+        self._write({'event': 'start', 'page_content': rows.path})
+
+    """
+    ------------- Aim --------------
+    Continues the journal of a run being resumed
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (RowStream)  | rows          | Rows scraped during the run, reopened from the journal
+    """
+    def reopen(self, rows):
+        self.close()
+        self._open(rows)
+        self._write({'event': 'resume'})
+
+    def task_done(self, task_name):
+        self._write({'event': 'task', 'name': task_name})
+        # A task is a checkpoint, it is synchronised on the disk right away
+        if self._stream is not None:
+            self._stream.flush()
+
+    def url_queued(self, url):
+        self._write({'event': 'queued', 'url': url})
+
+    def url_done(self, url):
+        self._write({'event': 'done', 'url': url})
+
+    def finish(self):
+        self._write({'event': 'finished'})
+        self.close()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    """
+    ------------- Aim --------------
+    Reads the journal of the last run
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (dict)       | state  | page_content: path of the rows, tasks: tasks completed, queued: urls queued in order,
+                 |        | done: urls scraped, finished: True if the run ended. None if there is no journal.
+    """
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        state = {'page_content': '', 'tasks': set(), 'queued': dict(), 'done': set(), 'finished': False}
+        with open(self.path, encoding = 'utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut by the crash
+                    continue
+                if entry['event'] == 'start':
+                    state['page_content'] = entry['page_content']
+                elif entry['event'] == 'task':
+                    state['tasks'].add(entry['name'])
+                elif entry['event'] == 'queued':
+                    # A dict keeps the order of the urls without duplicates
+                    state['queued'][entry['url']] = None
+                elif entry['event'] == 'done':
+                    state['done'].add(entry['url'])
+                elif entry['event'] == 'finished':
+                    state['finished'] = True
+        state['queued'] = list(state['queued'])
+        return state
+
+    def _open(self, rows):
+        # The rows are always written before the urls marked as scraped, a url in the journal has its row on the disk
+        self._stream = LineStream(self.path, before_flush = rows.flush)
+
+    def _write(self, entry):
+        # Urls can still be recorded by hooks of the queue when no run is journaled
+        if self._stream is not None:
+            entry['time'] = datetime.now().isoformat()
+            self._stream.write_lines([json.dumps(entry, ensure_ascii = False)])
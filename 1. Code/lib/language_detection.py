@@ -0,0 +1,119 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from langdetect import detect, DetectorFactory
+
+LANGUAGE_CACHE_PATH = os.path.join('..', '2. Exports', 'offer_languages.db')
+# Number of characters of a description given to the detector, enough to identify its language
+SAMPLE_CHARS = 600
+# Number of descriptions detected by a process at once
+CHUNK_SIZE = 250
+# Maximum number of parameters of a single SQLite query
+QUERY_CHUNK_SIZE = 500
+# Names of the languages detected (ISO 639-1) as used by the stopwords and the stemmers of nltk. The
+# offers in Afrikaans and German are mostly Flemish ones, and the Catalan ones French ones.
+NLTK_LANGUAGES = {'ar': 'arabic',  'da': 'danish',  'nl': 'dutch',   'en': 'english', 'fi': 'finnish', 'fr': 'french',
+                  'de': 'dutch',   'af': 'dutch',   'ca': 'french',  'hu': 'hungarian', 'it': 'italian', 'no': 'norwegian',
+                  'pt': 'portuguese', 'ro': 'romanian', 'ru': 'russian', 'es': 'spanish', 'sv': 'swedish'}
+# Language of the descriptions which can not be detected (empty, only numbers) or not supported by nltk
+DEFAULT_LANGUAGE = 'english'
+
+
+"""
+------------- Aim --------------
+Returns the part of a description given to the detector: the spaces are collapsed and the text is cut
+at the last word before SAMPLE_CHARS characters
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | description   | Job description
+(int)        | sample_chars  | Maximum number of characters kept
+"""
+def sample_text(description, sample_chars = SAMPLE_CHARS):
+    text = re.sub(r"\s+", " ", description).strip()
+    if len(text) <= sample_chars:
+        return text
+    return text[:sample_chars].rsplit(' ', 1)[0]
+
+
+def _detect_chunk(texts):
+    # Same results at each run
+    DetectorFactory.seed = 0
+    languages = []
+    for text in texts:
+        try:
+            languages.append(NLTK_LANGUAGES.get(detect(text), DEFAULT_LANGUAGE))
+        except Exception:
+            languages.append(DEFAULT_LANGUAGE)
+    return languages
+
+
+class LanguageDetector():
+
+    """
+    ------------- Aim --------------
+    Initialize the detection of the language of the offers. The languages detected are stored in a SQLite
+    table keyed by a hash of the description, so an offer analyzed again is never detected again.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the SQLite file
+    (int)        | sample_chars  | Number of characters of a description given to the detector
+    (int)        | workers       | Number of processes detecting the new descriptions, one per core if None
+    """
+    def __init__(self, path = LANGUAGE_CACHE_PATH, sample_chars = SAMPLE_CHARS, workers = None):
+        self.path = path
+        self.sample_chars = sample_chars
+        self.workers = workers or os.cpu_count()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread = False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS languages (hash TEXT PRIMARY KEY, language TEXT)")
+        self._connection.commit()
+
+    """
+    ------------- Aim --------------
+    Returns the language of each description, as named by nltk (e.g. english, dutch)
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (iterable)   | descriptions  | Job descriptions
+
+    ------------ Output ------------
+    (TYPE)       | NAME      | DESCRIPTION
+    (list)       | languages | Language of each description, in the same order
+    """
+    def detect(self, descriptions):
+        descriptions = [description if isinstance(description, str) else '' for description in descriptions]
+        hashes = [hashlib.sha1(description.encode('utf-8')).hexdigest() for description in descriptions]
+        known = dict()
+        with self._lock:
+            unique_hashes = list(set(hashes))
+            for start in range(0, len(unique_hashes), QUERY_CHUNK_SIZE):
+                chunk = unique_hashes[start:start + QUERY_CHUNK_SIZE]
+                known.update(self._connection.execute("SELECT hash, language FROM languages WHERE hash IN (" + ','.join('?' * len(chunk)) + ")", chunk))
+
+        new = {h: description for h, description in zip(hashes, descriptions) if h not in known}
+        if new:
+            new_hashes = list(new)
+            texts = [sample_text(new[h], self.sample_chars) for h in new_hashes]
+            chunks = [texts[start:start + CHUNK_SIZE] for start in range(0, len(texts), CHUNK_SIZE)]
+            if self.workers == 1 or len(chunks) == 1:
+                detected = [_detect_chunk(chunk) for chunk in chunks]
+            else:
+                with ProcessPoolExecutor(max_workers = min(self.workers, len(chunks))) as executor:
+                    detected = list(executor.map(_detect_chunk, chunks))
+            languages = [language for chunk in detected for language in chunk]
+            known.update(zip(new_hashes, languages))
+            with self._lock:
+                self._connection.executemany("INSERT OR REPLACE INTO languages VALUES (?, ?)", zip(new_hashes, languages))
+                self._connection.commit()
+        return [known[h] for h in hashes]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
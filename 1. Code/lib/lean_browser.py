@@ -0,0 +1,108 @@
+from fnmatch import fnmatch
+
+# Default configuration of the lean browser, overridden by the "lean" key of the Driver task in the appdata file
+# block_types : types of resources never downloaded (keys of RESOURCE_PATTERNS)
+# block_urls  : patterns of other urls never downloaded, e.g. the images of a website without extension
+# allow_pages : patterns of the pages loaded with every resource, e.g. the login and its security checks
+# flags       : disables the features of Chrome not needed to scrap (LEAN_ARGUMENTS)
+DEFAULT_LEAN_CONFIG = {'block_types': ['image', 'font', 'media', 'tracker'],
+                       'block_urls' : [],
+                       'allow_pages': [],
+                       'flags'      : True}
+# Patterns of the urls of each type of resource, as expected by Network.setBlockedURLs ('*' is a wildcard)
+RESOURCE_PATTERNS = {'image'  : ['*.png', '*.png?*', '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.gif', '*.gif?*',
+                                 '*.webp', '*.webp?*', '*.avif', '*.avif?*', '*.ico', '*.ico?*', '*.svg', '*.svg?*'],
+                     'font'   : ['*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*',
+                                 '*.eot', '*.eot?*', '*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+                     'media'  : ['*.mp4', '*.mp4?*', '*.webm', '*.webm?*', '*.m3u8', '*.m3u8?*', '*.mp3', '*.mp3?*', '*.ogg', '*.ogg?*'],
+                     'tracker': ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+                                 '*connect.facebook.net*', '*hotjar.com*', '*bat.bing.com*', '*scorecardresearch.com*',
+                                 '*quantserve.com*', '*criteo.com*', '*adnxs.com*', '*taboola.com*', '*newrelic.com*', '*nr-data.net*']}
+# Arguments of Chrome disabling the features a scraper never uses
+LEAN_ARGUMENTS = ['--disable-extensions',
+                  '--disable-background-networking',
+                  '--disable-component-update',
+                  '--disable-default-apps',
+                  '--disable-sync',
+                  '--disable-notifications',
+                  '--no-first-run',
+                  '--mute-audio',
+                  '--autoplay-policy=user-gesture-required',
+                  '--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication,InterestFeedContentSuggestions']
+# Preferences of the Chrome profile disabling the notifications and popups
+LEAN_PREFERENCES = {'profile.default_content_setting_values.notifications': 2,
+                    'profile.default_content_setting_values.popups'       : 2,
+                    'profile.default_content_setting_values.geolocation'  : 2}
+
+
+class LeanBrowser():
+
+    """
+    ------------- Aim --------------
+    Initialize the lean profile of a Chrome driver: the images, fonts, media and trackers are blocked by
+    the DevTools protocol (Network.setBlockedURLs) and the features of Chrome not needed are disabled.
+    Nothing is blocked while a page of the allowlist is loaded, so the login and its checks still work.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (dict)       | config        | Configuration overriding DEFAULT_LEAN_CONFIG
+    """
+    def __init__(self, config = None):
+        self.config = dict(DEFAULT_LEAN_CONFIG)
+        self.config.update(config or {})
+        self.blocked_urls = [pattern for resource in self.config['block_types'] for pattern in RESOURCE_PATTERNS[resource]]
+        self.blocked_urls += self.config['block_urls']
+        # Patterns sent to the driver, None before the first page
+        self.current = None
+
+    # Adds the arguments and preferences to the options of a driver, before it starts
+    def configure(self, options):
+        if self.config['flags']:
+            for argument in LEAN_ARGUMENTS:
+                options.add_argument(argument)
+            options.add_experimental_option('prefs', LEAN_PREFERENCES)
+
+    # Enables the network domain of a driver which just started, needed by Network.setBlockedURLs
+    def attach(self, driver):
+        driver.execute_cdp_cmd('Network.enable', {})
+        self._block(driver, self.blocked_urls)
+
+    """
+    ------------- Aim --------------
+    Blocks the resources before a page is loaded, or allows them all if the page is in the allowlist.
+    The patterns are only sent to the driver when they change.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Driver loading the page
+    (str)        | url           | Url of the page
+    """
+    def before_load(self, driver, url):
+        self._block(driver, [] if self._allowed(url) else self.blocked_urls)
+
+    """
+    ------------- Aim --------------
+    Checks the page reached by an action, as a click or a redirect can reach a page of the allowlist (e.g.
+    the security check after the login) without going through Driver.get. A page of the allowlist loaded
+    with its resources blocked is loaded again with every resource, and the resources are blocked again
+    once the browser left the allowlist.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Driver which executed the action
+    (str)        | url           | Url of the website shown by the driver
+    """
+    def after_action(self, driver, url):
+        allowed = self._allowed(url)
+        loaded_blocked = bool(self.current)
+        self._block(driver, [] if allowed else self.blocked_urls)
+        if allowed and loaded_blocked:
+            driver.refresh()
+
+    def _allowed(self, url):
+        return any(fnmatch(url or '', pattern) for pattern in self.config['allow_pages'])
+
+    def _block(self, driver, patterns):
+        if patterns != self.current:
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            self.current = patterns
@@ -0,0 +1,304 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+METRICS_FOLDER = os.path.join('..', '2. Exports', 'metrics')
+# Upper bounds of the buckets of the histograms, per unit of the measure
+BUCKETS = {'seconds'    : [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120],
+           'round_trips': [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+           'bytes'      : [0, 100, 1000, 10000, 100000, 1000000, 10000000]}
+# Values counted by the thread executing an action, added to the histograms of the action at its end
+ACTION_COUNTERS = ['round_trips', 'bytes']
+
+
+"""
+------------- Aim --------------
+Returns the identifier of an account in the metrics and the session files: a hash of its email, so the
+email is never written on disk
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | email_usr     | Email of the account
+"""
+def account_id(email_usr):
+    return hashlib.sha1((email_usr or '').encode("utf-8")).hexdigest()
+
+
+class Histogram():
+
+    """
+    ------------- Aim --------------
+    Initialize a histogram with cumulative buckets, as the ones of Prometheus
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | buckets       | Upper bounds of the buckets, sorted
+    """
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        index = next((index for index, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    """
+    ------------- Aim --------------
+    Estimates a quantile of the values observed by linear interpolation in their bucket (histogram_quantile
+    of Prometheus)
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (float)      | q             | Quantile between 0 and 1
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (float)      |        | Estimated value, None if nothing was observed
+    """
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                if index == len(self.buckets):
+                    # Above the last bucket, the last bound is the best estimate
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def to_dict(self):
+        return {'count' : self.count,
+                'sum'   : self.sum,
+                'p50'   : self.quantile(0.5),
+                'p95'   : self.quantile(0.95),
+                'p99'   : self.quantile(0.99),
+                'bounds': self.buckets,
+                'counts': self.counts}
+
+
+class Metrics():
+
+    """
+    ------------- Aim --------------
+    Initialize the metrics of a run, shared by all the threads of the process: histograms of the wall time,
+    WebDriver round trips and bytes scraped of the actions, tasks and driver functions, and counters (e.g.
+    retries). Every measure is identified by its name and its labels (action, driver, task...).
+    """
+    def __init__(self):
+        self.histograms = dict()
+        self.counters = dict()
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    """
+    ------------- Aim --------------
+    Forgets the measures, called at the start of a run
+    """
+    def reset(self):
+        with self._lock:
+            self.histograms = dict()
+            self.counters = dict()
+            self.started = time.time()
+
+    """
+    ------------- Aim --------------
+    Adds a value to a histogram
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | name          | Name of the histogram, ending by its unit (_seconds, _round_trips, _bytes)
+    (float)      | value         | Value observed
+    (dict)       | labels        | Labels of the value
+    """
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            if key not in self.histograms:
+                unit = next((unit for unit in BUCKETS if name.endswith('_' + unit)), 'seconds')
+                self.histograms[key] = Histogram(BUCKETS[unit])
+            self.histograms[key].observe(value)
+
+    """
+    ------------- Aim --------------
+    Increments a counter
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | name          | Name of the counter, ending by _total
+    (float)      | value         | Increment
+    (dict)       | labels        | Labels of the counter
+    """
+    def inc(self, name, value = 1, **labels):
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    """
+    ------------- Aim --------------
+    Adds a value (round trips, bytes) to the actions being executed by the current thread
+    """
+    def count(self, counter, value = 1):
+        for measures in getattr(self._local, 'stack', []):
+            measures[counter] += value
+
+    """
+    ------------- Aim --------------
+    Measures the wall time of a block of code, and the WebDriver round trips and bytes scraped by the
+    current thread during this block
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | prefix        | Prefix of the histograms, e.g. action gives action_seconds, action_round_trips and action_bytes
+    (dict)       | labels        | Labels of the measures
+    """
+    @contextmanager
+    def measure(self, prefix, **labels):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        measures = dict.fromkeys(ACTION_COUNTERS, 0)
+        self._local.stack.append(measures)
+        start = time.perf_counter()
+        try:
+            yield measures
+        finally:
+            # The measures are nested, the last one opened is the first one closed
+            self._local.stack.pop()
+            self.observe(prefix + '_seconds', time.perf_counter() - start, **labels)
+            for counter in ACTION_COUNTERS:
+                self.observe(prefix + '_' + counter, measures[counter], **labels)
+
+    """
+    ------------- Aim --------------
+    Returns a histogram measured, merged over the labels not given
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | name          | Name of the histogram
+    (dict)       | labels        | Labels the histograms must have
+
+    ------------ Output ------------
+    (TYPE)       | NAME      | DESCRIPTION
+    (Histogram)  | histogram | Histogram of the values, None if nothing was observed
+    """
+    def histogram(self, name, **labels):
+        wanted = {(label, str(label_value)) for label, label_value in labels.items()}
+        merged = None
+        with self._lock:
+            for (histogram_name, histogram_labels), histogram in self.histograms.items():
+                if histogram_name != name or not wanted <= set(histogram_labels):
+                    continue
+                if merged is None:
+                    merged = Histogram(histogram.buckets)
+                merged.counts = [total + count for total, count in zip(merged.counts, histogram.counts)]
+                merged.count += histogram.count
+                merged.sum += histogram.sum
+        return merged
+
+    """
+    ------------- Aim --------------
+    Returns the metrics as a dictionary, to be dumped in JSON
+    """
+    def to_dict(self):
+        with self._lock:
+            return {'started'   : datetime.fromtimestamp(self.started).isoformat(),
+                    'duration_s': time.time() - self.started,
+                    'histograms': [{'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                                   for (name, labels), histogram in sorted(self.histograms.items())],
+                    'counters'  : [{'name': name, 'labels': dict(labels), 'value': value}
+                                   for (name, labels), value in sorted(self.counters.items())]}
+
+    """
+    ------------- Aim --------------
+    Returns the metrics in the text format of Prometheus, to be read by the textfile collector of node_exporter
+    """
+    def to_prometheus(self, prefix = 'scraper_'):
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, labels in self.histograms}):
+                lines.append('# TYPE ' + prefix + name + ' histogram')
+                for (histogram_name, labels), histogram in sorted(self.histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ['+Inf'], histogram.counts):
+                        cumulative += count
+                        lines.append(prefix + name + '_bucket' + _labels(labels + (('le', str(bound)),)) + ' ' + str(cumulative))
+                    lines.append(prefix + name + '_sum' + _labels(labels) + ' ' + repr(float(histogram.sum)))
+                    lines.append(prefix + name + '_count' + _labels(labels) + ' ' + str(histogram.count))
+            for name in sorted({name for name, labels in self.counters}):
+                lines.append('# TYPE ' + prefix + name + ' counter')
+                for (counter_name, labels), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(prefix + name + _labels(labels) + ' ' + str(value))
+        return '\n'.join(lines) + '\n'
+
+    """
+    ------------- Aim --------------
+    Writes the metrics of a run: a JSON file per run and a Prometheus textfile per website, replaced at
+    each run
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | name          | Name of the run, e.g. the website
+    (str)        | folder        | Folder of the files
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (str)        | path   | Path of the JSON file
+    """
+    def export(self, name, folder = METRICS_FOLDER):
+        os.makedirs(folder, exist_ok = True)
+        path = os.path.join(folder, str(datetime.now().strftime("%Y_%m_%d-%H_%M")) + '-' + name + '-metrics.json')
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent = 1)
+        # Written under another name first, the collector never reads a partial file
+        textfile = os.path.join(folder, name + '.prom')
+        with open(textfile + '.tmp', 'w') as file:
+            file.write(self.to_prometheus())
+        os.replace(textfile + '.tmp', textfile)
+        return path
+
+    """
+    ------------- Aim --------------
+    Prints the actions by total time spent, to see which step dominates the run
+    """
+    def print_report(self, limit = 10):
+        totals = dict()
+        with self._lock:
+            for (name, labels), histogram in self.histograms.items():
+                if name != 'action_seconds':
+                    continue
+                action = dict(labels).get('action')
+                calls, total = totals.get(action, (0, 0))
+                totals[action] = (calls + histogram.count, total + histogram.sum)
+        if not totals:
+            return
+        print('Actions report (seconds):')
+        for action, (calls, total) in sorted(totals.items(), key = lambda item: -item[1][1])[:limit]:
+            histogram = self.histogram('action_seconds', action = action)
+            print('  ' + action + ': ' + str(calls) + ' calls, ' + str(round(total, 1)) + ' in total, p50 '
+                  + str(round(histogram.quantile(0.5), 3)) + ', p95 ' + str(round(histogram.quantile(0.95), 3)))
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(label + '="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+                          for label, value in labels) + '}'
+
+
+# Metrics of the process, measured by the actions, tasks and drivers
+METRICS = Metrics()
@@ -0,0 +1,196 @@
+import os
+import re
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+
+DUPLICATES_PATH = os.path.join('..', '2. Exports', 'near_duplicates.db')
+# Number of hash functions of the signatures, split in BANDS bands of NUM_PERM / BANDS values: two offers
+# are compared if one band is the same, which happens for 98.8% of the pairs with a similarity of 0.7
+NUM_PERM = 120
+BANDS = 24
+# Jaccard similarity of the shingles above which two offers are duplicates
+THRESHOLD = 0.7
+# Number of consecutive words of a shingle
+SHINGLE_SIZE = 3
+# Prime of the hash functions (2^61 - 1)
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+# Maximum number of parameters of a single SQLite query
+QUERY_CHUNK_SIZE = 500
+
+
+"""
+------------- Aim --------------
+Returns the text compared for an offer: its title, company and description
+"""
+def offer_text(title, company, description):
+    return ' '.join(str(value) for value in (title, company, description) if isinstance(value, str))
+
+
+class MinHasher():
+
+    """
+    ------------- Aim --------------
+    Initialize the MinHash signatures: for each hash function, the minimum hash of the shingles (sets of
+    consecutive words) of a text. The share of equal values of two signatures estimates the Jaccard
+    similarity of the shingles of the texts.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (int)        | num_perm      | Number of hash functions
+    (int)        | shingle_size  | Number of words of a shingle
+    (int)        | seed          | Seed of the hash functions, the same for the signatures compared
+    """
+    def __init__(self, num_perm = NUM_PERM, shingle_size = SHINGLE_SIZE, seed = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, MERSENNE_PRIME, size = num_perm, dtype = np.uint64)[:, None]
+        self.b = generator.randint(0, MERSENNE_PRIME, size = num_perm, dtype = np.uint64)[:, None]
+
+    def shingles(self, text):
+        words = re.findall(r"\w+", text.lower())
+        size = min(self.shingle_size, len(words))
+        return {' '.join(words[start:start + size]) for start in range(len(words) - size + 1)} if words else set()
+
+    """
+    ------------- Aim --------------
+    Returns the signature of a text, None if it has no word
+    """
+    def signature(self, text):
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        # crc32 is the same in every process. a * x + b wraps around 2^64 before the modulo, as in the MinHash
+        # of datasketch: with a small product the hash functions would all keep the shingle of the smallest crc32
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype = np.uint64, count = len(shingles))
+        with np.errstate(over = 'ignore'):
+            return ((self.a * hashes[None, :] + self.b) % MERSENNE_PRIME).min(axis = 1)
+
+
+class NearDuplicateIndex():
+
+    """
+    ------------- Aim --------------
+    Initialize the index of the near duplicate offers (reposted with small edits, or published on several
+    websites), stored in a SQLite file: the MinHash signature of each offer and its buckets of Locality
+    Sensitive Hashing, one per band of the signature. An offer is only compared to the offers sharing one of
+    its buckets, so the index is queried as the rows are scraped whatever its size. An offer duplicating an
+    offer of the index joins its cluster, named after the first offer of the cluster.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the SQLite file
+    (int)        | num_perm      | Number of hash functions of the signatures
+    (int)        | bands         | Number of bands of the signatures (num_perm must be a multiple of it)
+    (float)      | threshold     | Estimated Jaccard similarity above which two offers are duplicates
+    (int)        | shingle_size  | Number of words of a shingle
+    """
+    def __init__(self, path = DUPLICATES_PATH, num_perm = NUM_PERM, bands = BANDS, threshold = THRESHOLD, shingle_size = SHINGLE_SIZE):
+        if num_perm % bands:
+            raise ValueError('num_perm (' + str(num_perm) + ') must be a multiple of bands (' + str(bands) + ')')
+        self.path = path
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread = False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS offers (key TEXT PRIMARY KEY, cluster TEXT, signature BLOB)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS buckets (bucket BLOB, key TEXT)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_buckets_bucket ON buckets (bucket)")
+        # The signatures of the file are only comparable with the same settings
+        settings = {'num_perm': str(num_perm), 'bands': str(bands), 'shingle_size': str(shingle_size)}
+        self._connection.executemany("INSERT OR IGNORE INTO settings VALUES (?, ?)", settings.items())
+        stored = dict(self._connection.execute("SELECT name, value FROM settings"))
+        self._connection.commit()
+        if stored != settings:
+            raise ValueError(path + ' was built with other settings: ' + str(stored))
+
+    def _buckets(self, signature):
+        return [hashlib.blake2b(bytes([band]) + signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size = 8).digest()
+                for band in range(self.bands)]
+
+    def _similar(self, signature, buckets, exclude = None):
+        keys = {row[0] for row in self._connection.execute("SELECT DISTINCT key FROM buckets WHERE bucket IN (" + ','.join('?' * len(buckets)) + ")", buckets)}
+        keys.discard(exclude)
+        similar = []
+        keys = list(keys)
+        for start in range(0, len(keys), QUERY_CHUNK_SIZE):
+            chunk = keys[start:start + QUERY_CHUNK_SIZE]
+            for key, cluster, candidate in self._connection.execute("SELECT key, cluster, signature FROM offers WHERE key IN (" + ','.join('?' * len(chunk)) + ")", chunk):
+                similarity = float(np.mean(np.frombuffer(candidate, dtype = np.uint64) == signature))
+                if similarity >= self.threshold:
+                    similar.append((key, cluster, similarity))
+        return sorted(similar, key = lambda item: -item[2])
+
+    """
+    ------------- Aim --------------
+    Returns the offers of the index duplicated by a text, without adding it
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | text          | Text of the offer (see offer_text)
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       |        | (key, cluster, estimated similarity) of the duplicates, the most similar first
+    """
+    def duplicates(self, text):
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            return self._similar(signature, self._buckets(signature))
+
+    """
+    ------------- Aim --------------
+    Adds offers to the index, an offer already added keeps its cluster
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | keys          | Identifiers of the offers, e.g. lib/seen_index.job_id of their url
+    (list)       | texts         | Texts of the offers (see offer_text)
+
+    ------------ Output ------------
+    (TYPE)       | NAME     | DESCRIPTION
+    (list)       | clusters | Cluster of each offer: the key of the first offer of the cluster, its own key if it is not a duplicate
+    """
+    def add_many(self, keys, texts):
+        clusters = []
+        with self._lock:
+            for key, text in zip(keys, texts):
+                known = self._connection.execute("SELECT cluster FROM offers WHERE key = ?", (key,)).fetchone()
+                if known:
+                    clusters.append(known[0])
+                    continue
+                signature = self.hasher.signature(text)
+                # An offer without text is never a duplicate
+                if signature is None:
+                    clusters.append(key)
+                    continue
+                buckets = self._buckets(signature)
+                similar = self._similar(signature, buckets, exclude = key)
+                cluster = similar[0][1] if similar else key
+                self._connection.execute("INSERT INTO offers VALUES (?, ?, ?)", (key, cluster, signature.tobytes()))
+                self._connection.executemany("INSERT INTO buckets VALUES (?, ?)", [(bucket, key) for bucket in buckets])
+                clusters.append(cluster)
+            self._connection.commit()
+        return clusters
+
+    def add(self, key, text):
+        return self.add_many([key], [text])[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
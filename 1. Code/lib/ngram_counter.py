@@ -0,0 +1,345 @@
+import os
+import math
+import queue
+import hashlib
+import heapq
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from nltk.metrics import BigramAssocMeasures, TrigramAssocMeasures
+from nltk.stem.wordnet import WordNetLemmatizer
+
+from lib.offer_analysis import tokenize, get_stopwords, get_stemmer
+
+# Number of n-grams of each order counted exactly, the least frequent ones being forgotten beyond it
+MAX_ITEMS = 200000
+# Size of the count-min sketch counting every n-gram: error of about 2.7 / SKETCH_WIDTH of the total
+# count with a probability of 1 - e^-SKETCH_DEPTH
+SKETCH_WIDTH = 2 ** 18
+SKETCH_DEPTH = 4
+# Number of n-grams kept before being added to the sketch at once
+SKETCH_BUFFER = 50000
+# Number of descriptions sent to a process at once
+CHUNK_SIZE = 500
+# Seconds waited for a place in the queue of the chunks before checking that the processes still run
+PUT_TIMEOUT = 1
+# Measures of association of the collocations
+MEASURES = {2: BigramAssocMeasures, 3: TrigramAssocMeasures}
+
+
+def _hash(key):
+    # Same hash in every process, so the sketches of the workers can be merged
+    return int.from_bytes(hashlib.blake2b('\x1f'.join(key).encode('utf-8'), digest_size = 8).digest(), 'little')
+
+
+class CountMinSketch():
+
+    """
+    ------------- Aim --------------
+    Initialize a count-min sketch: an approximate count of any number of keys in a fixed memory, never
+    under the real count
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (int)        | width         | Number of counters per row
+    (int)        | depth         | Number of rows, each key being counted once per row
+    """
+    def __init__(self, width = SKETCH_WIDTH, depth = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype = np.int64)
+
+    def _columns(self, keys):
+        hashes = np.array([_hash(key) for key in keys], dtype = np.uint64)
+        # Two halves of the hash give a column per row (double hashing)
+        first, second = hashes & np.uint64(0xFFFFFFFF), hashes >> np.uint64(32)
+        rows = np.arange(self.depth, dtype = np.uint64)[:, None]
+        return ((first[None, :] + rows * second[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, counts):
+        if not counts:
+            return
+        columns = self._columns(list(counts))
+        values = np.fromiter(counts.values(), dtype = np.int64, count = len(counts))
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], values)
+
+    def estimate(self, keys):
+        if not keys:
+            return np.zeros(0, dtype = np.int64)
+        columns = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis = 0)
+
+    def merge(self, other):
+        self.table += other.table
+
+
+class NgramCounter():
+
+    """
+    ------------- Aim --------------
+    Initialize a streaming counter of the unigrams, bigrams and trigrams of job descriptions, in a bounded
+    memory: the most frequent n-grams of each order are counted exactly, and every n-gram is counted in a
+    count-min sketch giving the count of the n-grams forgotten (the long tail). The descriptions are read
+    one by one, and the counters of several processes can be merged.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | language      | Language of the descriptions, as named by nltk (e.g. english)
+    (str)        | form          | Form of the words counted: word, stem or lem
+    (int)        | n             | Highest order of the n-grams counted
+    (int)        | max_items     | Number of n-grams of each order counted exactly
+    (bool)       | sketch        | Counts every n-gram in a count-min sketch
+    """
+    def __init__(self, language = 'english', form = 'word', n = 3, max_items = MAX_ITEMS, sketch = True,
+                 sketch_width = SKETCH_WIDTH, sketch_depth = SKETCH_DEPTH):
+        self.language = language
+        self.form = form
+        self.n = n
+        self.max_items = max_items
+        self.counts = {order: Counter() for order in range(1, n + 1)}
+        # Number of n-grams of each order read, forgotten ones included
+        self.totals = dict.fromkeys(range(1, n + 1), 0)
+        self.documents = 0
+        self.sketch = CountMinSketch(sketch_width, sketch_depth) if sketch else None
+        self._pending = Counter()
+        self._forms = dict()
+
+    def _reduce(self, word):
+        # Each distinct word is reduced once
+        if word not in self._forms:
+            if self.form == 'stem':
+                self._forms[word] = get_stemmer(self.language).stem(word)
+            elif self.form == 'lem':
+                self._forms[word] = WordNetLemmatizer().lemmatize(word)
+            else:
+                self._forms[word] = word
+        return self._forms[word]
+
+    """
+    ------------- Aim --------------
+    Counts the n-grams of a description, the n-grams never spanning two descriptions
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | description   | Job description
+    """
+    def feed(self, description):
+        stop = get_stopwords(self.language)
+        words = [self._reduce(word) for word in tokenize(description) if word not in stop]
+        self.documents += 1
+        for order in range(1, self.n + 1):
+            ngrams = Counter(tuple(words[start:start + order]) for start in range(len(words) - order + 1))
+            self.counts[order].update(ngrams)
+            self.totals[order] += max(len(words) - order + 1, 0)
+            if self.sketch is not None:
+                self._pending.update(ngrams)
+            if len(self.counts[order]) > self.max_items:
+                self._prune(order)
+        if len(self._pending) > SKETCH_BUFFER:
+            self._flush()
+
+    def feed_all(self, descriptions):
+        for description in descriptions:
+            self.feed(description)
+        self._flush()
+        return self
+
+    def _prune(self, order):
+        # Keeps the most frequent half, the others are still counted by the sketch
+        self.counts[order] = Counter(dict(heapq.nlargest(self.max_items // 2, self.counts[order].items(), key = lambda item: item[1])))
+        if len(self._forms) > self.max_items:
+            self._forms = dict()
+
+    def _flush(self):
+        if self.sketch is not None and self._pending:
+            self.sketch.add(self._pending)
+            self._pending = Counter()
+
+    """
+    ------------- Aim --------------
+    Adds the counts of another counter, e.g. the one of another process
+    """
+    def merge(self, other):
+        self._flush()
+        other._flush()
+        for order in self.counts:
+            self.counts[order].update(other.counts[order])
+            self.totals[order] += other.totals[order]
+            if len(self.counts[order]) > self.max_items:
+                self._prune(order)
+        self.documents += other.documents
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+
+    """
+    ------------- Aim --------------
+    Returns the counts of n-grams: the estimate of the sketch if there is one (never under the real count,
+    and close to it for the frequent n-grams), the exact count otherwise (0 if the n-gram was forgotten)
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | ngrams        | N-grams, tuples of words
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       | counts | Count of each n-gram
+    """
+    def count(self, ngrams):
+        self._flush()
+        if self.sketch is None:
+            return [self.counts[len(ngram)].get(ngram, 0) for ngram in ngrams]
+        return [int(count) for count in self.sketch.estimate(list(ngrams))]
+
+    """
+    ------------- Aim --------------
+    Returns the most frequent n-grams of an order, as nltk.FreqDist.most_common
+    """
+    def most_common(self, order = 1, limit = 20):
+        return self.counts[order].most_common(limit)
+
+    """
+    ------------- Aim --------------
+    Scores the bigrams or trigrams counted exactly by a measure of association of nltk, as the
+    collocation finders of nltk do on a full list of words
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (int)        | order         | 2 for the bigrams, 3 for the trigrams
+    (str)        | measure       | Measure of BigramAssocMeasures / TrigramAssocMeasures, e.g. pmi or likelihood_ratio
+    (int)        | min_count     | N-grams less frequent are ignored (PMI favours the rare ones)
+    (int)        | limit         | Number of collocations returned
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       |        | (n-gram, score) from the highest score
+    """
+    def collocations(self, order = 2, measure = 'pmi', min_count = 3, limit = 20):
+        score = getattr(MEASURES[order], measure)
+        candidates = [(ngram, count) for ngram, count in self.counts[order].items() if count >= min_count]
+        if not candidates:
+            return []
+        # Counts of the words and of the pairs of words of the n-grams, the marginals of the measures
+        unigrams = dict(zip(*self._marginals(1, {(word,) for ngram, _ in candidates for word in ngram})))
+        total = self.totals[1]
+        scores = []
+        # A marginal is never under the count of the n-gram, even if its words were forgotten without a sketch
+        if order == 2:
+            for (first, second), count in candidates:
+                scores.append(((first, second), score(count, (max(unigrams[(first,)], count), max(unigrams[(second,)], count)), total)))
+        else:
+            pairs = {(ngram[i], ngram[j]) for ngram, _ in candidates for i, j in [(0, 1), (0, 2), (1, 2)]}
+            # The first and last words of a trigram are not a bigram, the bigram of these words approximates them
+            bigrams = dict(zip(*self._marginals(2, pairs)))
+            for (first, second, third), count in candidates:
+                pair_counts = tuple(max(bigrams[pair], count) for pair in [(first, second), (first, third), (second, third)])
+                word_counts = tuple(max(unigrams[(word,)], count) for word in [first, second, third])
+                scores.append(((first, second, third), score(count, pair_counts, word_counts, total)))
+        scores = [(ngram, value) for ngram, value in scores if not math.isnan(value)]
+        return sorted(scores, key = lambda item: -item[1])[:limit]
+
+    def _marginals(self, order, ngrams):
+        ngrams = list(ngrams)
+        exact = [self.counts[order].get(ngram) for ngram in ngrams]
+        missing = [ngram for ngram, count in zip(ngrams, exact) if count is None]
+        estimated = dict(zip(missing, self.count(missing))) if missing else {}
+        return ngrams, [count if count is not None else estimated[ngram] for ngram, count in zip(ngrams, exact)]
+
+
+# Queue of the chunks of descriptions read by the processes counting them
+_process_chunks = None
+
+
+def _init_process(chunks):
+    global _process_chunks
+    _process_chunks = chunks
+
+
+def _count_chunks(language, form, n, max_items, sketch):
+    # A single counter per process reads chunks until None, its sketch being sent back once at the end
+    counter = NgramCounter(language, form, n, max_items, sketch)
+    for chunk in iter(_process_chunks.get, None):
+        for description in chunk:
+            counter.feed(description)
+    counter._flush()
+    return counter
+
+
+def _put(chunks, chunk, futures):
+    # Waits for a place in the queue, a process which failed would leave the queue full forever
+    while True:
+        try:
+            chunks.put(chunk, timeout = PUT_TIMEOUT)
+            return
+        except queue.Full:
+            for future in futures:
+                if future.done():
+                    future.result()
+
+
+def _stop(chunks, workers):
+    # The chunks left are dropped and the processes still reading the queue are stopped
+    try:
+        while True:
+            chunks.get_nowait()
+    except queue.Empty:
+        pass
+    for _ in range(workers):
+        chunks.put_nowait(None)
+
+
+"""
+------------- Aim --------------
+Counts the n-grams of descriptions read from any iterable (e.g. a generator reading the exports row by
+row): the chunks of descriptions are sent through a bounded queue to several processes, each one
+counting them in its own counter, and the counters of the processes are merged once at the end. Only a
+few chunks are in memory at once.
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(iterable)   | descriptions  | Job descriptions of a same language
+(str)        | language      | Language of the descriptions, as named by nltk
+(str)        | form          | Form of the words counted: word, stem or lem
+(int)        | workers       | Number of processes, one per core if None
+
+------------ Output ------------
+(TYPE)          | NAME    | DESCRIPTION
+(NgramCounter)  | counter | Counts of all the descriptions
+"""
+def count_ngrams(descriptions, language = 'english', form = 'word', n = 3, max_items = MAX_ITEMS, sketch = True,
+                 workers = None, chunk_size = CHUNK_SIZE):
+    workers = workers or os.cpu_count()
+    counter = NgramCounter(language, form, n, max_items, sketch)
+    if workers == 1:
+        return counter.feed_all(descriptions)
+
+    def chunks():
+        chunk = []
+        for description in descriptions:
+            chunk.append(description)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # Two chunks per process at most, the descriptions are never all read at once
+    queued = multiprocessing.Queue(maxsize = 2 * workers)
+    with ProcessPoolExecutor(max_workers = workers, initializer = _init_process, initargs = (queued,)) as executor:
+        futures = [executor.submit(_count_chunks, language, form, n, max_items, sketch) for _ in range(workers)]
+        try:
+            for chunk in chunks():
+                _put(queued, chunk, futures)
+            # One end marker per process
+            for _ in futures:
+                _put(queued, None, futures)
+            for future in futures:
+                counter.merge(future.result())
+        except BaseException:
+            # The pool waits for its processes when it is closed, they must not wait for chunks any more
+            _stop(queued, workers)
+            raise
+    return counter
@@ -0,0 +1,169 @@
+import os
+import re
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from nltk.corpus import stopwords
+from nltk.stem import SnowballStemmer
+from nltk.stem.wordnet import WordNetLemmatizer
+
+# Columns of the analysis of the offers, one row per word (or stem, lem, bigram) of an offer
+ANALYSIS_COLUMNS = ['Word', 'Count', 'Category', 'offerID']
+# Number of offers analyzed by a process at once
+CHUNK_SIZE = 200
+
+
+# The list of stopwords is read once per language and process
+@lru_cache(maxsize = None)
+def get_stopwords(language):
+    return frozenset(stopwords.words(language))
+
+
+@lru_cache(maxsize = None)
+def get_stemmer(language):
+    return SnowballStemmer(language = language)
+
+
+"""
+------------- Aim --------------
+Splits a job description in lowercase words, the characters other than letters and digits being separators
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | description   | Job description, an empty list is returned if it is not a text
+"""
+def tokenize(description):
+    if not isinstance(description, str):
+        return []
+    return re.sub(r"[^a-zA-Z0-9]", " ", description.lower()).split()
+
+
+"""
+------------- Aim --------------
+Reduces a vocabulary with a function (stemmer, lemmatizer) and returns the matrix mapping each word to
+its reduced form, so the counts of the offers are reduced by a single product
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(array)      | vocabulary    | Words of the document-term matrix
+(function)   | reduce        | Function giving the reduced form of a word
+
+------------ Output ------------
+(TYPE)       | NAME    | DESCRIPTION
+(array)      | reduced | Reduced forms, sorted
+(array)      | index   | Index in reduced of each word of the vocabulary
+(csr_matrix) | mapping | Matrix (words x reduced forms) with a 1 per word
+"""
+def _reduce_vocabulary(vocabulary, reduce):
+    reduced, index = np.unique(np.array([reduce(word) for word in vocabulary], dtype = object), return_inverse = True)
+    mapping = sparse.csr_matrix((np.ones(len(vocabulary), dtype = np.int64), (np.arange(len(vocabulary)), index)),
+                                shape = (len(vocabulary), len(reduced)))
+    return reduced, index, mapping
+
+
+def _table(matrix, words, category, offer_ids):
+    matrix = matrix.tocoo()
+    return pd.DataFrame({'Word'    : words[matrix.col],
+                         'Count'   : matrix.data,
+                         'Category': category,
+                         'offerID' : offer_ids[matrix.row]}, columns = ANALYSIS_COLUMNS)
+
+
+"""
+------------- Aim --------------
+Analyzes offers of a same language: their words are counted in a sparse document-term matrix, and the
+stems, lems and bigrams are computed once per distinct word instead of once per word of each offer
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | language      | Language of the offers, as named by nltk (e.g. english)
+(list)       | descriptions  | Job descriptions
+(list)       | offer_ids     | Identifiers of the offers
+
+------------ Output ------------
+(TYPE)       | NAME     | DESCRIPTION
+(DataFrame)  | analysis | Count of each word, stem, lem and bigram per offer (ANALYSIS_COLUMNS)
+"""
+def _analyze_chunk(language, descriptions, offer_ids):
+    stop = get_stopwords(language)
+    offer_ids = np.asarray(offer_ids)
+
+    # Document-term matrix, the ids of the words being given in their order of appearance
+    vocabulary = dict()
+    documents = [[vocabulary.setdefault(word, len(vocabulary)) for word in tokenize(description) if word not in stop]
+                 for description in descriptions]
+    if not vocabulary:
+        return pd.DataFrame(columns = ANALYSIS_COLUMNS)
+    lengths = np.array([len(document) for document in documents])
+    tokens = np.fromiter((word for document in documents for word in document), dtype = np.int64, count = lengths.sum())
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    words = np.array(list(vocabulary), dtype = object)
+    counts = sparse.csr_matrix((np.ones(len(tokens), dtype = np.int64), tokens, indptr), shape = (len(documents), len(words)))
+    counts.sum_duplicates()
+
+    stemmer = get_stemmer(language)
+    stems, _, stem_mapping = _reduce_vocabulary(words, stemmer.stem)
+    lemmatizer = WordNetLemmatizer()
+    lems, lem_index, lem_mapping = _reduce_vocabulary(words, lemmatizer.lemmatize)
+    lem_counts = counts @ lem_mapping
+
+    # Bigrams of consecutive lems of an offer, encoded as a single integer
+    lem_tokens = lem_index[tokens]
+    offer_of_token = np.repeat(np.arange(len(documents)), lengths)
+    same_offer = offer_of_token[:-1] == offer_of_token[1:]
+    pair_codes = lem_tokens[:-1][same_offer] * len(lems) + lem_tokens[1:][same_offer]
+    pairs, pair_index = np.unique(pair_codes, return_inverse = True)
+    bigram_counts = sparse.csr_matrix((np.ones(len(pair_index), dtype = np.int64), (offer_of_token[:-1][same_offer], pair_index)),
+                                      shape = (len(documents), len(pairs)))
+    bigram_counts.sum_duplicates()
+    bigrams = np.array([lems[pair // len(lems)] + ' ' + lems[pair % len(lems)] for pair in pairs], dtype = object)
+
+    return pd.concat([_table(counts, words, 'word', offer_ids),
+                      _table(counts @ stem_mapping, stems, 'stem', offer_ids),
+                      _table(lem_counts, lems, 'lem', offer_ids),
+                      _table(bigram_counts, bigrams, 'bigram', offer_ids)], ignore_index = True)
+
+
+"""
+------------- Aim --------------
+Analyzes the job descriptions of many offers: the offers are grouped by language and split in chunks
+analyzed in parallel by several processes
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(list)       | descriptions  | Job descriptions
+(list)       | languages     | Language of each offer, as named by nltk (e.g. english)
+(list)       | offer_ids     | Identifier of each offer
+(int)        | workers       | Number of processes, one per core if None
+
+------------ Output ------------
+(TYPE)       | NAME     | DESCRIPTION
+(DataFrame)  | analysis | Count of each word, stem, lem and bigram per offer, sorted by offer and category
+"""
+def analyze_offers(descriptions, languages, offer_ids, workers = None, chunk_size = CHUNK_SIZE):
+    offers = pd.DataFrame({'description': list(descriptions), 'language': list(languages), 'offerID': list(offer_ids)})
+    chunks = []
+    for language, group in offers.groupby('language', sort = False):
+        for start in range(0, len(group), chunk_size):
+            chunk = group.iloc[start:start + chunk_size]
+            chunks.append((language, chunk['description'].tolist(), chunk['offerID'].tolist()))
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(chunks) <= 1:
+        tables = [_analyze_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers = min(workers, len(chunks))) as executor:
+            tables = list(executor.map(_analyze_chunk, *zip(*chunks)))
+
+    if not tables:
+        return pd.DataFrame(columns = ANALYSIS_COLUMNS)
+    analysis = pd.concat(tables, ignore_index = True)
+    # Same order as the former per offer reports: offer, then word, stem, lem and bigram
+    analysis['Category'] = pd.Categorical(analysis['Category'], categories = ['word', 'stem', 'lem', 'bigram'])
+    order = pd.Series(range(len(offers)), index = offers['offerID'])
+    analysis = analysis.iloc[np.lexsort((analysis['Category'].cat.codes, order.loc[analysis['offerID']].to_numpy()))]
+    analysis['Category'] = analysis['Category'].astype(str)
+    return analysis.reset_index(drop = True)
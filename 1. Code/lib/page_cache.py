@@ -0,0 +1,283 @@
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from lxml import html
+
+from lib.seen_index import JOB_ID_PATTERNS, job_id
+from lib.http_driver import extract_row, UTF8_BOM
+
+CACHE_FOLDER = os.path.join('..', '2. Exports', 'page_cache')
+# Default configuration of the cache, overridden by the "cache" key of a task in the appdata file
+# ttl_hours : hours during which a page is served from the cache, per website ("default" for the others)
+# max_mb    : size of the compressed pages above which the least recently used pages are evicted
+DEFAULT_CACHE_CONFIG = {'ttl_hours': {'default': 168},
+                        'max_mb'   : 512}
+# Query parameters only used to track the visits, they do not change the page
+TRACKING_PARAMETERS = ['trk', 'trackingid', 'refid', 'lipi', 'fccid', 'from', 'tk', 'ebp', 'pos', 'ao', 'guid']
+# Number of entries evicted at once when the cache is full
+EVICTION_BATCH = 100
+
+
+"""
+------------- Aim --------------
+Normalizes a url to the key of the cache: the job identifier for the offers of the known websites,
+the url without its tracking parameters otherwise
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | url           | Url of the page
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(str)        | key    | Key of the page in the cache
+"""
+def cache_key(url):
+    url = str(url).strip()
+    if any(pattern.search(url) for site, pattern in JOB_ID_PATTERNS):
+        return job_id(url)
+    parts = urlsplit(url)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query)
+                   if name.lower() not in TRACKING_PARAMETERS and not name.lower().startswith('utm_'))
+    return parts.netloc.lower() + parts.path.rstrip('/') + ('?' + urlencode(query) if query else '')
+
+
+class PageCache():
+
+    """
+    ------------- Aim --------------
+    Initialize the on-disk cache of the pages loaded. The html is compressed and stored once per content
+    (file named by its sha256), a SQLite index maps the normalized urls to the contents with their date of
+    download and of last use. Pages older than the ttl of their website are downloaded again and the least
+    recently used pages are evicted when the cache exceeds its size.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (dict)       | config        | Configuration overriding DEFAULT_CACHE_CONFIG
+    (str)        | folder        | Folder of the cache
+    """
+    def __init__(self, config = None, folder = CACHE_FOLDER):
+        self.folder = folder
+        self.config = dict(DEFAULT_CACHE_CONFIG)
+        self.config.update(config or {})
+        self.ttl_hours = dict(DEFAULT_CACHE_CONFIG['ttl_hours'])
+        self.ttl_hours.update(self.config['ttl_hours'])
+        self.max_bytes = self.config['max_mb'] * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(folder, exist_ok = True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(folder, 'index.db'), check_same_thread = False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, url TEXT, digest TEXT, size INTEGER, fetched REAL, accessed REAL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_pages_accessed ON pages (accessed)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_pages_digest ON pages (digest)")
+        self._connection.commit()
+        self._total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM pages)").fetchone()[0]
+
+    """
+    ------------- Aim --------------
+    Returns the html of a page if it is in the cache and younger than the ttl of its website
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url of the page
+    (bool)       | raw           | Returns the bytes downloaded instead of the text, lxml finding their encoding
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (tuple)      |        | (final url, html) of the page, None if it has to be downloaded
+    """
+    def get(self, url, raw = False):
+        key = cache_key(url)
+        with self._lock:
+            row = self._connection.execute("SELECT url, digest, fetched FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[2] > self._ttl(url) * 3600:
+                self.misses += 1
+                return None
+            try:
+                with gzip.open(self._blob_path(row[1]), 'rb') as file:
+                    content = file.read()
+            except OSError:
+                # The file was removed by hand, the entry is forgotten
+                self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._connection.commit()
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE pages SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+            self.hits += 1
+        # The text form is decoded as utf-8, the pages are parsed from their bytes
+        return row[0], content if raw else content.decode('utf-8-sig', 'replace')
+
+    """
+    ------------- Aim --------------
+    Stores the html of a page, then evicts the least recently used pages if the cache is full
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url loaded
+    (str) or (bytes) | content   | Html of the page, as a text or as the bytes downloaded
+    (str)        | final_url     | Url of the page after the redirections
+    """
+    def put(self, url, content, final_url = None):
+        if not content:
+            return
+        # The html of a browser is marked as utf-8, whatever the charset declared in the page
+        data = content if isinstance(content, bytes) else UTF8_BOM + content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok = True)
+                # Written under another name first, a crash never leaves a truncated page in the cache
+                with gzip.open(path + '.tmp', 'wb', compresslevel = 6) as file:
+                    file.write(data)
+                os.replace(path + '.tmp', path)
+                self._total += os.path.getsize(path)
+            now = time.time()
+            previous = self._connection.execute("SELECT digest FROM pages WHERE key = ?", (cache_key(url),)).fetchone()
+            self._connection.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                                     (cache_key(url), final_url or url, digest, os.path.getsize(path), now, now))
+            if previous is not None and previous[0] != digest:
+                self._remove_unused(previous[0])
+            self._evict()
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _ttl(self, url):
+        host = urlsplit(str(url)).netloc.lower()
+        site = next((site for site in self.ttl_hours if site != 'default' and site in host), 'default')
+        return self.ttl_hours[site]
+
+    def _blob_path(self, digest):
+        return os.path.join(self.folder, digest[:2], digest + '.html.gz')
+
+    def _evict(self):
+        while self._total > self.max_bytes:
+            rows = self._connection.execute("SELECT key, digest FROM pages ORDER BY accessed LIMIT ?", (EVICTION_BATCH,)).fetchall()
+            if not rows:
+                break
+            for key, digest in rows:
+                self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._remove_unused(digest)
+                if self._total <= self.max_bytes:
+                    break
+
+    def _remove_unused(self, digest):
+        # A content is shared by the urls having the same html, it is removed with its last url
+        if self._connection.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            path = self._blob_path(digest)
+            if os.path.exists(path):
+                self._total -= os.path.getsize(path)
+                os.remove(path)
+
+
+class CachedDriver():
+
+    """
+    ------------- Aim --------------
+    Initialize a driver serving the pages from the page cache. A page in the cache is never requested
+    again: the selectors of login.json are evaluated on the cached html and the actions only needed by a
+    browser are ignored. Other pages are loaded by the wrapped driver and stored in the cache by Get.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Chrome driver or http driver loading the pages missing in the cache
+    (PageCache)  | cache         | Cache shared by the drivers of the Program
+    """
+    def __init__(self, driver, cache):
+        self.driver = driver
+        self.cache = cache
+        self.dataset = driver.dataset
+        self.selectors = driver.selectors
+        self.email_usr = driver.email_usr
+        self.queued_url = ""
+
+        self.hit = False
+        self.url = ""
+        self.current_url = ""
+        self.page = None
+
+        # Map the name called and the functions
+        self.function_dict = {'Load'        : self.load_url,
+                              'Get'         : self.get_page_contents,
+                              'Click'       : self.browser_action('Click'),
+                              'Wait'        : self.browser_action('Wait'),
+                              'Scroll'      : self.browser_action('Scroll'),
+                              'Sleep'       : self.browser_action('Sleep')
+                             }
+
+    """
+    ------------- Aim --------------
+    Maps a given action to the corresponding function and executes it with given arguments. The other
+    actions are executed by the wrapped driver.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | action        | Action to execute
+    (dict)       | args          | Arguments for the execution
+    """
+    def do(self, action, args):
+        if action in self.function_dict:
+            self.function_dict[action](**args)
+        else:
+            self.driver.do(action, args)
+
+    """
+    ------------- Aim --------------
+    Reads a given url from the cache, or loads it with the wrapped driver if it is not cached. If no url
+    is given, loads the url handed out by the url queue.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url to be loaded
+    """
+    def load_url(self, url = ""):
+        self.url = url or self.queued_url
+        cached = self.cache.get(self.url, raw = True)
+        self.hit = cached is not None
+        if self.hit:
+            self.current_url, content = cached
+            self.page = html.fromstring(content, base_url = self.current_url)
+        else:
+            self.driver.queued_url = self.url
+            self.driver.do('Load', {'url': self.url})
+
+    """
+    ------------- Aim --------------
+    Scraps the specified elements on the current page. The html of a page loaded by the wrapped driver is
+    stored in the cache after the scraping, with the changes made by the previous actions (e.g. Click).
+
+    ---------- Parameters ----------
+    (TYPE)          | NAME          | DESCRIPTION
+    (str) or (list) | element_name  | Name or list of names of elements to be scraped on current page
+    (str) or (list) | attribute     | Attribute or list of attributes to get for each element
+    (bool)          | batched       | Reads all the elements in a single call when loaded by the browser
+    """
+    def get_page_contents(self, element_name, attribute, batched = False):
+        if self.hit:
+            current_page_element = extract_row(self.page, self.current_url, element_name, attribute, self.selectors.xpath)
+            self.dataset.variables['page_content'].append(current_page_element)
+        else:
+            self.driver.get_page_contents(element_name, attribute, batched)
+            self.cache.put(self.url, self.driver.page_html(), self.driver.current_url)
+
+    """
+    ------------- Aim --------------
+    Returns the function executing an action only needed by a browser, ignored for a cached page
+    """
+    def browser_action(self, action):
+        def execute(**args):
+            if not self.hit:
+                self.driver.do(action, args)
+        return execute
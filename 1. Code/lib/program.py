@@ -0,0 +1,581 @@
+from lib.driver_pool import DriverPool
+from lib.http_driver import HttpDriver
+from lib.async_fetcher import AsyncFetcher
+from lib.page_cache import PageCache, CachedDriver
+from lib.action import Action
+from lib.task import Task
+from lib.dataset import Dataset
+from lib.export_stream import RowStream
+from lib.journal import RunJournal
+from lib.web_archive import WebArchive, Recorder, ReplayServer
+from lib.seen_index import SEEN_INDEX_PATH
+from lib.waits import print_wait_report
+from lib.metrics import METRICS, METRICS_FOLDER
+from threading import Thread, Event, Lock
+
+import os
+import json
+import time
+
+# Keys of a task in the appdata file which are options of the task and not actions
+TASK_OPTIONS = ['multi', 'engine', 'async', 'skip_if_present', 'cache', 'depends_on', 'streams_from', 'queue_size']
+# Default number of urls waiting in the url queue while a task streams them to another one
+PIPELINE_QUEUE_SIZE = 200
+
+# This class is the core of the scraper. It is loading the tasks.json file and is the key to access to every
+# object. Methods should be called from the main and no other object needs to be connected to run the scraper.
+
+# The current implemented methods are:
+# execute: runs a specified subpart of the tasks.json file
+
+# The tasks are executed in the order of the file. When a task declares "depends_on" (list of task names)
+# or "streams_from" (name of the task adding the urls it loads), the tasks are executed as soon as the tasks
+# they depend on are done: a task without "depends_on" depends on the previous task of the file, and a
+# task streaming from another one starts with it and scrapes the urls while they are found.
+
+class Program():
+    # journal_path: path of the journal of the runs, in the export folder if empty
+    def __init__(self, name, journal_path = ''):
+        self.website_to_display = name
+        self.tasks_file = self._browse_file()
+        self.logins = self._browse_logins()
+        self.hierarchy  = self._generate_hierarchy()
+        self.hierarchy_backup = self.hierarchy.copy()
+        self.dataset = Dataset()
+        self.http_drivers = dict()
+        # Cache of the pages loaded, opened by the first task with a "cache" option
+        self.page_cache = None
+        self.cached_drivers = dict()
+        # Recorder or replay server of the current execution
+        self.archive = None
+        # Duration in seconds of each task of the last execution
+        self.task_durations = dict()
+        # Drivers created by each Driver task of the current execution
+        self.task_drivers = dict()
+        self._drivers_lock = Lock()
+        # Chrome drivers kept warm between the executions, with their sessions saved on disk
+        self.pool = DriverPool()
+        # Journal of the run, used to resume it after a crash
+        self.journal = RunJournal(name, journal_path)
+        # Folder of the metrics exported at the end of each execution
+        self.metrics_folder = METRICS_FOLDER
+        self.use_url_queue(self.dataset.variables['url_queue'])
+        # Coordinator of the worker processes scraping the url queue in a sharded run (see lib/sharding.py)
+        self.shards = None
+
+    """
+    ------------- Aim --------------
+    Replaces the url queue of the dataset, e.g. by the frontier of a sharded run, the urls queued and
+    scraped being recorded in the journal
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (UrlQueue)   | url_queue     | Queue of the urls to scrap
+    """
+    def use_url_queue(self, url_queue):
+        self.dataset.variables['url_queue'] = url_queue
+        url_queue.on_put.append(self.journal.url_queued)
+        url_queue.on_done.append(self.journal.url_done)
+
+    def _generate_hierarchy(self):
+        hierarchy = {}
+        for task_name in self.tasks_file:
+            # Creates the new task
+            new_task = Task(task_name, self.tasks_file[task_name])
+
+            # Fill the new task with the inner actions
+            for action_name in new_task.json_elements:
+                if "Driver" not in task_name and action_name not in TASK_OPTIONS:
+                    new_task.add_action(
+                                        Action(action_name = action_name,
+                                               to_do       = new_task.json_elements.get(action_name).get('to_do'),
+                                               params      = new_task.json_elements.get(action_name).get('params')
+                                              )
+                                       )
+
+            hierarchy[task_name] = new_task
+        return hierarchy
+
+    def _browse_file(self):
+        try:
+            file_path = os.path.join('..', '7. Config', 'appdata', self.website_to_display + '.json')
+
+            with open(file_path) as f:
+                full_file = json.load(f)
+                tasks     = full_file[self.website_to_display]
+        except Exception as e:
+            print(e)
+            print('Error while reading ' + self.website_to_display + '.json')
+            tasks = None
+
+        return tasks
+
+    def _browse_logins(self):
+        try:
+            file_path = os.path.join('..', '7. Config', 'login.json')
+
+            with open(file_path) as f:
+                full_file = json.load(f)
+                logins     = full_file["credentials"]
+        except Exception as e:
+            print(e)
+            print('Error while reading '  + 'login.json')
+            logins = None
+        return logins
+
+    def _manage_drivers(self, run_background, t):
+        # Configuration of the waits of the website
+        wait_config = self.hierarchy[t].json_elements.get('waits')
+        # Resources not downloaded by the drivers (see lib/lean_browser.py)
+        lean_config = self.hierarchy[t].json_elements.get('lean')
+        # Driver action: multi = False
+        if not self.hierarchy[t].json_elements.get('multi'):
+            driver = self.pool.acquire(next(iter(self.logins))["email"],
+                                       next(iter(self.logins))["password"],
+                                       self.dataset,
+                                       run_background,
+                                       wait_config,
+                                       self.archive,
+                                       lean_config)
+            with self._drivers_lock:
+                self.drivers = self.drivers + [driver]
+                self.task_drivers[t] = self.drivers
+        # Driver action: multi = True
+        else:
+            drivers = []
+            # Create a list of Driver objects corresponding to the logins stored. They currently read the
+            # logins corresponding to LinkedIn. Drivers left idle in the pool are reused.
+            for login in self.logins:
+                drivers.append(self.pool.acquire(login["email"],
+                                                 login["password"],
+                                                 self.dataset,
+                                                 run_background,
+                                                 wait_config,
+                                                 self.archive,
+                                                 lean_config))
+            with self._drivers_lock:
+                self.drivers = drivers
+                self.task_drivers[t] = self.drivers
+
+    """
+    ------------- Aim --------------
+    Returns the drivers executing a task: the drivers of the last Driver task before it in the file
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | t             | Name of the task to execute
+    """
+    def _drivers_of(self, t):
+        task_names = list(self.hierarchy)
+        driver_tasks = [name for name in task_names[:task_names.index(t) + 1] if "Driver" in name]
+        with self._drivers_lock:
+            if driver_tasks and driver_tasks[-1] in self.task_drivers:
+                return self.task_drivers[driver_tasks[-1]]
+            return self.drivers
+
+    """
+    ------------- Aim --------------
+    Returns the drivers executing a task depending on its engine. With "engine": "http", the pages are
+    loaded without any browser through the session of the connected Chrome drivers. With "cache", the
+    pages already in the page cache are read from the disk instead of being loaded.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | t             | Name of the task to execute
+    (list)       | drivers       | Chrome drivers available for the task
+    """
+    def _engine_drivers(self, t, drivers):
+        if self.hierarchy[t].json_elements.get('engine', 'browser') == 'http':
+            for driver in drivers:
+                # The cookies are copied once, after the Connect task
+                if driver not in self.http_drivers:
+                    self.http_drivers[driver] = HttpDriver(driver)
+            drivers = [self.http_drivers[driver] for driver in drivers]
+        cache = self._page_cache(t)
+        if cache is not None:
+            for driver in drivers:
+                if driver not in self.cached_drivers:
+                    self.cached_drivers[driver] = CachedDriver(driver, cache)
+            drivers = [self.cached_drivers[driver] for driver in drivers]
+        return drivers
+
+    """
+    ------------- Aim --------------
+    Returns the page cache if the task uses it, "cache" being true or the configuration of the cache
+    (see DEFAULT_CACHE_CONFIG). The cache is opened once and shared by all the tasks.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | t             | Name of the task to execute
+    """
+    def _page_cache(self, t):
+        config = self.hierarchy[t].json_elements.get('cache')
+        # The pages have to be loaded to be recorded, and only the archive is served while replaying
+        if not config or self.archive is not None:
+            return None
+        if self.page_cache is None:
+            self.page_cache = PageCache(config if isinstance(config, dict) else None)
+        return self.page_cache
+
+    def _launch_execution(self, t, driver, repeat = 1):
+        try:
+            self.hierarchy[t].execute(self._engine_drivers(t, [driver])[0], repeat)
+        except Exception as e:
+            print('Error in '+ self.hierarchy[t].name + ': ')
+            print(e)
+
+    def _threaded_execution(self, t, repeat = 1):
+        drivers = self._engine_drivers(t, self._drivers_of(t))
+        threads = [None] * len(drivers)
+        for i in range(len(drivers)):
+            threads[i] = Thread(target =  self.hierarchy[t].execute,
+                                args=((drivers[i], repeat)))
+            threads[i].start()
+        for i in range(len(drivers)):
+            threads[i].join()
+
+    """
+    ------------- Aim --------------
+    Fills the url queue with the links exported by a previous run when the Scrap task has not been
+    executed in this one
+    """
+    def _load_extracted_urls(self, url_queue):
+        try:
+            with open(self.dataset.extracted_urls_path) as file:
+                url_queue.extend(line.strip() for line in file)
+        except Exception as e:
+            print(e)
+            print('Error while reading ' + self.dataset.extracted_urls_path)
+
+    """
+    ------------- Aim --------------
+    Executes a task loading urls from the url queue. Every driver pulls the next url as soon as it
+    is idle, until the queue is exhausted. A task streaming from another one scrapes the urls while
+    they are added, the queue being bounded by "queue_size" so the other task waits when it is ahead.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | t             | Name of the task to execute
+    (bool)       | streaming     | True if the queue is still fed by another task, closed at its end
+    """
+    def _queued_execution(self, t, streaming = False):
+        url_queue = self.dataset.variables['url_queue']
+        if streaming:
+            url_queue.bound(self.hierarchy[t].json_elements.get('queue_size', PIPELINE_QUEUE_SIZE))
+        else:
+            if not url_queue.fed:
+                self._load_extracted_urls(url_queue)
+            # No url will be added anymore, the drivers stop once the queue is empty
+            url_queue.close()
+
+        # In a sharded run, the urls are scraped by the drivers of the worker processes
+        if self.shards is not None:
+            self.shards.wait()
+            return
+
+        try:
+            if self.hierarchy[t].json_elements.get('engine') == 'async':
+                self._async_execution(t, url_queue)
+            else:
+                if self.hierarchy[t].json_elements.get('multi'):
+                    drivers = self._engine_drivers(t, self._drivers_of(t))
+                else:
+                    drivers = self._engine_drivers(t, [self._drivers_of(t)[-1]])
+
+                threads = [Thread(target = self.hierarchy[t].execute_queue, args = (driver, url_queue)) for driver in drivers]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            # The task adding the urls is never left blocked on a queue nobody reads anymore
+            url_queue.bound(0)
+
+        print(str(url_queue.finished) + ' urls scraped in ' + self.hierarchy[t].name)
+        if url_queue.failed:
+            print(str(len(url_queue.failed)) + ' urls abandoned after ' + str(url_queue.max_retries) + ' retries')
+
+    """
+    ------------- Aim --------------
+    Executes the Get actions of a task with "engine": "async" on every url of the url queue. The pages
+    are fetched once, concurrently, by an asyncio fetcher sharing the session of the first Chrome driver.
+    The limits are set in the task by "async": {"per_host": int, "window": int}.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | t             | Name of the task to execute
+    (UrlQueue)   | url_queue     | Queue of the urls to scrap
+    """
+    def _async_execution(self, t, url_queue):
+        limits = self.hierarchy[t].json_elements.get('async', {})
+        fetcher = AsyncFetcher.from_driver(self._drivers_of(t)[0], cache = self._page_cache(t), **limits)
+        # The queue is emptied by a single pass, every Get is read on the same page
+        gets = [(action.params['element_name'], action.params['attribute']) for action in self.hierarchy[t].actions if action.to_do == 'Get']
+        if gets:
+            fetcher.run(url_queue, gets)
+
+    """
+    ------------- Aim --------------
+    Restores the state of a run stopped before its end: rows already scraped, urls queued and urls
+    scraped. Returns the tasks to skip: every task before the Driver task preceding the first task
+    not completed, as the browsers have to be started again from there.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (dict)       | state         | State of the run read from the journal
+
+    ------------ Output ------------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | skipped_tasks | Names of the tasks not executed again
+    """
+    def _resume(self, state):
+        task_names = list(self.hierarchy)
+        first_incomplete = next((i for i, t in enumerate(task_names) if t not in state['tasks']), len(task_names))
+        restart = max([i for i, t in enumerate(task_names[:first_incomplete + 1]) if "Driver" in t], default = 0)
+
+        # The rows are appended to the file of the stopped run
+        self.dataset.variables['page_content'].close()
+        self.dataset.variables['page_content'] = RowStream(state['page_content'])
+        url_queue = self.dataset.variables['url_queue']
+        url_queue.exclude(state['done'])
+        self.dataset.variables['urls'] += state['queued']
+        self.journal.reopen(self.dataset.variables['page_content'])
+        url_queue.extend(url for url in state['queued'] if url not in state['done'])
+
+        print('Resuming ' + self.website_to_display + ' from ' + task_names[restart] + ': ' + str(len(state['done']))
+              + ' urls already scraped, ' + str(len(url_queue)) + ' left')
+        return task_names[:restart]
+
+    """
+    ------------- Aim --------------
+    Prepares the recording or the replay of an execution. While replaying, the offers seen are kept in
+    memory so the replay can be repeated and the real index is left untouched.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | record        | Name of the archive recording the pages loaded
+    (str)        | replay        | Name of the archive to serve instead of the websites
+    """
+    def _open_archive(self, record, replay):
+        self.dataset.seen_index_path = SEEN_INDEX_PATH
+        if record:
+            self.archive = Recorder(WebArchive(record))
+        elif replay:
+            self.archive = ReplayServer(WebArchive(replay))
+            self.archive.start()
+            self.dataset.seen_index_path = ':memory:'
+        else:
+            self.archive = None
+
+    # Execute the all program as it is stored in the hierarchy. With resume = True, a run stopped before
+    # its end is continued from its journal. With record = name, every page and subresource loaded is
+    # stored in the archive 'name', which replay = name serves again from a local server, offline.
+    # With tasks = [names], only these tasks of the hierarchy are executed.
+    def execute(self, repeat_some_tasks = {}, run_background = False, resume = False, record = '', replay = '', tasks = None):
+        self.drivers = []
+        self.task_drivers = dict()
+        METRICS.reset()
+        self._open_archive(record, replay)
+        try:
+            state = self.journal.load() if resume else None
+            if state is not None and not state['finished']:
+                skipped_tasks = self._resume(state)
+            else:
+                if resume:
+                    print('No run of ' + self.website_to_display + ' to resume')
+                skipped_tasks = []
+                self.journal.start(self.dataset.variables['page_content'])
+
+            self.task_durations = dict()
+            task_names = [t for t in self.hierarchy if t not in skipped_tasks and (tasks is None or t in tasks)]
+            dependencies = self._task_dependencies(task_names)
+            if dependencies is None:
+                for t in task_names:
+                    self._execute_task(t, run_background, repeat_some_tasks)
+            else:
+                self._pipelined_execution(dependencies, run_background, repeat_some_tasks)
+
+            self.journal.finish()
+        finally:
+            # The replay server is shut down and the recorded pages are saved even if a task failed
+            if self.archive is not None:
+                self.archive.stop()
+        # The rows and links still buffered are written to the disk, the files are reopened if needed
+        self.dataset.close_streams()
+        # Time saved by the event waits compared to the former fixed sleeps
+        all_drivers = []
+        for drivers in self.task_drivers.values():
+            all_drivers += [driver for driver in drivers if driver not in all_drivers]
+        print_wait_report([driver.waiter for driver in all_drivers])
+        if self.page_cache is not None:
+            print('Page cache: ' + str(self.page_cache.hits) + ' pages read from the cache, ' + str(self.page_cache.misses) + ' loaded')
+        # Histograms of the actions, to see which step dominates the run and follow it over time
+        METRICS.print_report()
+        try:
+            print('Metrics stored in ' + METRICS.export(self.website_to_display, self.metrics_folder))
+        except Exception as e:
+            print(e)
+
+    """
+    ------------- Aim --------------
+    Executes a task of the hierarchy with the drivers of the last Driver task before it
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME              | DESCRIPTION
+    (str)        | t                 | Name of the task to execute
+    (Bool)       | run_background    | Decides if the drivers are executed on background
+    (dict)       | repeat_some_tasks | Number of repetitions of some tasks
+    (bool)       | streaming         | True if the task loads urls still added by another task
+    """
+    def _execute_task(self, t, run_background, repeat_some_tasks, streaming = False):
+        start = time.perf_counter()
+        # If the task is called Driver, it's about create several driver for the entire Program
+        if "Driver" in t:
+            self._manage_drivers(run_background, t)
+        # Tasks loading urls without a given url are dispatched through the url queue, no matter
+        # the number of repetitions asked: every driver works until the queue is empty.
+        if self.hierarchy[t].uses_url_queue():
+            self._queued_execution(t, streaming)
+        # If the user wants to repeat a task of many, the repeat_some_tasks dictionary will not be empty.
+        # If the task is in the dictionary, we have to repeat the task several times.
+        elif t in repeat_some_tasks.keys():
+            # The number of repetitions can be the length of a variable of the dataset
+            repeat = repeat_some_tasks[t]
+            if isinstance(repeat, str):
+                repeat = len(self.dataset.variables[repeat])
+            # If there is no 'multi' or 'multi' = False in the task
+            if not self.hierarchy[t].json_elements.get('multi'):
+                self._launch_execution(t, self._drivers_of(t)[-1], repeat)
+            else:
+                self._threaded_execution(t, repeat)
+        else:
+            if not self.hierarchy[t].json_elements.get('multi'):
+                self._launch_execution(t, self._drivers_of(t)[-1])
+            else:
+                self._threaded_execution(t)
+
+        # The session is saved right after the login, so the next run can skip it
+        if self.hierarchy[t].json_elements.get('skip_if_present'):
+            for driver in self._drivers_of(t):
+                self.pool.save_session(driver)
+        self.journal.task_done(t)
+        self.task_durations[t] = time.perf_counter() - start
+        METRICS.observe('program_task_seconds', self.task_durations[t], task = t)
+
+    """
+    ------------- Aim --------------
+    Reads the dependencies declared between the tasks by "depends_on" and "streams_from". A task without
+    "depends_on" depends on the previous task of the file. The tasks not executed (already done by a
+    resumed run, or not asked) are ignored.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | task_names    | Names of the tasks to execute, in the order of the file
+
+    ------------ Output ------------
+    (TYPE)       | NAME         | DESCRIPTION
+    (dict)       | dependencies | (tasks to wait for, task streaming the urls or None) of each task, None if
+                 |              | no dependency is declared or if they are not valid: the tasks are then
+                 |              | executed in the order of the file
+    """
+    def _task_dependencies(self, task_names):
+        options = [self.hierarchy[t].json_elements for t in task_names]
+        if not any('depends_on' in option or 'streams_from' in option for option in options):
+            return None
+
+        dependencies = dict()
+        for index, t in enumerate(task_names):
+            depends_on = options[index].get('depends_on', task_names[index - 1:index])
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            producer = options[index].get('streams_from')
+            unknown = [name for name in depends_on + ([producer] if producer else []) if name not in self.hierarchy]
+            if unknown:
+                print('Unknown tasks in the dependencies of ' + t + ': ' + ', '.join(unknown) + ', tasks executed in order')
+                return None
+            # A task skipped by the resume or not executed is considered done
+            dependencies[t] = ([name for name in depends_on if name in task_names],
+                               producer if producer in task_names else None)
+
+        # Every task must be reachable, otherwise the tasks waiting for each other would never start
+        done = set()
+        while len(done) < len(task_names):
+            ready = [t for t in task_names if t not in done and set(dependencies[t][0]) <= done
+                     and (dependencies[t][1] is None or set(dependencies[dependencies[t][1]][0]) <= done)]
+            if not ready:
+                print('Circular dependencies between ' + ', '.join(t for t in task_names if t not in done) + ', tasks executed in order')
+                return None
+            done.update(ready)
+        return dependencies
+
+    """
+    ------------- Aim --------------
+    Executes every task in its own thread as soon as the tasks it depends on are done. A task streaming
+    from another one starts with it, and the url queue is closed once the task streaming the urls is done.
+    The tasks depending on a task which failed are skipped, and the error is raised once every thread is
+    done, so the run is not marked as finished in its journal and can be resumed.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME              | DESCRIPTION
+    (dict)       | dependencies      | Dependencies of the tasks returned by _task_dependencies
+    (Bool)       | run_background    | Decides if the drivers are executed on background
+    (dict)       | repeat_some_tasks | Number of repetitions of some tasks
+    """
+    def _pipelined_execution(self, dependencies, run_background, repeat_some_tasks):
+        started = {t: Event() for t in dependencies}
+        finished = {t: Event() for t in dependencies}
+        producers = {producer for depends_on, producer in dependencies.values() if producer is not None}
+        # Error of each task which failed, None for the tasks skipped because of it
+        failed = dict()
+
+        def run(t):
+            depends_on, producer = dependencies[t]
+            for name in depends_on:
+                finished[name].wait()
+            if producer is not None:
+                started[producer].wait()
+            failed_before = [name for name in depends_on + ([producer] if producer is not None else []) if name in failed]
+            if failed_before:
+                print('Task ' + t + ' skipped, ' + ', '.join(failed_before) + ' failed')
+                # Marked as failed before the tasks streaming from it start
+                failed[t] = None
+                started[t].set()
+                if t in producers:
+                    self.dataset.variables['url_queue'].close()
+                finished[t].set()
+                return
+            started[t].set()
+            print('Starting task ' + t)
+            try:
+                self._execute_task(t, run_background, repeat_some_tasks, streaming = producer is not None)
+            except Exception as e:
+                print('Error in ' + t + ': ')
+                print(e)
+                failed[t] = e
+            finally:
+                # The tasks scraping the urls stop once the queue is empty
+                if t in producers:
+                    self.dataset.variables['url_queue'].close()
+                finished[t].set()
+
+        threads = [Thread(target = run, args = (t,)) for t in dependencies]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        errors = [error for error in failed.values() if error is not None]
+        if errors:
+            raise errors[0]
+
+    """
+    ------------- Aim --------------
+    Saves the sessions, quits the Chrome drivers kept warm in the pool and closes the export files
+    """
+    def close(self):
+        self.pool.shutdown()
+        self.dataset.close_streams()
+        self.journal.close()
+        if self.page_cache is not None:
+            self.page_cache.close()
+            self.page_cache = None
+            self.cached_drivers = dict()
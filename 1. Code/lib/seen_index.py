@@ -0,0 +1,109 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+SEEN_INDEX_PATH = os.path.join('..', '2. Exports', 'seen_offers.db')
+# Job identifier in the url of an offer of each website
+JOB_ID_PATTERNS = [('linkedin', re.compile(r'/jobs/view/(?:[^/?#]*-)?(\d+)')),
+                   ('linkedin', re.compile(r'[?&]currentJobId=(\d+)')),
+                   ('indeed', re.compile(r'[?&](?:jk|vjk)=([0-9a-fA-F]+)')),
+                   ('glassdoor', re.compile(r'[?&](?:jobListingId|jl)=(\d+)'))]
+# Maximum number of parameters of a single SQLite query
+QUERY_CHUNK_SIZE = 500
+
+
+"""
+------------- Aim --------------
+Normalizes the url of an offer to the identifier of the job, so the same offer reached through
+different tracking parameters is recognized
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | url           | Url of the offer
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(str)        | job_id | 'website:identifier', or the url without its query if the website is unknown
+"""
+def job_id(url):
+    url = str(url).strip()
+    for site, pattern in JOB_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return site + ':' + match.group(1).lower()
+    parts = urlsplit(url)
+    return parts.netloc.lower() + parts.path.rstrip('/')
+
+
+class SeenIndex():
+
+    """
+    ------------- Aim --------------
+    Initialize the persistent index of the offers already scraped by the previous runs, stored in a
+    SQLite table keyed by the normalized job identifier
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the SQLite file
+    """
+    def __init__(self, path = SEEN_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+        self._lock = threading.Lock()
+        # The index is shared by the threads of the drivers, the lock serializes the queries
+        self._connection = sqlite3.connect(path, check_same_thread = False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS seen_offers (job_id TEXT PRIMARY KEY, url TEXT, first_seen TEXT)")
+        self._connection.commit()
+
+    """
+    ------------- Aim --------------
+    Keeps only the urls of offers never scraped
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (iterable)   | urls          | Urls of offers
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (list)       | urls   | Urls of the new offers, in the same order
+    """
+    def new_urls(self, urls):
+        urls = [url for url in urls if url]
+        ids = [job_id(url) for url in urls]
+        known = set()
+        with self._lock:
+            for start in range(0, len(ids), QUERY_CHUNK_SIZE):
+                chunk = ids[start:start + QUERY_CHUNK_SIZE]
+                rows = self._connection.execute("SELECT job_id FROM seen_offers WHERE job_id IN (" + ",".join("?" * len(chunk)) + ")", chunk)
+                known.update(row[0] for row in rows)
+        return [url for url, identifier in zip(urls, ids) if identifier not in known]
+
+    """
+    ------------- Aim --------------
+    Records offers as scraped
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str) or (list) | urls       | Url or urls of the offers scraped
+    """
+    def mark(self, urls):
+        if isinstance(urls, str):
+            urls = [urls]
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._connection.executemany("INSERT OR IGNORE INTO seen_offers VALUES (?, ?, ?)",
+                                         [(job_id(url), url, now) for url in urls if url])
+            self._connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM seen_offers").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
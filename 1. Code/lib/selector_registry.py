@@ -0,0 +1,199 @@
+import os
+import json
+import threading
+
+from lxml import etree
+from selenium.webdriver.common.by import By
+
+LOGIN_PATH = os.path.join('..', '7. Config', 'login.json')
+# Maps the enumerations of login.json to the 'By' enumerations
+BY_ENUMS = {'NAME': By.NAME, 'CLASS': By.CLASS_NAME, 'ID': By.ID, 'XPATH': By.XPATH, 'CLASS_NAME': By.CLASS_NAME}
+
+# Registries already loaded in the process, shared by all the drivers
+_registries = dict()
+_registries_lock = threading.Lock()
+
+
+"""
+------------- Aim --------------
+Translates an element of login.json into an XPath expression usable on a parsed html page
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | enum          | Enumeration of the element in login.json (XPATH, CLASS_NAME, ID, NAME)
+(str)        | tag           | Tag of the element in login.json
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(str)        | xpath  | XPath expression of the element
+"""
+def to_xpath(enum, tag):
+    if enum == 'XPATH':
+        return tag
+    if enum in ['CLASS', 'CLASS_NAME']:
+        # As in the browser, "a.b" means an element having both classes
+        conditions = ["[contains(concat(' ', normalize-space(@class), ' '), ' " + class_name.strip() + " ')]"
+                      for class_name in tag.split('.') if class_name.strip()]
+        return "//*" + "".join(conditions)
+    if enum == 'ID':
+        return "//*[@id='" + tag.strip() + "']"
+    if enum == 'NAME':
+        return "//*[@name='" + tag.strip() + "']"
+    raise ValueError('Unknown enum for an XPath: ' + str(enum))
+
+
+"""
+------------- Aim --------------
+Returns the registry of a login.json file, loaded only once per process
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | path          | Path of the login.json file
+
+------------ Output ------------
+(TYPE)             | NAME     | DESCRIPTION
+(SelectorRegistry) | registry | Registry shared by all the drivers
+"""
+def load_registry(path = LOGIN_PATH):
+    key = os.path.abspath(path)
+    with _registries_lock:
+        if key not in _registries:
+            with open(path) as f:
+                _registries[key] = SelectorRegistry(json.load(f)['page_elements'])
+        return _registries[key]
+
+
+class PageTemplate():
+
+    """
+    ------------- Aim --------------
+    Initialize a templated XPath such as 'button|@aria-label|Page ' (tag, attribute, text before the number)
+    with an optional fourth part multiplying the number. The constant parts are assembled only once.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | template      | Parts of the template separated by '|'
+    (str)        | quote         | Quote surrounding the text in the XPath
+    """
+    def __init__(self, template, quote = "'"):
+        parts = template.split('|')
+        self.prefix = "//" + parts[0] + "[contains(" + parts[1] + ", " + quote + parts[2]
+        self.suffix = quote + ")]"
+        self.step = int(parts[3]) if len(parts) > 3 else 1
+
+    """
+    ------------- Aim --------------
+    Returns the XPath for a given number
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (int)        | number        | Number to substitute, multiplied by the step of the template
+    """
+    def fill(self, number):
+        return self.prefix + str(number * self.step) + self.suffix
+
+
+class Selector():
+
+    """
+    ------------- Aim --------------
+    Initialize an element of login.json with its 'By' enumeration resolved once
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | name          | Name of the element
+    (str)        | enum          | Enumeration of the element in login.json
+    (str)        | tag           | Tag of the element
+    (bool)       | template      | The tag is a templated XPath filled with a page number (see PageTemplate)
+    """
+    def __init__(self, name, enum, tag, template = False):
+        self.name = name
+        self.enum = enum
+        self.tag = tag
+        self.by = BY_ENUMS[enum]
+        self.info = (self.by, self.tag)
+        # Templated XPath (page_button) are marked by "template": true, a '|' being also the union of two XPath
+        self.template = PageTemplate(tag) if template else None
+        # lxml evaluators are compiled once per thread and not shared between threads
+        self._local = threading.local()
+
+    """
+    ------------- Aim --------------
+    Returns the tag of the element for a page number if the element is templated, the tag otherwise
+    """
+    def page(self, number):
+        if self.template is None:
+            return self.tag
+        return self.template.fill(number)
+
+    """
+    ------------- Aim --------------
+    Returns the compiled XPath of the element, to be evaluated on a page parsed with lxml
+    """
+    @property
+    def xpath(self):
+        compiled = getattr(self._local, 'xpath', None)
+        if compiled is None:
+            compiled = self._local.xpath = etree.XPath(to_xpath(self.enum, self.tag))
+        return compiled
+
+
+class SelectorRegistry():
+
+    """
+    ------------- Aim --------------
+    Initialize the registry of the page_elements of login.json
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (dict)       | page_elements | Elements of login.json
+    """
+    def __init__(self, page_elements):
+        self.page_elements = page_elements
+        self.selectors = {name: Selector(name, element['enum'], element['tag'], element.get('template', False))
+                          for name, element in page_elements.items()}
+        self.templates = dict()
+        self._templates_lock = threading.Lock()
+
+    def __getitem__(self, element_name):
+        return self.selectors[element_name]
+
+    def __contains__(self, element_name):
+        return element_name in self.selectors
+
+    """
+    ------------- Aim --------------
+    Maps the name of a given element to its 'By' enumeration and tag
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | element_name  | Name of the element to be mapped
+    """
+    def info(self, element_name):
+        return self.selectors[element_name].info
+
+    """
+    ------------- Aim --------------
+    Returns the compiled XPath of an element, to be evaluated on a page parsed with lxml
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | element_name  | Name of the element
+    """
+    def xpath(self, element_name):
+        return self.selectors[element_name].xpath
+
+    """
+    ------------- Aim --------------
+    Returns a template given as a parameter of an action (e.g. on_error), parsed only once
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | template      | Parts of the template separated by '|'
+    (str)        | quote         | Quote surrounding the text in the XPath
+    """
+    def template(self, template, quote = "'"):
+        with self._templates_lock:
+            if (template, quote) not in self.templates:
+                self.templates[(template, quote)] = PageTemplate(template, quote)
+            return self.templates[(template, quote)]
@@ -0,0 +1,211 @@
+import os
+import time
+import secrets
+import threading
+import multiprocessing
+
+from lib.program import Program
+from lib.journal import RunJournal
+from lib.export_stream import EXPORT_FOLDER, RowStream
+from lib.frontier import Frontier, FrontierQueue, serve_frontier, stop_frontier, connect_frontier
+
+SHARDS_FOLDER = os.path.join(EXPORT_FOLDER, 'shards')
+# Seconds between two prints of the progress of the workers
+PROGRESS_INTERVAL = 30
+
+
+"""
+------------- Aim --------------
+Returns the tasks executed by the workers of a sharded run: the task loading the urls of the url queue
+and the tasks since the Driver task before it (e.g. Driver Multi, Connect multi, Scrap multi)
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(dict)       | hierarchy     | Tasks of the Program
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(list)       |        | Names of the tasks of the workers, empty if no task uses the url queue
+"""
+def worker_tasks(hierarchy):
+    task_names = list(hierarchy)
+    queue_task = next((t for t in task_names if hierarchy[t].uses_url_queue()), None)
+    if queue_task is None:
+        return []
+    index = task_names.index(queue_task)
+    start = max([i for i, t in enumerate(task_names[:index]) if "Driver" in t], default = index)
+    return task_names[start:index + 1]
+
+
+class ShardRows(RowStream):
+
+    """
+    ------------- Aim --------------
+    Initialize the rows scraped by a worker: written to its own file and kept per url until they are sent
+    to the coordinator with their url. The drivers of the worker run in their own threads, the rows of a
+    thread belong to the url it loads (driver.queued_url, marked by begin).
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the JSONL file of the worker
+    """
+    def __init__(self, path):
+        super().__init__(path)
+        self._unsent = dict()
+        self._unsent_lock = threading.Lock()
+        self._local = threading.local()
+
+    def begin(self, url):
+        self._local.url = url
+
+    def append(self, row):
+        super().append(row)
+        with self._unsent_lock:
+            self._unsent.setdefault(getattr(self._local, 'url', None), []).append(row)
+
+    """
+    ------------- Aim --------------
+    Returns the rows of a url not sent to the coordinator yet
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url scraped
+    """
+    def take(self, url):
+        with self._unsent_lock:
+            return self._unsent.pop(url, [])
+
+    # The rows of a url which failed are scraped again by its retry
+    def discard(self, url):
+        with self._unsent_lock:
+            self._unsent.pop(url, None)
+
+
+"""
+------------- Aim --------------
+Runs a worker of a sharded run: a Program with its own drivers and credentials, executing the worker
+tasks on the urls leased from the frontier of the coordinator. Started by the coordinator for the
+workers of its host, or by shard.py on other hosts.
+
+---------- Parameters ----------
+(TYPE)       | NAME           | DESCRIPTION
+(str)        | website        | Name of the appdata file
+(tuple)      | address        | (host, port) of the frontier of the coordinator
+(bytes)      | authkey        | Key of the frontier
+(str)        | worker         | Identifier of the worker, unique in the run
+(list)       | logins         | Credentials of the drivers of the worker, the ones of login.json if empty
+(Bool)       | run_background | Decides if the drivers are executed on background
+"""
+def run_worker(website, address, authkey, worker, logins = None, run_background = False):
+    frontier = connect_frontier(address, authkey)
+    program = Program(website)
+    if logins:
+        program.logins = logins
+    # The files of the worker are named after it, so the workers of a host never write the same files
+    program.website_to_display = website + '-' + worker
+    rows_path = os.path.join(SHARDS_FOLDER, program.website_to_display + '.jsonl')
+    if os.path.exists(rows_path):
+        os.remove(rows_path)
+    rows = ShardRows(rows_path)
+    program.dataset.variables['page_content'] = rows
+    program.journal = RunJournal(program.website_to_display)
+    program.use_url_queue(FrontierQueue(frontier, worker, rows))
+    try:
+        program.execute(run_background = run_background, tasks = worker_tasks(program.hierarchy))
+    finally:
+        program.close()
+
+
+class Coordinator():
+
+    """
+    ------------- Aim --------------
+    Initialize the coordinator of a sharded run. The coordinator executes the tasks collecting the links
+    into a frontier served on a socket, worker processes (run_worker) lease the urls and scrape them with
+    their own drivers, and the rows they report are written to the single export of the coordinator.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME           | DESCRIPTION
+    (str)        | website        | Name of the appdata file
+    (int)        | workers        | Number of worker processes started on this host
+    (str)        | host           | Interface of the frontier, 0.0.0.0 to accept workers of other hosts
+    (int)        | port           | Port of the frontier, any free port if 0
+    (str)        | authkey        | Key the workers must give, random if empty (workers of this host only)
+    (int)        | remote_workers | Number of workers started on other hosts with shard.py
+    """
+    def __init__(self, website, workers = 2, host = '127.0.0.1', port = 0, authkey = '', remote_workers = 0):
+        self.website = website
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.authkey = (authkey or secrets.token_hex(16)).encode()
+        self.remote_workers = remote_workers
+        self.processes = []
+        self.program = Program(website)
+        self.frontier = Frontier(os.path.join(SHARDS_FOLDER, website + '-frontier.db'), self.program.dataset.variables['page_content'])
+
+    """
+    ------------- Aim --------------
+    Executes the Program with its url queue scraped by the workers
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME              | DESCRIPTION
+    (dict)       | repeat_some_tasks | Number of repetitions of some tasks
+    (Bool)       | run_background    | Decides if the drivers are executed on background
+    """
+    def run(self, repeat_some_tasks = {}, run_background = False):
+        server, address = serve_frontier(self.frontier, self.host, self.port, self.authkey)
+        print('Frontier of ' + self.website + ' served on ' + str(address[0]) + ':' + str(address[1]))
+        self.program.use_url_queue(FrontierQueue(self.frontier, 'coordinator', owner = True))
+        self.program.shards = self
+
+        # The workers start their drivers and log in while the links are collected
+        logins = self.program.logins
+        if self.workers > len(logins):
+            print(str(len(logins)) + ' credentials for ' + str(self.workers) + ' workers, ' + str(len(logins)) + ' workers started')
+            self.workers = len(logins)
+        local_address = ('127.0.0.1' if address[0] == '0.0.0.0' else address[0], address[1])
+        context = multiprocessing.get_context('spawn')
+        for index in range(self.workers):
+            process = context.Process(target = run_worker,
+                                      args = (self.website, local_address, self.authkey, 'worker' + str(index), logins[index::self.workers], run_background))
+            process.start()
+            self.processes.append(process)
+
+        # The tasks of the workers are not executed by the coordinator, except the task of the url queue
+        # which waits for the workers
+        skipped_tasks = worker_tasks(self.program.hierarchy)[:-1]
+        try:
+            self.program.execute(repeat_some_tasks, run_background, tasks = [t for t in self.program.hierarchy if t not in skipped_tasks])
+        finally:
+            self.frontier.close()
+            for process in self.processes:
+                process.join()
+            stop_frontier(server)
+
+    """
+    ------------- Aim --------------
+    Waits until every url of the frontier is scraped, called by the task of the url queue
+    """
+    def wait(self):
+        last_print = time.time()
+        while not self.frontier.exhausted():
+            if not self.remote_workers and not any(process.is_alive() for process in self.processes):
+                print('Every worker stopped, ' + str(self.frontier.state()['pending']) + ' urls not scraped')
+                break
+            if time.time() - last_print >= PROGRESS_INTERVAL:
+                state = self.frontier.state()
+                print('Frontier: ' + str(state['done']) + ' urls scraped, ' + str(state['pending'] + state['leased']) + ' left')
+                last_print = time.time()
+            time.sleep(1)
+        for process in self.processes:
+            process.join()
+
+        state = self.frontier.state()
+        print(str(state['done']) + ' urls scraped by ' + str(len(state['workers'])) + ' workers, ' + str(state['failed']) + ' abandoned')
+        for worker, done in sorted(state['workers'].items()):
+            print('  ' + worker + ': ' + str(done))
+
+    def close(self):
+        self.program.close()
+        self.frontier.shutdown()
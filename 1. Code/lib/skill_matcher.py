@@ -0,0 +1,241 @@
+import os
+import re
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+SKILLS_PATH = os.path.join('..', '7. Config', 'skills.json')
+# Columns of the skills found, one row per skill of an offer
+SKILL_COLUMNS = ['offerID', 'Skill', 'Category', 'Count']
+# Tokens of a description: words with their inner dots and the characters of c++, c# or .net (so that
+# "node.js" is a single token and "r" never matches in "array"), ampersands being part of the words (so
+# that "R&D" is not "R"), slashes and dashes being tokens of their own (so that "Python/SQL" gives both
+# skills and "ci/cd" still matches)
+TOKEN_PATTERN = re.compile(r"(?:\.(?=\w))?[\w+#&]+(?:\.[\w+#&]+)*|[/\-]")
+# Signs and words separating the items of a list: a term matched in lists only (e.g. "Go", and not "Go
+# further") is kept next to one of them or next to another skill
+LIST_SIGNS = re.compile(r"[,;|•·()\[\]]")
+LIST_WORDS = ['and', 'or', 'et', 'ou', 'en', '&', '/']
+# Number of descriptions scanned by a process at once
+CHUNK_SIZE = 2000
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text) if isinstance(text, str) else []
+
+
+"""
+------------- Aim --------------
+Reads the skill taxonomy: each skill has a category, aliases matched whatever their case, variants per
+language, terms matched with their case only (e.g. "SAS" and not "sas") and terms matched with their case
+in lists of skills only (e.g. "Go" in "Python, Go" and not in "Go further")
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | path          | Path of the JSON file of the skills
+
+------------ Output ------------
+(TYPE)       | NAME     | DESCRIPTION
+(dict)       | taxonomy | {skill: {"category": str, "aliases": list, "languages": dict, "case_sensitive": list,
+             |          |          "listed": list}}
+"""
+def load_taxonomy(path = SKILLS_PATH):
+    with open(path, encoding = 'utf-8') as file:
+        return json.load(file)
+
+
+class SkillMatcher():
+
+    """
+    ------------- Aim --------------
+    Initialize the skill matcher: an Aho-Corasick automaton on the tokens of the terms of the taxonomy.
+    A description is scanned once whatever the number of skills, each token following a transition of
+    the automaton, and the terms found are the outputs of the states reached.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (dict)       | taxonomy      | Skills, as returned by load_taxonomy
+    """
+    def __init__(self, taxonomy):
+        self.categories = {skill: definition.get('category', '') for skill, definition in taxonomy.items()}
+        # Ids of the tokens of the terms, the tokens matched with their case being kept apart
+        self.symbols = dict()
+        self.exact_symbols = dict()
+        # Transitions, failure link and outputs (skill, number of tokens of the term, matched with its case,
+        # matched in lists only) of each state
+        self.goto = [dict()]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        for skill, definition in taxonomy.items():
+            # A skill matched with its case (e.g. "R") is not matched by its name whatever its case
+            exact_terms = definition.get('case_sensitive', [])
+            listed_terms = definition.get('listed', [])
+            terms = [skill] if skill not in exact_terms + listed_terms else []
+            terms += definition.get('aliases', [])
+            terms += [term for variants in definition.get('languages', {}).values() for term in variants]
+            for term in terms:
+                self._add_term([self.symbols.setdefault(token.lower(), len(self.symbols) + len(self.exact_symbols))
+                                for token in tokenize(term)], skill, False, False)
+            for term in exact_terms + listed_terms:
+                self._add_term([self.exact_symbols.setdefault(token, len(self.symbols) + len(self.exact_symbols))
+                                for token in tokenize(term)], skill, True, term in listed_terms)
+        self._build_failure_links()
+
+    def _add_term(self, symbols, skill, exact, listed):
+        if not symbols:
+            return
+        state = 0
+        for symbol in symbols:
+            if symbol not in self.goto[state]:
+                self.goto.append(dict())
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[state][symbol] = len(self.goto) - 1
+            state = self.goto[state][symbol]
+        if (skill, len(symbols), exact, listed) not in self.outputs[state]:
+            self.outputs[state].append((skill, len(symbols), exact, listed))
+
+    def _build_failure_links(self):
+        # Breadth first: the failure link of a state is the longest suffix of its term which is a prefix of another term
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for symbol, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and symbol not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(symbol, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+                queue.append(child)
+
+    """
+    ------------- Aim --------------
+    Finds the skills of a description. When terms overlap (e.g. "sql server" and "sql"), only the longest
+    one starting first is kept. A single word matched with its case is ignored when a dash and another word
+    directly follow it (e.g. "Go-to-market"), a term matched in lists only is ignored out of a list.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | description   | Job description
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (dict)       | hits   | Number of times each skill is found
+    """
+    def match(self, description):
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        symbols, exact_symbols = self.symbols, self.exact_symbols
+        tokens = list(TOKEN_PATTERN.finditer(description)) if isinstance(description, str) else []
+        matches = []
+        state = 0
+        for position, found in enumerate(tokens):
+            token = found.group()
+            symbol = exact_symbols.get(token) if token in exact_symbols else symbols.get(token.lower())
+            if symbol is None:
+                state = 0
+                continue
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            for skill, length, exact, listed in outputs[state]:
+                if exact and length == 1 and self._compound(tokens, position):
+                    continue
+                matches.append((position - length + 1, -length, skill, listed))
+
+        if any(listed for start, negative_length, skill, listed in matches):
+            # Tokens where the other skills start and end
+            starts = {start for start, negative_length, skill, listed in matches if not listed}
+            ends = {start - negative_length - 1 for start, negative_length, skill, listed in matches if not listed}
+            matches = [(start, negative_length, skill, listed) for start, negative_length, skill, listed in matches
+                       if not listed or self._listed(description, tokens, start, starts, ends)]
+
+        # Sorted by start and longest first, a term is kept if it starts after the end of the last one kept
+        hits = dict()
+        end = -1
+        for start, negative_length, skill, listed in sorted(matches):
+            if start > end:
+                hits[skill] = hits.get(skill, 0) + 1
+                end = start - negative_length - 1
+        return hits
+
+    @staticmethod
+    def _compound(tokens, position):
+        # The token is the first word of a compound: a dash and a word without any space between them
+        if position + 2 >= len(tokens):
+            return False
+        dash, word = tokens[position + 1], tokens[position + 2]
+        return (dash.group() == '-' and dash.start() == tokens[position].end()
+                and word.start() == dash.end() and word.group() not in ['-', '/'])
+
+    @staticmethod
+    def _listed(description, tokens, position, starts, ends):
+        # The token is an item of a list: a separator or another skill just before or after it
+        before = description[tokens[position - 1].end() if position else 0:tokens[position].start()]
+        after = description[tokens[position].end():tokens[position + 1].start() if position + 1 < len(tokens) else len(description)]
+        if LIST_SIGNS.search(before) or LIST_SIGNS.search(after):
+            return True
+        if position and (tokens[position - 1].group().lower() in LIST_WORDS or position - 1 in ends):
+            return True
+        return position + 1 < len(tokens) and (tokens[position + 1].group().lower() in LIST_WORDS or position + 1 in starts)
+
+    """
+    ------------- Aim --------------
+    Finds the skills of many descriptions
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (DataFrame)  | skills | Skills found per offer (SKILL_COLUMNS)
+    """
+    def match_offers(self, descriptions, offer_ids):
+        rows = [(offer_id, skill, self.categories[skill], count)
+                for offer_id, description in zip(offer_ids, descriptions)
+                for skill, count in self.match(description).items()]
+        return pd.DataFrame(rows, columns = SKILL_COLUMNS)
+
+
+# Matcher of the processes scanning the descriptions, compiled once per process
+_process_matcher = None
+
+
+def _init_process(taxonomy):
+    global _process_matcher
+    _process_matcher = SkillMatcher(taxonomy)
+
+
+def _match_chunk(descriptions, offer_ids):
+    return _process_matcher.match_offers(descriptions, offer_ids)
+
+
+"""
+------------- Aim --------------
+Finds the technical skills of the offers, the descriptions being scanned in parallel by several processes
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(list)       | descriptions  | Job descriptions
+(list)       | offer_ids     | Identifier of each offer
+(dict)       | taxonomy      | Skills, the ones of SKILLS_PATH if None
+(int)        | workers       | Number of processes, one per core if None
+
+------------ Output ------------
+(TYPE)       | NAME   | DESCRIPTION
+(DataFrame)  | skills | Skills found per offer (SKILL_COLUMNS)
+"""
+def find_skills(descriptions, offer_ids, taxonomy = None, workers = None, chunk_size = CHUNK_SIZE):
+    taxonomy = taxonomy if taxonomy is not None else load_taxonomy()
+    descriptions, offer_ids = list(descriptions), list(offer_ids)
+    chunks = [(descriptions[start:start + chunk_size], offer_ids[start:start + chunk_size])
+              for start in range(0, len(descriptions), chunk_size)]
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(chunks) <= 1:
+        matcher = SkillMatcher(taxonomy)
+        tables = [matcher.match_offers(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers = min(workers, len(chunks)), initializer = _init_process, initargs = (taxonomy,)) as executor:
+            tables = list(executor.map(_match_chunk, *zip(*chunks)))
+
+    if not tables:
+        return pd.DataFrame(columns = SKILL_COLUMNS)
+    return pd.concat(tables, ignore_index = True)
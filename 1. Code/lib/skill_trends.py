@@ -0,0 +1,219 @@
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from lib.seen_index import job_id
+
+TRENDS_PATH = os.path.join('..', '2. Exports', 'skill_trends.npz')
+# Extract of the trends read by the Tableau workbooks
+EXTRACT_PATH = os.path.join('..', '4. Reports', 'skill_trends.csv')
+EXTRACT_COLUMNS = ['Date', 'Site', 'Skill', 'Category', 'Offers', 'Total_offers', 'Share']
+
+
+"""
+------------- Aim --------------
+Returns the website and the identifier of an offer from its url, e.g. ('linkedin', 'linkedin:3422086702')
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(str)        | url           | Url of the offer
+"""
+def offer_key(url):
+    key = job_id(url)
+    site = key.split(':', 1)[0] if ':' in key else key.split('/', 1)[0]
+    return site, key
+
+
+class SkillTrends():
+
+    """
+    ------------- Aim --------------
+    Initialize the trend store of the skills: the number of offers mentioning each skill per website and
+    per day of publication, kept in a numpy array (skills x sites x days) with the total number of offers
+    per website and day. The offers of each scrape are merged without reading the previous exports, an
+    offer already merged (same job identifier) being ignored.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the store (.npz), created at the first save
+    """
+    def __init__(self, path = TRENDS_PATH):
+        self.path = path
+        if os.path.exists(path):
+            with np.load(path, allow_pickle = False) as store:
+                self.skills = list(store['skills'])
+                self.categories = list(store['categories'])
+                self.sites = list(store['sites'])
+                self.first_day = int(store['first_day'])
+                self.counts = store['counts']
+                self.offers = store['offers']
+                self.merged = set(store['merged'])
+        else:
+            self.skills = []
+            self.categories = []
+            self.sites = []
+            self.first_day = 0
+            self.counts = np.zeros((0, 0, 0), dtype = np.int32)
+            self.offers = np.zeros((0, 0), dtype = np.int32)
+            self.merged = set()
+
+    @property
+    def days(self):
+        return pd.to_datetime([date.fromordinal(self.first_day + day) for day in range(self.offers.shape[1])])
+
+    """
+    ------------- Aim --------------
+    Merges the skills found in new offers
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (DataFrame)  | skills        | Skills found per offer, with the columns offerID, Skill and Category (see lib/skill_matcher.py)
+    (Series)     | dates         | Date of publication of each offer, indexed by offerID (not a date: the offer is ignored)
+    (Series)     | urls          | Url of each offer, indexed by offerID
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (int)        |        | Number of offers merged
+    """
+    def merge(self, skills, dates, urls):
+        # The dates estimated from the exports are dates, or 'Error'
+        dates = pd.Series(dates).map(lambda value: pd.to_datetime(value, errors = 'coerce'))
+        new = dict()
+        new_keys = set()
+        for offer_id, url in pd.Series(urls).items():
+            site, key = offer_key(url)
+            if pd.isna(dates.get(offer_id)) or key in self.merged or key in new_keys:
+                continue
+            new[offer_id] = (site, key)
+            new_keys.add(key)
+        if not new:
+            return 0
+        offer_ids = list(new)
+        days = np.array([dates[offer_id].date().toordinal() for offer_id in offer_ids])
+
+        # The axes grow with the new skills, websites and days
+        for skill, category in skills[['Skill', 'Category']].drop_duplicates('Skill').itertuples(index = False):
+            if skill not in self.skills:
+                self.skills.append(skill)
+                self.categories.append(category)
+        for site, key in new.values():
+            if site not in self.sites:
+                self.sites.append(site)
+        self._resize(days.min(), days.max())
+
+        skill_index = {skill: index for index, skill in enumerate(self.skills)}
+        site_index = {site: index for index, site in enumerate(self.sites)}
+        offer_sites = pd.Series([site_index[site] for site, key in new.values()], index = offer_ids)
+        offer_days = pd.Series(days - self.first_day, index = offer_ids)
+        np.add.at(self.offers, (offer_sites.to_numpy(), offer_days.to_numpy()), 1)
+        hits = skills[skills['offerID'].isin(offer_ids)].drop_duplicates(['offerID', 'Skill'])
+        np.add.at(self.counts, (hits['Skill'].map(skill_index).to_numpy(),
+                                offer_sites.loc[hits['offerID']].to_numpy(),
+                                offer_days.loc[hits['offerID']].to_numpy()), 1)
+        self.merged.update(new_keys)
+        return len(new)
+
+    def _resize(self, first_day, last_day):
+        if not self.offers.shape[1]:
+            self.first_day = first_day
+        start = min(first_day, self.first_day)
+        length = max(last_day, self.first_day + self.offers.shape[1] - 1) - start + 1
+        shift = self.first_day - start
+        counts = np.zeros((len(self.skills), len(self.sites), length), dtype = np.int32)
+        counts[:self.counts.shape[0], :self.counts.shape[1], shift:shift + self.counts.shape[2]] = self.counts
+        offers = np.zeros((len(self.sites), length), dtype = np.int32)
+        offers[:self.offers.shape[0], shift:shift + self.offers.shape[1]] = self.offers
+        self.counts, self.offers, self.first_day = counts, offers, start
+
+    """
+    ------------- Aim --------------
+    Writes the store, under another name first so an interrupted save never loses the previous one
+    """
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok = True)
+        temporary = self.path + '.tmp.npz'
+        np.savez_compressed(temporary,
+                            skills     = np.array(self.skills, dtype = str),
+                            categories = np.array(self.categories, dtype = str),
+                            sites      = np.array(self.sites, dtype = str),
+                            first_day  = np.array(self.first_day),
+                            counts     = self.counts,
+                            offers     = self.offers,
+                            merged     = np.array(sorted(self.merged), dtype = str))
+        os.replace(temporary, self.path)
+
+    def _aggregate(self, array, freq):
+        # Sums the days of each week (starting on Monday) or month, the last axis being the days
+        if freq == 'day' or not array.shape[-1]:
+            return array, self.days
+        periods = self.days.to_period('W' if freq == 'week' else 'M')
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        return np.add.reduceat(array, starts, axis = -1), periods[starts].start_time
+
+    """
+    ------------- Aim --------------
+    Returns the number of offers mentioning a skill over time
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | skill         | Name of the skill
+    (str)        | site          | Website, all the websites if None
+    (str)        | freq          | Period of the values: day, week or month
+    (bool)       | share         | Returns the share of the offers of the period instead of their number
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (Series)     | trend  | Value per period, indexed by the start of the period
+    """
+    def trend(self, skill, site = None, freq = 'week', share = False):
+        sites = slice(None) if site is None else [self.sites.index(site)]
+        mentions, periods = self._aggregate(self.counts[self.skills.index(skill), sites].sum(axis = 0), freq)
+        if share:
+            totals, periods = self._aggregate(self.offers[sites].sum(axis = 0), freq)
+            mentions = np.divide(mentions, totals, out = np.zeros(len(totals)), where = totals > 0)
+        return pd.Series(mentions, index = periods, name = skill)
+
+    """
+    ------------- Aim --------------
+    Returns the skills mentioned by the most offers between two dates
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (date)       | start         | First day, the first day of the store if None
+    (date)       | end           | Last day, the last day of the store if None
+    (str)        | site          | Website, all the websites if None
+    (int)        | limit         | Number of skills returned
+    """
+    def top(self, start = None, end = None, site = None, limit = 20):
+        first = 0 if start is None else max(pd.Timestamp(start).date().toordinal() - self.first_day, 0)
+        last = self.offers.shape[1] if end is None else pd.Timestamp(end).date().toordinal() - self.first_day + 1
+        sites = slice(None) if site is None else [self.sites.index(site)]
+        totals = self.counts[:, sites, first:last].sum(axis = (1, 2))
+        return pd.Series(totals, index = self.skills).sort_values(ascending = False).head(limit)
+
+    """
+    ------------- Aim --------------
+    Writes the trends of all the skills in a CSV file read by Tableau, a row per period, website and skill
+    mentioned
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | path          | Path of the CSV file
+    (str)        | freq          | Period of the rows: day, week or month
+    """
+    def export_extract(self, path = EXTRACT_PATH, freq = 'week'):
+        counts, periods = self._aggregate(self.counts, freq)
+        totals, periods = self._aggregate(self.offers, freq)
+        skills, sites, days = np.nonzero(counts)
+        extract = pd.DataFrame({'Date'        : periods[days].date,
+                                'Site'        : np.array(self.sites, dtype = object)[sites],
+                                'Skill'       : np.array(self.skills, dtype = object)[skills],
+                                'Category'    : np.array(self.categories, dtype = object)[skills],
+                                'Offers'      : counts[skills, sites, days],
+                                'Total_offers': totals[sites, days]}, columns = EXTRACT_COLUMNS)
+        extract['Share'] = (extract['Offers'] / extract['Total_offers']).round(4)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+        extract.to_csv(path, index = False)
+        return extract
@@ -8,6 +8,8 @@ from PyQt5.QtWidgets import (
 
 from PyQt5 import QtCore
 
+from lib.metrics import METRICS
+
 
 class Task():
     """
@@ -45,12 +47,76 @@ class Task():
 
     """
     ------------- Aim --------------
-    Execute through a driver the actions in the list of actions to execute
+    Execute through a driver the actions in the list of actions to execute. A task with "skip_if_present"
+    is skipped when the driver restored a session and the given element is already on the page.
     """
     def execute(self, driver, repeat = 1):
-        for _ in range(repeat):
-            for action in self.actions:
-                action.do(driver)
+        if self.is_skipped(driver):
+            print(self.name + ' skipped, the session restored is still valid')
+            return
+        with METRICS.measure('task', task = self.name, driver = getattr(driver, 'account', '')):
+            for _ in range(repeat):
+                for action in self.actions:
+                    action.do(driver)
+
+    """
+    ------------- Aim --------------
+    Verify if the task can be skipped because the session restored by the driver is still valid
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (webdriver)  | driver        | Driver that would execute the actions
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if the task does not need to be executed
+    """
+    def is_skipped(self, driver):
+        element_name = self.json_elements.get('skip_if_present')
+        if not element_name or not getattr(driver, 'session_restored', False):
+            return False
+        return driver.is_present(element_name)
+
+    """
+    ------------- Aim --------------
+    Verify if the task loads its urls from the url queue, i.e. a Load action without any url
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if the task is fed by the url queue
+    """
+    def uses_url_queue(self):
+        return any(action.to_do == 'Load' and not (action.params or {}).get('url') for action in self.actions)
+
+    """
+    ------------- Aim --------------
+    Execute through a driver the actions once per url pulled from the url queue, until the queue is
+    exhausted. A url is put back on the queue if one of the actions fails.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (webdriver)  | driver        | Driver that will execute the actions
+    (UrlQueue)   | url_queue     | Queue of urls shared with the other drivers
+    """
+    def execute_queue(self, driver, url_queue):
+        url = url_queue.next_url()
+        while url is not None:
+            driver.queued_url = url
+            failed_action = None
+            with METRICS.measure('url', task = self.name, driver = getattr(driver, 'account', '')):
+                for action in self.actions:
+                    if not action.do(driver):
+                        failed_action = action
+                        break
+            if failed_action is None:
+                url_queue.done(url)
+            elif url_queue.retry(url):
+                METRICS.inc('url_retries_total', task = self.name, action = failed_action.name)
+                print('Url put back on the queue: ' + url)
+            else:
+                METRICS.inc('url_abandoned_total', task = self.name, action = failed_action.name)
+                print('Url abandoned: ' + url)
+            url = url_queue.next_url()
 
     def draw(self):
         task_container = QVBoxLayout()
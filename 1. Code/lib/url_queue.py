@@ -0,0 +1,203 @@
+import threading
+from collections import deque
+
+
+class UrlQueue():
+
+    """
+    ------------- Aim --------------
+    Initialize a thread-safe work queue of urls shared by all the drivers of a Program.
+    Every url is handed out only once, a failed url is put back on the queue until it
+    reaches max_retries. The queue can be bounded so that a task adding urls waits for the drivers
+    scraping them (back-pressure).
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (int)        | max_retries   | Number of times a failed url is put back on the queue
+    (int)        | max_pending   | Number of urls waiting above which put blocks, 0 for no limit
+    """
+    def __init__(self, max_retries = 2, max_pending = 0):
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self.failed = []
+        # Functions called with each url added to the queue and each url scraped, e.g. to record
+        # them in the seen offers index or in the journal of the run
+        self.on_put = []
+        self.on_done = []
+
+        self._condition = threading.Condition()
+        self._pending = deque()
+        self._seen = set()
+        self._in_flight = set()
+        self._retries = dict()
+        self._closed = False
+        self._finished = 0
+
+    """
+    ------------- Aim --------------
+    Adds a url to the queue if it has never been queued before
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url to be added
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if the url has been added
+    """
+    def put(self, url):
+        if not url:
+            return False
+        url = str(url).strip()
+        with self._condition:
+            if url in self._seen:
+                return False
+            self._seen.add(url)
+            # Waits for the drivers to catch up when the queue is full
+            while self.max_pending and len(self._pending) >= self.max_pending and not self._closed:
+                self._condition.wait()
+            self._pending.append(url)
+            self._condition.notify_all()
+        self._call_hooks(self.on_put, url)
+        return True
+
+    """
+    ------------- Aim --------------
+    Adds a list of urls to the queue
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (list)       | urls          | Urls to be added
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (int)        |        | Number of urls added
+    """
+    def extend(self, urls):
+        return sum(1 for url in urls if self.put(url))
+
+    """
+    ------------- Aim --------------
+    Marks urls as already scraped, e.g. by a previous run: they will never be handed out
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (iterable)   | urls          | Urls already scraped
+    """
+    def exclude(self, urls):
+        with self._condition:
+            self._seen.update(str(url).strip() for url in urls if url)
+
+    """
+    ------------- Aim --------------
+    Changes the number of urls waiting above which put blocks
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (int)        | max_pending   | Maximum number of urls waiting, 0 for no limit
+    """
+    def bound(self, max_pending):
+        with self._condition:
+            self.max_pending = max_pending
+            self._condition.notify_all()
+
+    """
+    ------------- Aim --------------
+    Tells the drivers that no new url will be added. Once the queue is empty and no url is
+    being loaded anymore, next_url returns None.
+    """
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    """
+    ------------- Aim --------------
+    Hands out the next url to an idle driver. If the queue is empty but other drivers are still
+    working, waits because a failed url could be put back on the queue.
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (str)        | url    | Url to load, None when the queue is exhausted
+    """
+    def next_url(self):
+        with self._condition:
+            while not self._pending:
+                if self._closed and not self._in_flight:
+                    return None
+                self._condition.wait()
+            url = self._pending.popleft()
+            self._in_flight.add(url)
+            # A task blocked by a full queue can add its next url
+            if self.max_pending:
+                self._condition.notify_all()
+            return url
+
+    """
+    ------------- Aim --------------
+    Marks a url handed out by next_url as scraped
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url scraped
+    """
+    def done(self, url):
+        with self._condition:
+            self._in_flight.discard(url)
+            self._finished += 1
+            self._condition.notify_all()
+        self._call_hooks(self.on_done, url)
+
+    """
+    ------------- Aim --------------
+    Puts a url handed out by next_url back on the queue after a failure
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url that failed
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if the url will be retried, False if it is abandoned
+    """
+    def retry(self, url):
+        with self._condition:
+            self._in_flight.discard(url)
+            self._retries[url] = self._retries.get(url, 0) + 1
+            if self._retries[url] > self.max_retries:
+                self.failed.append(url)
+                requeued = False
+            else:
+                self._pending.append(url)
+                requeued = True
+            self._condition.notify_all()
+        return requeued
+
+    """
+    ------------- Aim --------------
+    True once at least one url has been put on the queue
+    """
+    @property
+    def fed(self):
+        with self._condition:
+            return bool(self._seen)
+
+    """
+    ------------- Aim --------------
+    Number of urls successfully scraped
+    """
+    @property
+    def finished(self):
+        with self._condition:
+            return self._finished
+
+    def _call_hooks(self, hooks, url):
+        for hook in hooks:
+            try:
+                hook(url)
+            except Exception as e:
+                print(e)
+
+    def __len__(self):
+        with self._condition:
+            return len(self._pending)
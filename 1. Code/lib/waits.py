@@ -0,0 +1,146 @@
+import time
+from random import uniform
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+from lib.browser_scripts import PAGE_SETTLED, WAIT_FOR_SETTLED
+
+# Default configuration of the waits, overridden by the "waits" key of the Driver task in the appdata file
+# mode            : "event" returns as soon as the page is ready, "fixed" always waits the maximum duration
+# quiet_ms        : the page is ready when the DOM did not change and no request ran during this period
+# element_timeout : maximum duration to wait for an element in seconds, random between 4 and 6 if None
+# give_up_ms      : an element is not waited anymore once the page has been ready for this period
+DEFAULT_WAIT_CONFIG = {'mode'           : 'event',
+                       'quiet_ms'       : 250,
+                       'element_timeout': None,
+                       'give_up_ms'     : 1500}
+# Frequency of the checks while waiting for an element
+POLL_FREQUENCY = 0.1
+
+
+class Waiter():
+
+    """
+    ------------- Aim --------------
+    Initialize the waits of a driver. The fixed sleeps are only an upper bound: the waits return as
+    soon as the page is ready (DOM mutations stopped, no request running, or number of elements changed).
+    The time saved compared to the fixed sleeps is recorded per action.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (webdriver)  | driver        | Driver waiting for its pages
+    (dict)       | config        | Configuration overriding DEFAULT_WAIT_CONFIG
+    """
+    def __init__(self, driver, config = None):
+        self.driver = driver
+        self.config = dict(DEFAULT_WAIT_CONFIG)
+        self.config.update(config or {})
+        self.event_mode = self.config['mode'] == 'event'
+        # For each action: number of waits, seconds that would have been slept, seconds actually waited
+        self.stats = dict()
+
+    """
+    ------------- Aim --------------
+    Waits until the page is ready, at most upper_bound seconds
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | action        | Name of the action waiting, used for the report
+    (float)      | upper_bound   | Maximum duration to wait, the former fixed sleep
+    (tuple)      | count         | (enum, tag, previous count): also returns when the number of elements changes
+    """
+    def settle(self, action, upper_bound, count = None):
+        start = time.time()
+        if self.event_mode:
+            try:
+                self.driver.execute_async_script(WAIT_FOR_SETTLED, self.config['quiet_ms'], upper_bound * 1000,
+                                                 list(count) if count is not None else None)
+            except Exception as e:
+                # The page changed while waiting, the wait is considered over
+                print(e)
+        else:
+            time.sleep(upper_bound)
+        self._record(action, upper_bound, time.time() - start)
+
+    """
+    ------------- Aim --------------
+    Waits for an element to be present on the page. In event mode, also gives up once the page has
+    been ready for give_up_ms without the element.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | action        | Name of the action waiting, used for the report
+    (enum)       | enum          | 'By' enumeration of the element
+    (str)        | tag           | Tag of the element
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (bool)       |        | True if the element is present
+    """
+    def element(self, action, enum, tag):
+        timeout = self.config['element_timeout'] or uniform(4, 6)
+        start = time.time()
+        try:
+            if self.event_mode:
+                WebDriverWait(self.driver, timeout, POLL_FREQUENCY).until(
+                    lambda driver: len(driver.find_elements(enum, tag)) > 0 or self._page_settled(self.config['give_up_ms']))
+                present = len(self.driver.find_elements(enum, tag)) > 0
+            else:
+                WebDriverWait(self.driver, timeout).until(lambda driver: len(driver.find_elements(enum, tag)) > 0)
+                present = True
+        except TimeoutException:
+            present = False
+        spent = time.time() - start
+        # A fixed wait also returns as soon as the element is present, time is only saved when it is missing
+        self._record(action, spent if present else timeout, spent)
+        return present
+
+    """
+    ------------- Aim --------------
+    Builds the report of the time saved by the event waits
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (dict)       | report | For each action: waits, maximum seconds, waited seconds and saved seconds
+    """
+    def report(self):
+        report = dict()
+        for action, (calls, budget, spent) in self.stats.items():
+            report[action] = {'waits': calls, 'max_s': round(budget, 3), 'waited_s': round(spent, 3),
+                              'saved_s': round(max(budget - spent, 0), 3)}
+        return report
+
+    def _page_settled(self, quiet_ms):
+        try:
+            return self.driver.execute_script(PAGE_SETTLED, quiet_ms)
+        except Exception:
+            return False
+
+    def _record(self, action, budget, spent):
+        calls, total_budget, total_spent = self.stats.get(action, (0, 0, 0))
+        self.stats[action] = (calls + 1, total_budget + budget, total_spent + spent)
+
+
+"""
+------------- Aim --------------
+Prints the time saved by the event waits of several drivers
+
+---------- Parameters ----------
+(TYPE)       | NAME          | DESCRIPTION
+(list)       | waiters       | Waiters of the drivers
+"""
+def print_wait_report(waiters):
+    total = dict()
+    for waiter in waiters:
+        for action, values in waiter.report().items():
+            if action not in total:
+                total[action] = dict.fromkeys(values, 0)
+            for key, value in values.items():
+                total[action][key] += value
+    if not total:
+        return
+    print('Waits report (seconds):')
+    for action, values in total.items():
+        print('  ' + action + ': ' + str(values['waits']) + ' waits, waited ' + str(round(values['waited_s'], 1))
+              + ' instead of ' + str(round(values['max_s'], 1)) + ', saved ' + str(round(values['saved_s'], 1)))
@@ -0,0 +1,339 @@
+import os
+import re
+import json
+import base64
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, urljoin
+
+ARCHIVE_FOLDER = os.path.join('..', '2. Exports', 'archives')
+# Responses whose body is rewritten so that their links point to the replay server
+TEXT_TYPES = ['html', 'css', 'javascript', 'json', 'xml', 'text/plain']
+# Headers of a recorded response sent back by the replay server
+KEPT_HEADERS = ['content-type', 'location']
+
+
+class WebArchive():
+
+    """
+    ------------- Aim --------------
+    Initialize an archive of the responses received while running a website: an index of the urls with
+    their status and headers, and the bodies stored once per content (file named by its sha256)
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | name          | Name of the archive, e.g. the name of the appdata file recorded
+    (str)        | folder        | Folder of the archives
+    """
+    def __init__(self, name, folder = ARCHIVE_FOLDER):
+        self.name = name
+        self.folder = os.path.join(folder, name)
+        self.index_path = os.path.join(self.folder, 'index.json')
+        self.entries = dict()
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding = 'utf-8') as file:
+                self.entries = json.load(file)
+
+    """
+    ------------- Aim --------------
+    Adds a response to the archive, a url recorded again is replaced
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url requested
+    (int)        | status        | Status of the response
+    (dict)       | headers       | Headers of the response
+    (bytes)      | body          | Body of the response, None for a redirection
+    """
+    def add(self, url, status, headers, body = None):
+        headers = {name.lower(): value for name, value in (headers or {}).items() if name.lower() in KEPT_HEADERS}
+        digest = None
+        if body is not None:
+            digest = hashlib.sha256(body).hexdigest()
+            path = os.path.join(self.folder, 'bodies', digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok = True)
+                with open(path, 'wb') as file:
+                    file.write(body)
+        with self._lock:
+            # A redirection never replaces a page already recorded for the same url
+            if body is None and url in self.entries and self.entries[url]['body'] is not None:
+                return
+            self.entries[url] = {'status': status, 'headers': headers, 'body': digest}
+
+    """
+    ------------- Aim --------------
+    Finds the response recorded for a url: the same url, or else the same page with other query parameters
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url requested
+
+    ------------ Output ------------
+    (TYPE)       | NAME   | DESCRIPTION
+    (tuple)      |        | (status, headers, body) of the response, None if the url was never recorded
+    """
+    def find(self, url):
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                page = url.split('?')[0].split('#')[0].rstrip('/')
+                entry = next((entry for recorded, entry in self.entries.items()
+                              if recorded.split('?')[0].split('#')[0].rstrip('/') == page), None)
+        if entry is None:
+            return None
+        body = b''
+        if entry['body'] is not None:
+            with open(os.path.join(self.folder, 'bodies', entry['body']), 'rb') as file:
+                body = file.read()
+        return entry['status'], entry['headers'], body
+
+    """
+    ------------- Aim --------------
+    Returns the websites recorded, as (scheme, host)
+    """
+    def hosts(self):
+        with self._lock:
+            return sorted({(urlsplit(url).scheme, urlsplit(url).netloc) for url in self.entries})
+
+    def save(self):
+        os.makedirs(self.folder, exist_ok = True)
+        with self._lock:
+            with open(self.index_path + '.tmp', 'w', encoding = 'utf-8') as file:
+                json.dump(self.entries, file, ensure_ascii = False, indent = 1)
+            os.replace(self.index_path + '.tmp', self.index_path)
+
+
+class Recorder():
+
+    """
+    ------------- Aim --------------
+    Initialize the recording of the pages and subresources loaded by the Chrome drivers. The responses
+    are read from the performance log of Chrome after every action and their bodies are requested through
+    the DevTools protocol.
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (WebArchive) | archive       | Archive receiving the responses
+    """
+    def __init__(self, archive):
+        self.archive = archive
+        self.replaying = False
+        # Responses received whose body is not fully loaded yet, per driver and request
+        self._pending = dict()
+        self._lock = threading.Lock()
+
+    # Enables the performance log of Chrome, to be called on the options of a driver before it starts
+    def configure(self, options):
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    # Enables the network events of a driver which just started
+    def attach(self, driver):
+        driver.execute_cdp_cmd('Network.enable', {})
+
+    """
+    ------------- Aim --------------
+    Records the responses received by a driver since its last action
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (Driver)     | driver        | Chrome driver which executed an action
+    """
+    def after_action(self, driver):
+        try:
+            logs = driver.get_log('performance')
+        except Exception as e:
+            print(e)
+            return
+        for log in logs:
+            message = json.loads(log['message'])['message']
+            params = message.get('params', {})
+            if message['method'] == 'Network.requestWillBeSent' and params.get('redirectResponse'):
+                redirect = params['redirectResponse']
+                self.archive.add(redirect['url'], redirect['status'], redirect.get('headers'))
+            elif message['method'] == 'Network.responseReceived':
+                with self._lock:
+                    self._pending[(id(driver), params['requestId'])] = params['response']
+            elif message['method'] == 'Network.loadingFinished':
+                with self._lock:
+                    response = self._pending.pop((id(driver), params['requestId']), None)
+                if response is not None and response['url'].startswith('http'):
+                    self._record_body(driver, params['requestId'], response)
+
+    """
+    ------------- Aim --------------
+    Records a response received without any browser (http engine)
+    """
+    def record_response(self, url, status, headers, body):
+        self.archive.add(url, status, headers, body)
+
+    # The urls are loaded as they are while recording
+    def local_url(self, url):
+        return url
+
+    def stop(self):
+        self.archive.save()
+        print(str(len(self.archive.entries)) + ' responses recorded in ' + self.archive.folder)
+
+    def _record_body(self, driver, request_id, response):
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            # No body for this response (e.g. preflight request) or already released by Chrome
+            return
+        body = base64.b64decode(result['body']) if result.get('base64Encoded') else result['body'].encode('utf-8')
+        headers = dict(response.get('headers', {}))
+        headers.setdefault('content-type', response.get('mimeType', ''))
+        # A page revalidated by Chrome is served as a full page
+        status = 200 if response['status'] == 304 else response['status']
+        self.archive.add(response['url'], status, headers, body)
+
+
+class ReplayServer():
+
+    """
+    ------------- Aim --------------
+    Initialize a local http server serving the responses of an archive. A page is served at
+    /<scheme>/<host>/<path>, the links to the recorded websites are rewritten to the server and the paths
+    relative to the root of a website are found from the page requesting them (Referer).
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (WebArchive) | archive       | Archive to serve
+    (int)        | port          | Port of the server, any free port if 0
+    """
+    def __init__(self, archive, port = 0):
+        self.archive = archive
+        self.replaying = True
+        self.missing = set()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.prefix = 'http://127.0.0.1:' + str(self.server.server_address[1])
+        self._thread = None
+        # Absolute links to a recorded website, with or without their scheme
+        hosts = '|'.join(re.escape(host) for scheme, host in self.archive.hosts() if host)
+        self._links = re.compile(r'(https?:)?//(' + hosts + r')(?=[/"\'?#\s)]|$)') if hosts else None
+        # Urls of the replay server, written /<scheme>/<host>/<path>
+        self._served = re.compile(re.escape(self.prefix) + r'/(https?)/([^/?#\s"\']+)')
+
+    def start(self):
+        self._thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self._thread.start()
+        print('Replaying ' + self.archive.name + ' on ' + self.prefix)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.missing:
+            print(str(len(self.missing)) + ' urls requested during the replay were not recorded')
+
+    # Nothing to prepare on a driver, the urls are rewritten by local_url
+    def configure(self, options):
+        pass
+
+    def attach(self, driver):
+        pass
+
+    def after_action(self, driver):
+        pass
+
+    def record_response(self, url, status, headers, body):
+        pass
+
+    """
+    ------------- Aim --------------
+    Returns the url of the replay server serving a url of a recorded website
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | url           | Url of the website
+    """
+    def local_url(self, url):
+        if not url or url.startswith(self.prefix):
+            return url
+        parts = urlsplit(url)
+        if parts.scheme not in ['http', 'https']:
+            return url
+        return self.prefix + '/' + parts.scheme + '/' + parts.netloc + url[len(parts.scheme + '://' + parts.netloc):]
+
+    """
+    ------------- Aim --------------
+    Returns the url of the recorded website served by a url of the replay server, None if it is not one
+    """
+    def original_url(self, path):
+        if path.startswith(self.prefix):
+            path = path[len(self.prefix):]
+        parts = path.lstrip('/').split('/', 2)
+        if len(parts) < 2 or parts[0] not in ['http', 'https']:
+            return None
+        return parts[0] + '://' + parts[1] + '/' + (parts[2] if len(parts) > 2 else '')
+
+    """
+    ------------- Aim --------------
+    Replaces the urls of the replay server found in a text read on a page by the urls of the recorded websites
+
+    ---------- Parameters ----------
+    (TYPE)       | NAME          | DESCRIPTION
+    (str)        | text          | Text read on a page served by the replay server
+    """
+    def original_text(self, text):
+        return self._served.sub(r'\1://\2', text)
+
+    def _rewrite(self, body, content_type):
+        if self._links is None or not any(text_type in content_type for text_type in TEXT_TYPES):
+            return body
+        text = body.decode('utf-8', 'replace')
+        text = self._links.sub(lambda match: self.prefix + '/' + (match.group(1) or 'https:')[:-1] + '/' + match.group(2), text)
+        return text.encode('utf-8')
+
+    def _respond(self, handler):
+        url = self.original_url(handler.path)
+        if url is None:
+            # Path relative to the root of the website of the page requesting it
+            referer = self.original_url(handler.headers.get('Referer', '') or '')
+            if referer is None:
+                handler.send_error(404)
+                return
+            handler.send_response(302)
+            handler.send_header('Location', self.local_url(urljoin(referer, handler.path)))
+            handler.end_headers()
+            return
+
+        found = self.archive.find(url)
+        if found is None:
+            self.missing.add(url)
+            handler.send_error(404)
+            return
+        status, headers, body = found
+        content_type = headers.get('content-type', '')
+        body = self._rewrite(body, content_type)
+        handler.send_response(status)
+        if 'location' in headers:
+            handler.send_header('Location', self.local_url(urljoin(url, headers['location'])))
+        if content_type:
+            handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(body)
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                replay._respond(self)
+
+            def do_HEAD(self):
+                replay._respond(self)
+
+            # Forms (e.g. the login) get the response recorded for their url
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+                replay._respond(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
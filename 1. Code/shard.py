@@ -0,0 +1,46 @@
+import os
+import argparse
+
+from lib.sharding import Coordinator, run_worker
+
+# Runs a website with the urls of its url queue scraped by several processes, on this host or on others.
+# Coordinator, collecting the links and exporting the rows of the workers (2 workers on this host):
+#   python shard.py coordinator linkedin --workers 2
+# Coordinator accepting workers of other hosts, and a worker started on another host:
+#   python shard.py coordinator linkedin --workers 2 --host 0.0.0.0 --port 50000 --authkey <key> --remote 1
+#   python shard.py worker linkedin --connect <coordinator>:50000 --authkey <key> --id build-02
+# The key can also be given by the SCRAPER_SHARD_KEY environment variable.
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Sharded run of a website over several processes and hosts')
+    parser.add_argument('role', choices = ['coordinator', 'worker'])
+    parser.add_argument('website', help = 'Name of the appdata file')
+    parser.add_argument('--workers', type = int, default = 2, help = 'Worker processes started on this host by the coordinator')
+    parser.add_argument('--host', default = '127.0.0.1', help = 'Interface of the frontier, 0.0.0.0 for workers of other hosts')
+    parser.add_argument('--port', type = int, default = 0, help = 'Port of the frontier')
+    parser.add_argument('--remote', type = int, default = 0, help = 'Number of workers started on other hosts')
+    parser.add_argument('--connect', default = '', help = 'host:port of the frontier of the coordinator')
+    parser.add_argument('--id', default = '', help = 'Identifier of the worker')
+    parser.add_argument('--authkey', default = os.environ.get('SCRAPER_SHARD_KEY', ''))
+    parser.add_argument('--headless', action = 'store_true', help = 'Runs Chrome on background')
+    args = parser.parse_args()
+
+    if args.role == 'coordinator':
+        if args.host != '127.0.0.1' and not args.authkey:
+            parser.error('--authkey is needed for workers of other hosts')
+        coordinator = Coordinator(args.website, args.workers, args.host, args.port, args.authkey, args.remote)
+        try:
+            coordinator.run(run_background = args.headless)
+        finally:
+            coordinator.close()
+    else:
+        if not args.connect or not args.authkey:
+            parser.error('--connect and --authkey are needed by a worker')
+        host, port = args.connect.rsplit(':', 1)
+        run_worker(args.website, (host, int(port)), args.authkey.encode(), args.id or 'remote-' + str(os.getpid()),
+                   run_background = args.headless)
+
+
+if __name__ == "__main__":
+    main()
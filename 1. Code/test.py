@@ -1,3 +1,4 @@
+import json
 import requests
 
 BASE = "http://127.0.0.1:5000/"
@@ -10,5 +11,14 @@ for i in range(len(data)):
     response = requests.put(BASE + "job_offer", json=data[i])
     print(response.json())
 
+# All the offers are sent in a single request
+response = requests.post(BASE + "job_offers", json=data)
+print(response.json())
+
+# Same offers sent as NDJSON, they are updated on their url
+ndjson = "".join(json.dumps(offer) + "\n" for offer in data)
+response = requests.post(BASE + "job_offers", data=ndjson.encode("utf-8"), headers={"Content-Type": "application/x-ndjson"})
+print(response.json())
+
 response = requests.get(BASE + 'job_offer', json = {"id":1})
-print(response.json())
\ No newline at end of file
+print(response.json())